@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User, Pharmacy, Medicine, Inventory
+from .models import User, Pharmacy, Medicine, Inventory, StockReservation
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
     list_display = ("id", "first_name", "last_name", "email", "created_at")
@@ -22,3 +22,9 @@ class InventoryAdmin(admin.ModelAdmin):
     list_display = ("id", "pharmacy", "medicine", "quantity", "price", "status")
     search_fields = ("pharmacy__name", "medicine__name")
     list_filter = ("status",)
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ("id", "inventory", "quantity", "expires_at", "created_at")
+    list_filter = ("expires_at",)
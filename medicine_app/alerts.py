@@ -0,0 +1,137 @@
+import json
+import sys
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Inventory, StockAlert, Watermark
+
+# Low/out-of-stock alerts. The worker walks Inventory in (updated_at, id)
+# order from a watermark, so each pass reads only rows written since the
+# last one, batch_size at a time. It starts a little before the watermark
+# because updated_at is set before commit; StockAlert remembers what was
+# already sent, so re-reading a row never alerts twice.
+
+WATERMARK = "stock_alerts"
+ALERT_FIELDS = (
+    "pk", "pharmacy_id", "quantity", "reorder_level", "updated_at",
+    "medicine__name", "medicine__strength", "pharmacy__name", "pharmacy__user__email",
+)
+
+
+class ConsoleSink:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, pharmacy, alerts):
+        self.stream.write(f"[{pharmacy['name']}] {len(alerts)} stock alert(s) for {pharmacy['email']}\n")
+        for alert in alerts:
+            self.stream.write(f"  {alert['level']:<3} {alert['medicine']}: {alert['quantity']} left\n")
+        self.stream.flush()
+
+
+class FileSink:
+    # one JSON line per pharmacy batch
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, pharmacy, alerts):
+        line = json.dumps({"at": timezone.now().isoformat(), "pharmacy": pharmacy, "alerts": alerts})
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class EmailSink:
+    def send(self, pharmacy, alerts):
+        lines = [f"{a['medicine']}: {a['quantity']} left ({a['level'].lower()})" for a in alerts]
+        send_mail(
+            f"{len(alerts)} stock alert(s) for {pharmacy['name']}",
+            "\n".join(lines),
+            None,
+            [pharmacy["email"]],
+        )
+
+
+def get_sink():
+    path = getattr(settings, "STOCK_ALERT_SINK", "medicine_app.alerts.ConsoleSink")
+    return import_string(path)(**getattr(settings, "STOCK_ALERT_SINK_OPTIONS", {}))
+
+
+def alert_level(quantity, reorder_level):
+    if quantity <= 0:
+        return "OUT"
+    if reorder_level is not None and quantity <= reorder_level:
+        return "LOW"
+    return None
+
+
+def _rows_after(timestamp, last_id, batch_size):
+    rows = Inventory.objects.filter(pharmacy__isnull=False, medicine__isnull=False)
+    if timestamp is not None:
+        rows = rows.filter(Q(updated_at__gt=timestamp) | Q(updated_at=timestamp, pk__gt=last_id))
+    return list(rows.order_by("updated_at", "pk").values_list(*ALERT_FIELDS)[:batch_size])
+
+
+def scan_batch(sink, timestamp, last_id, batch_size=1000):
+    # Returns the (updated_at, id) of the batch's last row and how many
+    # alerts it sent, or None when there is nothing left.
+    rows = _rows_after(timestamp, last_id, batch_size)
+    if not rows:
+        return None
+    sent = dict(StockAlert.objects.filter(inventory_id__in=[row[0] for row in rows]).values_list("inventory_id", "level"))
+    pharmacies = {}
+    raise_alerts = []
+    cleared = []
+    for pk, pharmacy_id, quantity, reorder_level, _, name, strength, pharmacy_name, email in rows:
+        level = alert_level(quantity, reorder_level)
+        if level is None:
+            if pk in sent:
+                cleared.append(pk)
+            continue
+        if sent.get(pk) == level:
+            continue
+        raise_alerts.append(StockAlert(inventory_id=pk, level=level))
+        if sent.get(pk) == "OUT":
+            # partly restocked but still low: remember it, the owner knows already
+            continue
+        pharmacy = pharmacies.setdefault(pharmacy_id, (
+            {"id": pharmacy_id, "name": pharmacy_name, "email": email}, [],
+        ))
+        pharmacy[1].append({"inventory_id": pk, "medicine": f"{name} {strength}", "quantity": quantity, "level": level})
+
+    # delivered before it is remembered: a crash in between re-sends rather than drops
+    for pharmacy, alerts in pharmacies.values():
+        sink.send(pharmacy, alerts)
+    with transaction.atomic():
+        StockAlert.objects.filter(inventory_id__in=cleared + [a.inventory_id for a in raise_alerts]).delete()
+        StockAlert.objects.bulk_create(raise_alerts)
+    last = rows[-1]
+    return (last[4], last[0]), sum(len(alerts) for _, alerts in pharmacies.values())
+
+
+def scan(sink=None, batch_size=1000):
+    sink = sink or get_sink()
+    mark, _ = Watermark.objects.get_or_create(name=WATERMARK)
+    overlap = timedelta(seconds=getattr(settings, "STOCK_ALERT_OVERLAP_SECONDS", 60))
+    if mark.timestamp is None:
+        cursor = (None, 0)
+    else:
+        cursor = (mark.timestamp - overlap, 0)
+    total = 0
+    while True:
+        result = scan_batch(sink, *cursor, batch_size=batch_size)
+        if result is None:
+            break
+        cursor, sent = result
+        total += sent
+        if mark.timestamp is None or cursor[0] > mark.timestamp:
+            Watermark.objects.filter(name=WATERMARK).update(timestamp=cursor[0], updated_at=timezone.now())
+            mark.timestamp = cursor[0]
+    return total
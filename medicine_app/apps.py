@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class MedicineAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "medicine_app"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if getattr(settings, "PROFILING_ENABLED", False):
+            # hook queries before any thread opens a connection, not on the first request
+            from . import profiling
+
+            profiling.install()
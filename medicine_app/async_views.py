@@ -0,0 +1,95 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+
+from . import changefeed
+from .cache import get_medicine, get_medicine_offers
+from .decorators import conditional_get, login_required
+from .models import Pharmacy
+from .pagination import InvalidCursor
+from .views import medicine_detail_validators, search_page, search_page_validators, search_results
+
+# Async counterparts of the read-only views, used when MEDICINE_ASYNC_VIEWS is
+# on (the default under asgi.py). The session is loaded with aget() before
+# rendering, so base.html and the messages context processor read it from
+# the already-loaded cache instead of querying from the event loop.
+
+
+@conditional_get(search_page_validators)
+async def search_medicine(request):
+    if request.headers.get("x-requested-with") == "XMLHttpRequest":
+        return await sync_to_async(search_results)(request)
+
+    await request.session.aget("user_id")
+    # only the first page; the search index may build on first use, so off the loop
+    try:
+        medicines, has_more, next_cursor = await sync_to_async(search_page)(request)
+    except InvalidCursor:
+        medicines, has_more, next_cursor = [], False, None
+
+    return render(request, "search_medicine.html", {
+        "medicines": medicines,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+        "keyword": request.GET.get("keyword"),
+    })
+
+
+@conditional_get(medicine_detail_validators)
+async def medicine_detail(request, pk):
+    await request.session.aget("user_id")
+    medicine = await sync_to_async(get_medicine)(pk)
+    if medicine is None:
+        raise Http404("No Medicine matches the given query.")
+    city = request.GET.get("city", "")
+    inventories = await sync_to_async(get_medicine_offers)(pk, city)
+
+    return render(request, "medicine_detail.html", {
+        "medicine": medicine,
+        "inventories": inventories,
+        "city": city,
+    })
+
+
+@login_required
+async def dashboard(request):
+    pharmacies = Pharmacy.objects.filter(user_id=request.user_id).select_related("stock_summary")
+
+    return render(request, "dashboard.html", {
+        "pharmacies": [p async for p in pharmacies]
+    })
+
+
+def _feed_id(value):
+    return int(value) if value and value.isdigit() else None
+
+
+async def inventory_changes(request):
+    # SSE feed of InventoryChange entries for one medicine (anyone, active
+    # pharmacies only) or one pharmacy (its owner). Resumes after the
+    # Last-Event-ID header or ?after=, otherwise starts from now.
+    medicine_id = _feed_id(request.GET.get("medicine"))
+    pharmacy_id = _feed_id(request.GET.get("pharmacy"))
+    if medicine_id is None and pharmacy_id is None:
+        return JsonResponse({"error": "medicine or pharmacy is required."}, status=400)
+    after = _feed_id(request.headers.get("Last-Event-ID") or request.GET.get("after"))
+
+    if pharmacy_id is not None:
+        user_id = await request.session.aget("user_id")
+        if user_id is None:
+            return JsonResponse({"error": "Login required."}, status=401)
+        if not await Pharmacy.objects.filter(pk=pharmacy_id, user_id=user_id).aexists():
+            return JsonResponse({"error": "Pharmacy not found."}, status=404)
+    filters = {"medicine_id": medicine_id, "pharmacy_id": pharmacy_id, "public": pharmacy_id is None}
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(changefeed.stream(after, **filters), content_type="text/event-stream")
+    else:
+        # a WSGI worker would be tied up for the whole stream: answer with
+        # what is pending and let the browser's retry turn it into polling
+        body = await sync_to_async(changefeed.backlog)(after, **filters)
+        response = HttpResponse(body, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
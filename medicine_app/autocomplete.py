@@ -0,0 +1,220 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from .cache import ChangeLog
+
+SNAPSHOT_VERSION = 1
+
+# Committed catalog writes are published here, as for the search index, so
+# every worker's index catches up with writes made in the others.
+AUTOCOMPLETE_VERSION_KEY = "ver:autocomplete"
+index_changes = ChangeLog(AUTOCOMPLETE_VERSION_KEY)
+
+
+class AutocompleteIndex:
+    # Sorted array of (lowercased term, display text, medicine id). A prefix
+    # lookup is two bisects plus a short scan, so it never touches the database.
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = []
+        self._by_pk = {}
+        self.watermark = None
+        self.built = False
+        self._version = None
+
+    def _terms(self, name, generic_name):
+        terms = []
+        for text in (name, generic_name):
+            text = (text or "").strip()
+            if text and text.lower() not in (t[0] for t in terms):
+                terms.append((text.lower(), text))
+        return terms
+
+    def _remove(self, pk):
+        for key in self._by_pk.pop(pk, ()):
+            i = bisect.bisect_left(self._entries, key)
+            if i < len(self._entries) and self._entries[i] == key:
+                del self._entries[i]
+
+    def _insert(self, pk, name, generic_name):
+        keys = []
+        for lowered, text in self._terms(name, generic_name):
+            key = (lowered, text, pk)
+            bisect.insort(self._entries, key)
+            keys.append(key)
+        self._by_pk[pk] = keys
+
+    def _load(self, rows):
+        entries = []
+        by_pk = {}
+        for pk, name, generic_name in rows:
+            keys = [(lowered, text, pk) for lowered, text in self._terms(name, generic_name)]
+            entries.extend(keys)
+            by_pk[pk] = keys
+        entries.sort()
+        self._entries = entries
+        self._by_pk = by_pk
+
+    def _apply(self, pk, name, generic_name, updated_at):
+        self._remove(pk)
+        self._insert(pk, name, generic_name)
+        if updated_at and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def _committed(self, rows, removed):
+        # runs on commit: a rolled-back write never reaches the index
+        with self._lock:
+            if self.built:
+                for pk in removed:
+                    self._remove(pk)
+                for row in rows:
+                    self._apply(*row)
+        version = index_changes.publish([row[0] for row in rows] + removed)
+        with self._lock:
+            # only our own write in between: the index already has it
+            if self._version is not None and version == self._version + 1:
+                self._version = version
+
+    def add(self, medicine):
+        self.add_many([medicine])
+
+    def add_many(self, medicines):
+        rows = [(m.pk, m.name, m.generic_name, m.updated_at) for m in medicines]
+        if rows:
+            transaction.on_commit(lambda: self._committed(rows, []))
+
+    def discard(self, pk):
+        transaction.on_commit(lambda: self._committed([], [pk]))
+
+    def complete(self, prefix, limit=10):
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        with self._lock:
+            self._ensure_built()
+            entries = self._entries
+            i = bisect.bisect_left(entries, (prefix,))
+            seen = set()
+            suggestions = []
+            while i < len(entries) and len(suggestions) < limit:
+                lowered, text, _ = entries[i]
+                if not lowered.startswith(prefix):
+                    break
+                if lowered not in seen:
+                    seen.add(lowered)
+                    suggestions.append(text)
+                i += 1
+        return suggestions
+
+    def _ensure_built(self):
+        if self.built:
+            version = index_changes.version()
+            if version != self._version:
+                changed = index_changes.since(self._version, version)
+                if changed is None:
+                    self.rebuild()
+                else:
+                    self._reload(changed)
+                    self._version = version
+            return
+        path = getattr(settings, "MEDICINE_AUTOCOMPLETE_SNAPSHOT", None)
+        if not (path and self.load_snapshot(path)):
+            self.rebuild()
+            if path:
+                self.save_snapshot(path)
+
+    def _reload(self, pks):
+        from .models import Medicine
+
+        rows = Medicine.objects.filter(pk__in=pks).values_list("id", "name", "generic_name", "updated_at")
+        for pk in pks:
+            self._remove(pk)
+        for row in rows:
+            self._apply(*row)
+
+    def rebuild(self):
+        from .models import Medicine
+
+        with self._lock:
+            # read first: a write landing during the scan publishes past it
+            version = index_changes.version()
+            rows = Medicine.objects.values_list("id", "name", "generic_name", "updated_at")
+            watermark = None
+            loaded = []
+            for pk, name, generic_name, updated_at in rows.iterator(chunk_size=5000):
+                loaded.append((pk, name, generic_name))
+                if watermark is None or updated_at > watermark:
+                    watermark = updated_at
+            self._load(loaded)
+            self.watermark = watermark
+            self.built = True
+            self._version = version
+        return len(self._by_pk)
+
+    def save_snapshot(self, path):
+        with self._lock:
+            rows = []
+            for pk, keys in self._by_pk.items():
+                texts = [text for _, text, _ in keys]
+                rows.append([pk] + texts)
+            data = {
+                "version": SNAPSHOT_VERSION,
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+                "rows": rows,
+            }
+        directory = os.path.dirname(os.fspath(path)) or "."
+        os.makedirs(directory, exist_ok=True)
+        # write then rename, so a worker starting up never reads a half-written file
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return len(rows)
+
+    def load_snapshot(self, path):
+        from .models import Medicine
+
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != SNAPSHOT_VERSION:
+            return False
+
+        with self._lock:
+            version = index_changes.version()
+            rows = data["rows"]
+            self._load(
+                (row[0], row[1], row[2] if len(row) > 2 else None) for row in rows
+            )
+            self.watermark = parse_datetime(data["watermark"]) if data["watermark"] else None
+            self.built = True
+
+            # catch up with whatever changed since the snapshot was taken
+            changed = Medicine.objects.all()
+            if self.watermark:
+                changed = changed.filter(updated_at__gt=self.watermark)
+            for row in changed.values_list("id", "name", "generic_name", "updated_at").iterator():
+                self._apply(*row)
+            if Medicine.objects.count() != len(self._by_pk):
+                live = set(Medicine.objects.values_list("id", flat=True).iterator(chunk_size=10000))
+                for pk in set(self._by_pk) - live:
+                    self._remove(pk)
+            self._version = version
+        return True
+
+
+_index = AutocompleteIndex()
+
+
+def get_autocomplete_index():
+    return _index
@@ -0,0 +1,91 @@
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When, Window
+from django.db.models.functions import RowNumber
+
+from .models import Availability
+
+OFFER_FIELDS = (
+    "medicine_id", "pharmacy_id", "price", "quantity", "city",
+    "pharmacy__name", "pharmacy__address", "pharmacy__phone",
+)
+
+
+def _city_rank(city):
+    # 0 for the customer's own city, so it sorts ahead of cheaper offers elsewhere
+    if not city:
+        return Value(0, output_field=IntegerField())
+    return Case(
+        When(city__iexact=city, then=Value(0)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+
+
+def _normalize(prescription):
+    # accepts [medicine_id, ...] or {medicine_id: quantity_needed}
+    if isinstance(prescription, dict):
+        return {int(k): max(int(v), 1) for k, v in prescription.items()}
+    return {int(pk): 1 for pk in prescription}
+
+
+def _lines(needed):
+    condition = Q()
+    for medicine_id, quantity in needed.items():
+        condition |= Q(medicine_id=medicine_id, quantity__gte=quantity)
+    return condition
+
+
+def offers(medicine_id, city=None):
+    return (
+        Availability.objects.filter(medicine_id=medicine_id)
+        .select_related("pharmacy")
+        .annotate(city_rank=_city_rank(city))
+        .order_by("city_rank", "price", "pharmacy_id")
+    )
+
+
+def best_offers(medicine_id, city=None, limit=10):
+    return list(offers(medicine_id, city)[:limit])
+
+
+def prescription_offers(prescription, city=None, per_medicine=3):
+    needed = _normalize(prescription)
+    if not needed:
+        return {}
+    rows = (
+        Availability.objects.filter(_lines(needed))
+        .annotate(
+            city_rank=_city_rank(city),
+            offer_rank=Window(
+                RowNumber(),
+                partition_by=[F("medicine_id")],
+                order_by=[F("city_rank").asc(), F("price").asc(), F("pharmacy_id").asc()],
+            ),
+        )
+        .filter(offer_rank__lte=per_medicine)
+        .order_by("medicine_id", "offer_rank")
+        .values(*OFFER_FIELDS)
+    )
+    offers = {medicine_id: [] for medicine_id in needed}
+    for row in rows:
+        offers[row["medicine_id"]].append(row)
+    return offers
+
+
+def single_stop_pharmacies(prescription, city=None, limit=5):
+    needed = _normalize(prescription)
+    if not needed:
+        return []
+    return list(
+        Availability.objects.filter(_lines(needed))
+        .values("pharmacy_id", "city", "pharmacy__name", "pharmacy__address", "pharmacy__phone")
+        .annotate(
+            lines=Count("medicine_id"),
+            # one unit price per line times the quantity asked for
+            total=Sum(Case(
+                *[When(medicine_id=pk, then=F("price") * qty) for pk, qty in needed.items()],
+            )),
+            city_rank=_city_rank(city),
+        )
+        .filter(lines=len(needed))
+        .order_by("city_rank", "total", "pharmacy_id")[:limit]
+    )
@@ -0,0 +1,13 @@
+from django.db.backends.mysql import base
+
+from ...dbpool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def _ping(self, connection):
+        # mysqlclient's ping is a protocol round trip, no statement parsing
+        try:
+            connection.ping()
+        except self.Database.Error:
+            return False
+        return True
@@ -0,0 +1,167 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .routers import use_primary
+
+# Read-through cache for catalog reads. Entries are versioned: every key
+# embeds the current version token of what it depends on, and invalidation
+# just writes a new token, so stale entries are never read again and simply
+# age out. Each entry carries a soft expiry; after it, one caller (holding a
+# short lock) recomputes while the others keep serving the stale value.
+
+PHARMACIES_VERSION_KEY = "ver:pharmacies"
+
+
+def get_cache():
+    return caches[getattr(settings, "CATALOG_CACHE_ALIAS", "default")]
+
+
+def _ttl():
+    return getattr(settings, "CATALOG_CACHE_TTL", 300)
+
+
+def _grace():
+    return getattr(settings, "CATALOG_CACHE_GRACE", 60)
+
+
+def _lock_timeout():
+    return getattr(settings, "CATALOG_CACHE_LOCK_TIMEOUT", 10)
+
+
+def _new_token():
+    return f"{time.time_ns():x}{random.getrandbits(16):04x}"
+
+
+def _medicine_version_key(pk):
+    return f"ver:medicine:{pk}"
+
+
+def versions(*version_keys):
+    cache = get_cache()
+    found = cache.get_many(version_keys)
+    missing = {k: _new_token() for k in version_keys if k not in found}
+    if missing:
+        # add() so two workers seeding the same version agree on one token
+        for key, token in missing.items():
+            if not cache.add(key, token, None):
+                token = cache.get(key, token)
+            found[key] = token
+    return [found[k] for k in version_keys]
+
+
+def bump(*version_keys):
+    if version_keys:
+        get_cache().set_many({k: _new_token() for k in version_keys}, None)
+
+
+class ChangeLog:
+    # A version counter in the shared cache plus, for each version, the ids
+    # it changed. A worker that is a few versions behind re-reads just those
+    # rows; one too far behind, or missing an entry (evicted, or published
+    # with ids=None for "everything"), rebuilds.
+    def __init__(self, key, ttl=3600, max_behind=1000):
+        self.key = key
+        self.ttl = ttl
+        self.max_behind = max_behind
+
+    def version(self):
+        return get_cache().get(self.key, 0)
+
+    def publish(self, ids=None):
+        cache = get_cache()
+        cache.add(self.key, 0, None)
+        try:
+            version = cache.incr(self.key)
+        except ValueError:
+            # evicted between add() and incr(): jump far ahead, so no worker
+            # mistakes the restarted counter for one it has already seen
+            version = time.time_ns() // 1000
+            cache.set(self.key, version, None)
+        if ids is not None:
+            cache.set(f"{self.key}:{version}", sorted(set(ids)), self.ttl)
+        return version
+
+    def since(self, known, current):
+        # the ids changed after `known` up to `current`, or None to rebuild
+        if known is None or not 0 < current - known <= self.max_behind:
+            return None
+        keys = [f"{self.key}:{v}" for v in range(known + 1, current + 1)]
+        found = get_cache().get_many(keys)
+        if len(found) != len(keys):
+            return None
+        return set().union(*found.values())
+
+
+def invalidate_medicines(pks):
+    keys = [_medicine_version_key(pk) for pk in set(pks) if pk is not None]
+    # after commit, so a reader can't re-cache the pre-commit rows under the new version
+    transaction.on_commit(lambda: bump(*keys))
+
+
+def invalidate_medicine(pk):
+    invalidate_medicines([pk])
+
+
+def invalidate_pharmacies():
+    transaction.on_commit(lambda: bump(PHARMACIES_VERSION_KEY))
+
+
+def read_through(key, compute, ttl=None):
+    cache = get_cache()
+    ttl = ttl or _ttl()
+    now = time.time()
+    entry = cache.get(key)
+    if entry is not None and entry["soft"] > now:
+        return entry["value"]
+
+    lock_key = f"lock:{key}"
+    if cache.add(lock_key, 1, _lock_timeout()):
+        try:
+            # from the primary: the entry outlives any replica lag behind it
+            with use_primary():
+                value = compute()
+            cache.set(key, {"value": value, "soft": time.time() + ttl}, ttl + _grace())
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry["value"]
+
+    # nothing to serve yet: wait briefly for the lock holder, then give up and compute
+    deadline = now + _lock_timeout()
+    delay = 0.01
+    while time.time() < deadline:
+        time.sleep(delay)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"]
+        delay = min(delay * 2, 0.2)
+    return compute()
+
+
+def get_medicine(pk):
+    from .models import Medicine
+
+    (version,) = versions(_medicine_version_key(pk))
+
+    def compute():
+        return Medicine.objects.filter(pk=pk).first()
+
+    return read_through(f"medicine:{pk}:{version}", compute)
+
+
+def get_medicine_offers(pk, city=None):
+    from .availability import best_offers
+
+    medicine_version, pharmacies_version = versions(_medicine_version_key(pk), PHARMACIES_VERSION_KEY)
+    city = (city or "").strip().lower()
+
+    def compute():
+        return best_offers(pk, city=city, limit=getattr(settings, "AVAILABILITY_OFFER_LIMIT", 20))
+
+    return read_through(f"offers:{pk}:{city}:{medicine_version}.{pharmacies_version}", compute)
@@ -0,0 +1,167 @@
+import time
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from .cache import invalidate_medicine
+from .models import (
+    Availability, Inventory, InventoryChange, Medicine, PriceHistory, StockReservation,
+    medicine_key, normalize_medicine_name, normalize_strength,
+)
+
+# The catalog is shared: every owner should stock the same "Paracetamol 500mg
+# Tablet" row. Medicine.canonical_key finds exact duplicates; similar()
+# catches near misses (typos, word order) when someone is about to add one;
+# merge_duplicates() folds the duplicates that already exist.
+
+SIMILARITY = 0.8
+
+
+def canonical(name, strength, form):
+    return Medicine.objects.filter(canonical_key=medicine_key(name, strength, form)).order_by("id").first()
+
+
+def similar(name, strength, form, limit=5):
+    # Same strength and form, a name close enough to be a typo of this one.
+    # Candidates come from the search backend plus a prefix scan of the key
+    # index, so this never reads the whole catalog.
+    wanted = normalize_medicine_name(name)
+    suffix = f"|{normalize_strength(strength)}|{form.lower()}"
+    candidates = {}
+    prefix = Medicine.objects.filter(canonical_key__startswith=wanted[:3]).order_by("canonical_key", "id")
+    matched = Medicine.objects.search(name).filter(form=form)
+    for rows in (prefix.values_list("id", "canonical_key")[:500], matched.values_list("id", "canonical_key")[:50]):
+        for pk, key in rows:
+            if key.endswith(suffix) and (key not in candidates or pk < candidates[key]):
+                candidates[key] = pk
+    scored = sorted(
+        ((SequenceMatcher(None, wanted, key.partition("|")[0]).ratio(), pk) for key, pk in candidates.items()),
+        reverse=True,
+    )
+    ids = [pk for score, pk in scored if score >= SIMILARITY][:limit]
+    found = Medicine.objects.in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
+
+
+def merge_group(keep_id, duplicate_ids):
+    # Repoint the duplicates' inventory and price history at keep_id. Where a
+    # pharmacy stocks several of them, one row stays (keep_id's own, else the
+    # newest) and takes the others' quantity and reservations. Runs while the
+    # site is live: the medicines and their inventory are locked first, so no
+    # stock moves under us and an insert against a duplicate waits for the
+    # merge (and then fails, see add_inventory) instead of being cascaded away.
+    group = [keep_id, *duplicate_ids]
+    with transaction.atomic():
+        list(Medicine.objects.select_for_update().filter(pk__in=group).order_by("pk").values_list("pk"))
+        rows = (
+            Inventory.objects.select_for_update().filter(medicine_id__in=group).order_by("pk")
+            .values_list("pk", "pharmacy_id", "medicine_id", "quantity", "updated_at")
+        )
+        by_pharmacy = defaultdict(list)
+        moved = []
+        for row in rows:
+            if row[1] is None:
+                moved.append(row[0])
+            else:
+                by_pharmacy[row[1]].append(row)
+
+        folded = {}
+        for items in by_pharmacy.values():
+            items.sort(key=lambda r: (r[2] != keep_id, -r[4].timestamp()))
+            keeper, rest = items[0], items[1:]
+            if keeper[2] != keep_id:
+                moved.append(keeper[0])
+            if rest:
+                folded[keeper[0]] = rest
+
+        for keeper, rest in folded.items():
+            rest_ids = [r[0] for r in rest]
+            StockReservation.objects.filter(inventory_id__in=rest_ids).update(inventory_id=keeper)
+            Inventory.objects.filter(pk__in=rest_ids).delete()
+            extra = sum(r[3] for r in rest)
+            if extra:
+                Inventory.objects.adjust_stock(keeper, extra)
+        if moved:
+            # update() sends no post_save
+            Inventory.objects.filter(pk__in=moved).update(medicine_id=keep_id, updated_at=timezone.now())
+            Availability.objects.refresh(pk__in=moved)
+            InventoryChange.objects.capture("update", pk__in=moved)
+
+        # one close per day: keep_id's own, else the first duplicate's
+        days = set(PriceHistory.objects.filter(medicine_id=keep_id).values_list("day", flat=True))
+        repoint, dropped = [], []
+        for pk, day in PriceHistory.objects.filter(medicine_id__in=duplicate_ids).order_by("pk").values_list("pk", "day"):
+            (dropped if day in days else repoint).append(pk)
+            days.add(day)
+        PriceHistory.objects.filter(pk__in=dropped).delete()
+        PriceHistory.objects.filter(pk__in=repoint).update(medicine_id=keep_id)
+
+        # whatever still points at a duplicate stays with it for the next run
+        removed = Medicine.objects.filter(pk__in=duplicate_ids).exclude(
+            pk__in=Inventory.objects.filter(medicine_id__in=duplicate_ids).values("medicine_id")
+        ).delete()[1].get(Medicine._meta.label, 0)
+    invalidate_medicine(keep_id)
+    return removed, len(moved), sum(len(rest) for rest in folded.values())
+
+
+def duplicate_groups(after="", window=5000):
+    # duplicate keys after `after`, one index range at a time
+    keys = list(
+        Medicine.objects.filter(canonical_key__gt=after).order_by("canonical_key")
+        .values_list("canonical_key", flat=True)[:window]
+    )
+    if not keys:
+        return None, []
+    groups = (
+        Medicine.objects.filter(canonical_key__gt=after, canonical_key__lte=keys[-1])
+        .values("canonical_key").annotate(entries=Count("id"), keep=Min("id"))
+        .filter(entries__gt=1).order_by("canonical_key")
+    )
+    return keys[-1], list(groups)
+
+
+def merge_duplicates(chunk_size=50, pause=0, dry_run=False, log=None):
+    # Each chunk of groups commits on its own, so the catalog stays usable
+    # while this runs and an interrupted run just starts over. A group that
+    # loses a race with a live write (a pharmacy adding the kept medicine as
+    # it is merged) is skipped and picked up by the next run.
+    after = ""
+    groups_merged = groups_skipped = medicines_removed = rows_moved = rows_folded = 0
+    while True:
+        after, groups = duplicate_groups(after)
+        if after is None:
+            break
+        for i in range(0, len(groups), chunk_size):
+            chunk = groups[i:i + chunk_size]
+            with transaction.atomic():
+                for group in chunk:
+                    duplicates = list(
+                        Medicine.objects.filter(canonical_key=group["canonical_key"])
+                        .exclude(pk=group["keep"]).values_list("pk", flat=True)
+                    )
+                    if dry_run:
+                        medicines_removed += len(duplicates)
+                    else:
+                        try:
+                            removed, moved, folded = merge_group(group["keep"], duplicates)
+                        except IntegrityError:
+                            groups_skipped += 1
+                            continue
+                        medicines_removed += removed
+                        rows_moved += moved
+                        rows_folded += folded
+                    groups_merged += 1
+            if log:
+                log(f"{groups_merged} groups, {medicines_removed} duplicates so far")
+            if pause:
+                time.sleep(pause)
+    return {
+        "groups": groups_merged,
+        "groups_skipped": groups_skipped,
+        "medicines_removed": medicines_removed,
+        "inventory_moved": rows_moved,
+        "inventory_folded": rows_folded,
+    }
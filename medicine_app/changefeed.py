@@ -0,0 +1,133 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import InventoryChange, Pharmacy
+from .routers import use_primary
+
+# Server-Sent Events over the InventoryChange log. Ids are allocated at insert
+# but become visible at commit, so a client must not move past a hole in the
+# sequence that a slower transaction may still fill; the tracker below only
+# reports sequences up to the first hole younger than the settle window.
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class SequenceTracker:
+    def __init__(self):
+        self.safe = None
+        self.checked = 0.0
+        self._lock = threading.Lock()
+
+    def _advance(self):
+        cutoff = timezone.now() - timedelta(seconds=_setting("INVENTORY_FEED_SETTLE_SECONDS", 5))
+        if self.safe is None:
+            self.safe = InventoryChange.objects.filter(created_at__lte=cutoff).aggregate(last=Max("id"))["last"] or 0
+        pending = (
+            InventoryChange.objects.filter(id__gt=self.safe)
+            .order_by("id").values_list("id", "created_at")[:_setting("INVENTORY_FEED_BATCH_SIZE", 500) * 4]
+        )
+        for sequence, created_at in pending:
+            if sequence != self.safe + 1 and created_at > cutoff:
+                break
+            self.safe = sequence
+
+    def safe_sequence(self):
+        # one scan per poll interval for the whole process, however many clients
+        with self._lock:
+            now = time.monotonic()
+            if self.safe is None or now - self.checked >= _setting("INVENTORY_FEED_POLL_SECONDS", 1.0):
+                self.checked = now
+                with use_primary():
+                    self._advance()
+            return self.safe
+
+
+tracker = SequenceTracker()
+
+
+def changes_between(after, upto, medicine_id=None, pharmacy_id=None, public=True):
+    changes = InventoryChange.objects.filter(id__gt=after, id__lte=upto)
+    if medicine_id is not None:
+        changes = changes.filter(medicine_id=medicine_id)
+    if pharmacy_id is not None:
+        changes = changes.filter(pharmacy_id=pharmacy_id)
+    if public:
+        changes = changes.filter(pharmacy_id__in=Pharmacy.objects.active().values("pk"))
+    with use_primary():
+        return list(changes.order_by("id")[:_setting("INVENTORY_FEED_BATCH_SIZE", 500)])
+
+
+def format_change(change):
+    data = {
+        "sequence": change.pk,
+        "action": change.action,
+        "inventory_id": change.inventory_id,
+        "medicine_id": change.medicine_id,
+        "pharmacy_id": change.pharmacy_id,
+        "quantity": change.quantity,
+        "price": None if change.price is None else str(change.price),
+        "status": change.status,
+        "at": change.created_at.isoformat(),
+    }
+    return f"id: {change.pk}\nevent: inventory\ndata: {json.dumps(data)}\n\n"
+
+
+def format_cursor(sequence):
+    # an id with no data moves the client's Last-Event-ID without an event
+    return f"id: {sequence}\n\n"
+
+
+def backlog(after, **filters):
+    # one response's worth, for servers that cannot hold the stream open
+    upto = tracker.safe_sequence()
+    parts = [f"retry: {int(_setting('INVENTORY_FEED_POLL_SECONDS', 1.0) * 1000)}\n\n"]
+    if after is None:
+        parts.append(format_cursor(upto))
+    elif upto > after:
+        changes = changes_between(after, upto, **filters)
+        parts.extend(format_change(change) for change in changes)
+        if len(changes) < _setting("INVENTORY_FEED_BATCH_SIZE", 500):
+            parts.append(format_cursor(upto))
+    return "".join(parts)
+
+
+async def stream(after, **filters):
+    poll = _setting("INVENTORY_FEED_POLL_SECONDS", 1.0)
+    heartbeat = _setting("INVENTORY_FEED_HEARTBEAT_SECONDS", 15)
+    deadline = time.monotonic() + _setting("INVENTORY_FEED_MAX_SECONDS", 300)
+    safe_sequence = sync_to_async(tracker.safe_sequence)
+    between = sync_to_async(changes_between)
+
+    yield f"retry: {int(poll * 1000)}\n\n"
+    if after is None:
+        after = await safe_sequence()
+        yield format_cursor(after)
+    quiet_since = time.monotonic()
+    # closed now and then so proxies and workers are not held forever; the
+    # browser reconnects with Last-Event-ID and carries on from there
+    while time.monotonic() < deadline:
+        upto = await safe_sequence()
+        if upto > after:
+            changes = await between(after, upto, **filters)
+            for change in changes:
+                yield format_change(change)
+            if len(changes) == _setting("INVENTORY_FEED_BATCH_SIZE", 500):
+                after = changes[-1].pk
+                continue
+            after = upto
+            yield format_cursor(after)
+            quiet_since = time.monotonic()
+        elif time.monotonic() - quiet_since >= heartbeat:
+            yield ": keepalive\n\n"
+            quiet_since = time.monotonic()
+        await asyncio.sleep(poll)
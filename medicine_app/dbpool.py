@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    # Driver connections shared by every thread serving one alias. Idle
+    # connections are handed out newest first after a ping; ones past
+    # max_lifetime or failing the ping are closed and replaced. When max_size
+    # are checked out, callers wait up to timeout for one to come back. Once
+    # closed, connections still checked out are closed as they come back.
+
+    def __init__(self, alias, max_size=10, max_lifetime=1800, timeout=10.0, pre_ping=True):
+        self.alias = alias
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self._idle = deque()
+        self._born = {}
+        self._available = threading.Condition()
+        self.closed = False
+        self.in_use = 0
+        self.opening = 0
+        self.checkouts = 0
+        self.created = 0
+        self.discarded = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _expired(self, connection):
+        return time.monotonic() - self._born.get(id(connection), 0) > self.max_lifetime
+
+    def _discard(self, connection):
+        self._born.pop(id(connection), None)
+        self.discarded += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def acquire(self, connect, ping):
+        started = time.monotonic()
+        waited = False
+        with self._available:
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    self.in_use += 1
+                    break
+                if self.in_use + self.opening < self.max_size:
+                    connection = None
+                    self.opening += 1
+                    break
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f"No connection for {self.alias!r} within {self.timeout}s "
+                        f"({self.max_size} in use)."
+                    )
+                waited = True
+                self._available.wait(remaining)
+            self.checkouts += 1
+            if waited:
+                wait = time.monotonic() - started
+                self.waits += 1
+                self.wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+        if connection is not None:
+            # checked and replaced outside the lock; the slot is already ours
+            if not self._expired(connection) and (not self.pre_ping or ping(connection)):
+                return connection
+            with self._available:
+                self._discard(connection)
+                self.in_use -= 1
+                self.opening += 1
+        try:
+            connection = connect()
+        except BaseException:
+            with self._available:
+                self.opening -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            self._born[id(connection)] = time.monotonic()
+            self.created += 1
+            self.opening -= 1
+            self.in_use += 1
+        return connection
+
+    def release(self, connection, discard=False):
+        with self._available:
+            self.in_use -= 1
+            if discard or self.closed or self._expired(connection):
+                self._discard(connection)
+            else:
+                self._idle.append(connection)
+            self._available.notify()
+
+    def close(self):
+        with self._available:
+            self.closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def stats(self):
+        with self._available:
+            return {
+                "max_size": self.max_size,
+                "in_use": self.in_use,
+                "idle": len(self._idle),
+                "checkouts": self.checkouts,
+                "created": self.created,
+                "discarded": self.discarded,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": 1000 * self.wait_seconds / self.waits if self.waits else 0.0,
+                "max_wait_ms": 1000 * self.max_wait_seconds,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    # Mixed into a backend's DatabaseWrapper. With OPTIONS["pool"] set, opening
+    # a connection checks one out of the alias's pool and closing it (at the
+    # end of every request, CONN_MAX_AGE being 0) puts it back.
+
+    @property
+    def pool(self):
+        options = self.settings_dict["OPTIONS"].get("pool")
+        if not options:
+            return None
+        with _pools_lock:
+            if self.alias not in _pools:
+                _pools[self.alias] = ConnectionPool(self.alias, **({} if options is True else options))
+            return _pools[self.alias]
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        if self.pool is None:
+            return connect(conn_params)
+        return self.pool.acquire(lambda: connect(conn_params), self._ping)
+
+    def _ping(self, connection):
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except self.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+        connection, self.connection = self.connection, None
+        broken = False
+        if self.in_atomic_block or not self.autocommit:
+            # never hand the next request someone else's open transaction
+            try:
+                connection.rollback()
+            except self.Database.Error:
+                broken = True
+        self.pool.release(connection, discard=broken)
+
+    def close_if_health_check_failed(self):
+        if self.pool is None:
+            return super().close_if_health_check_failed()
+        # the pool pings connections as it hands them out
@@ -0,0 +1,140 @@
+import functools
+import logging
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.db import connections
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def query_budget(max_queries):
+    # Counts every query issued while the view (including its template render)
+    # runs. Over budget raises when QUERY_BUDGET_RAISE is on (tests, CI) and
+    # logs a warning otherwise, so production keeps serving.
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            counter = QueryCounter()
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(counter))
+                response = view_func(request, *args, **kwargs)
+
+            if counter.count > max_queries:
+                message = (
+                    f"{view_func.__name__} ran {counter.count} queries "
+                    f"(budget {max_queries}) for {request.path}"
+                )
+                if getattr(settings, "QUERY_BUDGET_RAISE", False):
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
+
+
+def conditional_get(validators, private=True):
+    # Like django.views.decorators.http.condition, but one callable returns
+    # both validators (usually from a single aggregate query) or None to skip,
+    # and async views run it off the event loop. no-cache lets clients and
+    # proxies keep the page as long as they revalidate it with us first.
+    def finish(request, response, found):
+        if response.status_code not in (200, 304):
+            return response
+        etag, last_modified = found
+        response.headers.setdefault("ETag", etag)
+        if last_modified:
+            response.headers.setdefault("Last-Modified", http_date(last_modified.timestamp()))
+        patch_cache_control(response, **{"no_cache": True, "private" if private else "public": True})
+        return response
+
+    def not_modified(request, found):
+        etag, last_modified = found
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @functools.wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view_func(request, *args, **kwargs)
+                found = await sync_to_async(validators)(request, *args, **kwargs)
+                if found is None:
+                    return await view_func(request, *args, **kwargs)
+                response = not_modified(request, found) or await view_func(request, *args, **kwargs)
+                return finish(request, response, found)
+        else:
+            @functools.wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return view_func(request, *args, **kwargs)
+                found = validators(request, *args, **kwargs)
+                if found is None:
+                    return view_func(request, *args, **kwargs)
+                response = not_modified(request, found) or view_func(request, *args, **kwargs)
+                return finish(request, response, found)
+        return wrapper
+    return decorator
+
+
+def login_required(view_func=None, json=False):
+    # Sends anonymous requests to the login page (or a 401 for json views) and
+    # sets request.user_id and request.current_user for the view. The User is
+    # only fetched if something reads current_user, and then once per request.
+    def denied(request):
+        if json:
+            return JsonResponse({"error": "Login required."}, status=401)
+        messages.error(request, "You should login first.")
+        return redirect("auth_page")
+
+    def authorize(request, user_id):
+        request.user_id = user_id
+        request.current_user = SimpleLazyObject(lambda: User.objects.filter(pk=user_id).first())
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @functools.wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                user_id = await request.session.aget("user_id")
+                if user_id is None:
+                    return denied(request)
+                authorize(request, user_id)
+                return await view_func(request, *args, **kwargs)
+        else:
+            @functools.wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                user_id = request.session.get("user_id")
+                if user_id is None:
+                    return denied(request)
+                authorize(request, user_id)
+                return view_func(request, *args, **kwargs)
+        return wrapper
+
+    if view_func is not None:
+        return decorator(view_func)
+    return decorator
@@ -0,0 +1,48 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+
+# Plan lines that mean "read the whole table" on each backend we run on.
+FULL_SCAN_PATTERNS = {
+    "sqlite": re.compile(r"\bSCAN (\w+)(?! USING (?:COVERING )?INDEX)"),
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    # id, select_type, table, partitions, type, ...
+    "mysql": re.compile(r"^\d+ \w+ (\w+) \S+ ALL ", re.M),
+}
+
+
+def key_queries():
+    from .availability import offers
+    from .models import Inventory, Pharmacy
+
+    pharmacy = Pharmacy.objects.order_by("pk").values("pk", "user_id", "city").first()
+    inventory = Inventory.objects.order_by("pk").values("medicine_id").first()
+    if pharmacy is None or inventory is None:
+        return {}
+    limit = getattr(settings, "AVAILABILITY_OFFER_LIMIT", 20)
+    return {
+        "dashboard": Pharmacy.objects.filter(user_id=pharmacy["user_id"]),
+        "pharmacy_inventory": Inventory.objects.filter(pharmacy_id=pharmacy["pk"]).select_related("medicine"),
+        "pharmacy_out_of_stock": Inventory.objects.filter(pharmacy_id=pharmacy["pk"], status="OUT"),
+        # what medicine_detail reads, through get_medicine_offers
+        "medicine_availability": offers(inventory["medicine_id"])[:limit],
+        "medicine_availability_in_city": offers(inventory["medicine_id"], pharmacy["city"])[:limit],
+        "active_pharmacies_in_city": Pharmacy.objects.active().filter(city=pharmacy["city"]),
+    }
+
+
+def full_scans(queryset):
+    plan = queryset.explain()
+    vendor = connections[queryset.db].vendor
+    pattern = FULL_SCAN_PATTERNS.get(vendor)
+    if pattern is None:
+        return plan, []
+    return plan, pattern.findall(plan)
+
+
+def assert_uses_index(queryset):
+    plan, scanned = full_scans(queryset)
+    if scanned:
+        raise AssertionError(f"Full scan of {', '.join(scanned)}:\n{plan}")
+    return plan
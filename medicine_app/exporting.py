@@ -0,0 +1,139 @@
+import csv
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from .models import Inventory
+
+# Column names match the importer's, so an export can be imported elsewhere.
+EXPORT_COLUMNS = (
+    ("pharmacy_id", "pharmacy_id"),
+    ("pharmacy", "pharmacy__name"),
+    ("city", "pharmacy__city"),
+    ("medicine_id", "medicine_id"),
+    ("name", "medicine__name"),
+    ("generic_name", "medicine__generic_name"),
+    ("form", "medicine__form"),
+    ("strength", "medicine__strength"),
+    ("description", "medicine__description"),
+    ("quantity", "quantity"),
+    ("price", "price"),
+    ("status", "status"),
+    ("updated_at", "updated_at"),
+)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+}
+FLUSH_BYTES = 64 * 1024
+
+
+def _chunk_size():
+    return getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+
+
+def export_queryset(user_id=None, pharmacy_id=None, city=None, status=None):
+    rows = Inventory.objects.filter(medicine__isnull=False, pharmacy__isnull=False)
+    if user_id is not None:
+        rows = rows.filter(pharmacy__user_id=user_id)
+    if pharmacy_id is not None:
+        rows = rows.filter(pharmacy_id=pharmacy_id)
+    if city:
+        rows = rows.filter(pharmacy__city__iexact=city)
+    if status:
+        rows = rows.filter(status=status)
+    return rows.order_by("pk")
+
+
+def iter_rows(queryset):
+    lookups = ["pk"] + [lookup for _, lookup in EXPORT_COLUMNS]
+    chunk_size = _chunk_size()
+    if connection.vendor != "mysql":
+        # server-side cursor (PostgreSQL) or fetchmany (SQLite): chunk_size rows in memory at a time
+        for row in queryset.values_list(*lookups).iterator(chunk_size=chunk_size):
+            yield row[1:]
+        return
+    # mysqlclient buffers a whole result set client-side, so walk the primary
+    # key in windows instead of holding one big cursor open
+    last = 0
+    while True:
+        window = list(queryset.filter(pk__gt=last).values_list(*lookups)[:chunk_size])
+        for row in window:
+            yield row[1:]
+        if len(window) < chunk_size:
+            return
+        last = window[-1][0]
+
+
+def _value(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, str)):
+        return value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class _Buffer:
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+
+    def drain(self):
+        data = "".join(self.parts).encode()
+        self.parts = []
+        self.size = 0
+        return data
+
+
+def iter_csv(rows):
+    buffer = _Buffer()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        writer.writerow(["" if v is None else _value(v) for v in row])
+        if buffer.size >= FLUSH_BYTES:
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def iter_jsonl(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    buffer = _Buffer()
+    for row in rows:
+        buffer.write(json.dumps(dict(zip(names, map(_value, row)))) + "\n")
+        if buffer.size >= FLUSH_BYTES:
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(queryset, fmt="csv", compress=False):
+    rows = iter_rows(queryset)
+    chunks = iter_csv(rows) if fmt == "csv" else iter_jsonl(rows)
+    return gzip_stream(chunks) if compress else chunks
+
+
+async def aiter_stream(chunks):
+    # An ASGI server drains a sync iterator into memory before sending it, so
+    # async views hand it this instead: one chunk per trip to the sync thread.
+    done = object()
+    pull = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await pull(chunks, done)) is not done:
+        yield chunk
@@ -1,5 +1,7 @@
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.urls import reverse
 from .models import User, Pharmacy, Medicine, Inventory, PASSWORD_RE
 
 class SignupForm(forms.ModelForm):
@@ -72,12 +74,41 @@ class MedicineForm(forms.ModelForm):
             raise ValidationError("Description cannot exceed 500 characters.")
         return desc
 
+class MedicineLookupWidget(forms.Widget):
+    # A search box backed by the lookup_medicine endpoint instead of a <select>
+    # with the whole catalog; only the chosen medicine is ever loaded here.
+    template_name = "widgets/medicine_lookup.html"
+
+    def __init__(self, attrs=None, pharmacy_id=None):
+        super().__init__(attrs)
+        self.pharmacy_id = pharmacy_id
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        label = ""
+        if value not in (None, "") and str(value).isdigit():
+            medicine = Medicine.objects.filter(pk=value).values("name", "strength", "form").first()
+            if medicine:
+                label = f"{medicine['name']} ({medicine['strength']}, {medicine['form']})"
+        url = reverse("lookup_medicine")
+        if self.pharmacy_id:
+            url += f"?pharmacy={self.pharmacy_id}"
+        context["widget"].update({"label": label, "lookup_url": url})
+        return context
+
+
 class InventoryForm(forms.ModelForm):
+    def __init__(self, *args, pharmacy=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if pharmacy is not None:
+            # leave out what this pharmacy already stocks
+            self.fields["medicine"].widget.pharmacy_id = pharmacy.pk
+
     class Meta:
         model = Inventory
         fields = ["medicine", "quantity", "price", "status"]
         widgets = {
-            "medicine": forms.Select(attrs={"class": "form-select"}),
+            "medicine": MedicineLookupWidget(attrs={"class": "form-control"}),
             "quantity": forms.NumberInput(attrs={"class": "form-control", "min": 0}),
             "price": forms.NumberInput(attrs={"class": "form-control", "step": "0.01", "min": 0}),
             "status": forms.Select(attrs={"class": "form-select"}),
@@ -105,4 +136,24 @@ class InventoryFormNoMedicine(forms.ModelForm):
             "status": forms.Select(attrs={"class": "form-select"}),
         }
 class InventoryEditForm(InventoryFormNoMedicine):
-    pass
\ No newline at end of file
+    # quantity the user saw when opening the form; the view applies the
+    # difference atomically instead of overwriting concurrent sales
+    original_quantity = forms.IntegerField(
+        min_value=0, widget=forms.HiddenInput,
+        error_messages={"required": "The form is out of date; reload the page and try again."},
+    )
+
+    class Meta(InventoryFormNoMedicine.Meta):
+        fields = ["quantity", "price", "status", "reorder_level"]
+
+class InventoryImportForm(forms.Form):
+    file = forms.FileField(widget=forms.ClearableFileInput(attrs={"class": "form-control", "accept": ".csv,.xlsx"}))
+
+    def clean_file(self):
+        f = self.cleaned_data.get("file")
+        if f and not f.name.lower().endswith((".csv", ".xlsx")):
+            raise ValidationError("Upload a .csv or .xlsx file.")
+        limit = settings.INVENTORY_IMPORT_MAX_BYTES
+        if f and f.size > limit:
+            raise ValidationError(f"The file is too large; split it into files under {limit // (1024 * 1024)} MB.")
+        return f
@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import bcrypt
+from django.conf import settings
+
+
+class HashingBusy(Exception):
+    pass
+
+
+class HashingService:
+    # bcrypt releases the GIL, so a small thread pool caps how many cores
+    # password hashing can take. Callers beyond max_pending are refused right
+    # away instead of queueing behind a login burst.
+
+    def __init__(self, workers=None, max_pending=None, timeout=None, rounds=None):
+        self.workers = workers or getattr(settings, "PASSWORD_HASH_WORKERS", None) or os.cpu_count() or 2
+        self.max_pending = max_pending or getattr(settings, "PASSWORD_HASH_MAX_PENDING", None) or self.workers * 4
+        self.timeout = timeout or getattr(settings, "PASSWORD_HASH_TIMEOUT", 5.0)
+        self.rounds = rounds or getattr(settings, "BCRYPT_ROUNDS", 12)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._stats_lock = threading.Lock()
+        self._dummy_hash = self._executor.submit(self._hash, "not-a-real-password")
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.in_flight = 0
+        self.wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    def _run(self, queued_at, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._stats_lock:
+                self.completed += 1
+                self.in_flight -= 1
+                self.wait_seconds += started - queued_at
+                self.hash_seconds += finished - started
+            self._slots.release()
+
+    def _submit(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise HashingBusy("Too many password operations in progress.")
+        with self._stats_lock:
+            self.submitted += 1
+            self.in_flight += 1
+        return self._executor.submit(self._run, time.perf_counter(), func, *args)
+
+    def _result(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._stats_lock:
+                self.timed_out += 1
+            raise HashingBusy("Password operation timed out.")
+
+    def _hash(self, password):
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(self.rounds)).decode()
+
+    def _check(self, password, hashed):
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+
+    def hash_password(self, password):
+        return self._result(self._submit(self._hash, password))
+
+    def check_password(self, password, hashed):
+        return self._result(self._submit(self._check, password, hashed))
+
+    def dummy_hash(self):
+        # checked against when the email is unknown, so a miss costs the same
+        # as a wrong password; hashed in the pool when the service starts
+        return self._result(self._dummy_hash)
+
+    def needs_rehash(self, hashed):
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "rounds": self.rounds,
+                "in_flight": self.in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_wait_ms": 1000 * self.wait_seconds / self.completed if self.completed else 0.0,
+                "avg_hash_ms": 1000 * self.hash_seconds / self.completed if self.completed else 0.0,
+            }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_hashing_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = HashingService()
+    return _service
@@ -0,0 +1,64 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import changefeed
+from .models import InventoryChange, Medicine, Pharmacy, PriceHistory, Watermark
+
+# Price history is folded from the InventoryChange log after the fact, so the
+# inventory write path pays for nothing beyond the log row it already writes.
+# Each batch re-reads the current offers of the medicines it touched and
+# stores them as today's close, whatever day the changes were made: the log
+# is pruned, so past days cannot be rebuilt and are left to repeat the last
+# close recorded before them. Today's in-stock prices in the batch widen the
+# day's low/high, so a price that came and went between runs still shows.
+# Run it often enough (see --loop) that every day with changes gets its own
+# close.
+
+WATERMARK = "price_history"
+
+
+def record_batch(batch_size=5000):
+    upto = changefeed.tracker.safe_sequence()
+    with transaction.atomic():
+        mark, _ = Watermark.objects.select_for_update().get_or_create(name=WATERMARK)
+        changes = list(
+            InventoryChange.objects.filter(id__gt=mark.position, id__lte=upto, medicine_id__isnull=False)
+            .order_by("id")
+            .values_list("id", "medicine_id", "pharmacy_id", "quantity", "price", "status", "created_at")[:batch_size]
+        )
+        if not changes:
+            return 0
+        today = timezone.localdate()
+        touched = {change[1] for change in changes}
+        active = set(
+            Pharmacy.objects.active().filter(pk__in={change[2] for change in changes}).values_list("pk", flat=True)
+        )
+        extremes = defaultdict(list)
+        for _, medicine_id, pharmacy_id, quantity, price, status, created_at in changes:
+            # an offer that was on sale at some point today
+            on_sale = status == "IN" and quantity and price is not None and pharmacy_id in active
+            if on_sale and timezone.localdate(created_at) == today:
+                extremes[medicine_id].append(price)
+        existing = Medicine.objects.filter(pk__in=touched).values_list("pk", flat=True)
+        PriceHistory.objects.snapshot({pk: today for pk in existing}, extremes)
+        mark.position = changes[-1][0]
+        mark.save(update_fields=["position", "updated_at"])
+    return len(changes)
+
+
+def record_pending(batch_size=5000):
+    total = 0
+    while True:
+        recorded = record_batch(batch_size)
+        total += recorded
+        if recorded < batch_size:
+            return total
+
+
+def snapshot_all(chunk_size=2000):
+    # baseline for every medicine, e.g. before the first run
+    today = timezone.localdate()
+    ids = Medicine.objects.order_by("pk").values_list("pk", flat=True)
+    PriceHistory.objects.snapshot({pk: today for pk in ids.iterator(chunk_size=chunk_size)}, chunk_size=chunk_size)
@@ -0,0 +1,267 @@
+import codecs
+import csv
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+
+from .autocomplete import get_autocomplete_index
+from .cache import invalidate_medicines
+from .models import (
+    FORM_CHOICES, MEDICINE_NAME_RE, STRENGTH_RE, Availability, Inventory, InventoryChange, Medicine,
+    PharmacyStockSummary, medicine_key,
+)
+from .search import get_search_backend
+
+REQUIRED_COLUMNS = ("name", "form", "strength", "quantity", "price")
+FORMS = {value.lower(): value for value, _ in FORM_CHOICES}
+DEFAULT_BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: int = 0
+    medicines_created: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _normalize_header(header):
+    return [(h or "").strip().lower().replace(" ", "_") for h in header]
+
+
+def _check_header(header):
+    missing = [c for c in REQUIRED_COLUMNS if c not in header]
+    if missing:
+        raise ImportFormatError(f"Missing column(s): {', '.join(missing)}.")
+
+
+def iter_csv_rows(fileobj):
+    # decode incrementally so an uploaded file is never read into memory whole
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = codecs.getreader("utf-8-sig")(fileobj)
+    reader = csv.reader(fileobj)
+    header = _normalize_header(next(reader, []))
+    _check_header(header)
+    for line, values in enumerate(reader, start=2):
+        if any(values):
+            yield line, dict(zip(header, values))
+
+
+def iter_xlsx_rows(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("Excel import requires openpyxl to be installed.")
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _normalize_header([str(v) if v is not None else "" for v in next(rows, ())])
+        _check_header(header)
+        for line, values in enumerate(rows, start=2):
+            if any(v not in (None, "") for v in values):
+                yield line, {
+                    h: ("" if v is None else str(v)) for h, v in zip(header, values)
+                }
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    name = (filename or "").lower()
+    if name.endswith((".xlsx", ".xlsm")):
+        return iter_xlsx_rows(fileobj)
+    if name.endswith(".csv") or not name:
+        return iter_csv_rows(fileobj)
+    raise ImportFormatError("Unsupported file type; upload a .csv or .xlsx file.")
+
+
+MAX_QUANTITY = 2**31 - 1
+MAX_PRICE = Decimal("1e8")
+CENTS = Decimal("0.01")
+NAME_MAX_LENGTH = Medicine._meta.get_field("name").max_length
+GENERIC_NAME_MAX_LENGTH = Medicine._meta.get_field("generic_name").max_length
+STRENGTH_MAX_LENGTH = Medicine._meta.get_field("strength").max_length
+
+
+def _decimal(value):
+    # None for anything that is not a finite number ("", "abc", "NaN", "Infinity")
+    try:
+        number = Decimal((value or "").strip())
+    except InvalidOperation:
+        return None
+    return number if number.is_finite() else None
+
+
+def _clean_row(row):
+    name = (row.get("name") or "").strip()
+    generic_name = (row.get("generic_name") or "").strip() or None
+    form = FORMS.get((row.get("form") or "").strip().lower())
+    strength = (row.get("strength") or "").strip()
+
+    if len(name) > NAME_MAX_LENGTH:
+        raise ValueError(f"Medicine name cannot exceed {NAME_MAX_LENGTH} characters.")
+    if not MEDICINE_NAME_RE.match(name):
+        raise ValueError("Invalid medicine name.")
+    if generic_name and len(generic_name) > GENERIC_NAME_MAX_LENGTH:
+        raise ValueError(f"Generic name cannot exceed {GENERIC_NAME_MAX_LENGTH} characters.")
+    if generic_name and not MEDICINE_NAME_RE.match(generic_name):
+        raise ValueError("Invalid generic name.")
+    if form is None:
+        raise ValueError("Invalid form.")
+    if len(strength) > STRENGTH_MAX_LENGTH or not STRENGTH_RE.match(strength):
+        raise ValueError("Invalid strength format (e.g., '500mg').")
+
+    quantity = _decimal(row.get("quantity"))
+    if quantity is None or quantity != quantity.to_integral_value():
+        raise ValueError("Quantity must be a whole number.")
+    if quantity < 0:
+        raise ValueError("Quantity cannot be negative.")
+    if quantity > MAX_QUANTITY:
+        raise ValueError("Quantity is too large.")
+    quantity = int(quantity)
+    price = _decimal(row.get("price"))
+    if price is None:
+        raise ValueError("Price must be a number.")
+    if price < 0:
+        raise ValueError("Price must be positive.")
+    # compared before rounding as well: quantize() cannot round 1e400 to cents
+    if price >= MAX_PRICE or price.quantize(CENTS) >= MAX_PRICE:
+        raise ValueError("Price is too large.")
+    price = price.quantize(CENTS)
+
+    status = (row.get("status") or "").strip().upper() or ("IN" if quantity > 0 else "OUT")
+    if quantity == 0 and status != "OUT":
+        raise ValueError("If quantity = 0, status must be OUT.")
+    if quantity > 0 and status != "IN":
+        raise ValueError("If quantity > 0, status must be IN.")
+
+    description = (row.get("description") or "").strip() or None
+    if description and len(description) > 500:
+        raise ValueError("Description cannot exceed 500 characters.")
+
+    return {
+        "key": (name, strength, form),
+        "generic_name": generic_name,
+        "description": description,
+        "quantity": quantity,
+        "price": price,
+        "status": status,
+    }
+
+
+def _existing_medicine_ids(keys):
+    found = {}
+    # reuse an existing catalog entry (any owner, oldest wins) before creating a copy
+    rows = Medicine.objects.filter(canonical_key__in=keys).order_by("-id")
+    for pk, key in rows.values_list("id", "canonical_key"):
+        found[key] = pk
+    return found
+
+
+def _import_batch(batch, pharmacy, user, result):
+    cleaned = {}
+    for line, row in batch:
+        try:
+            data = _clean_row(row)
+        except ValueError as e:
+            result.add_error(line, str(e))
+            continue
+        # later rows for the same medicine win, as they would one by one
+        cleaned[medicine_key(*data["key"])] = data
+    if not cleaned:
+        return
+
+    new_medicines = []
+    with transaction.atomic():
+        medicine_ids = _existing_medicine_ids(cleaned.keys())
+        missing = [key for key in cleaned if key not in medicine_ids]
+        if missing:
+            Medicine.objects.bulk_create(
+                [
+                    Medicine(
+                        name=cleaned[key]["key"][0], strength=cleaned[key]["key"][1], form=cleaned[key]["key"][2],
+                        created_by=user, canonical_key=key,
+                        generic_name=cleaned[key]["generic_name"],
+                        description=cleaned[key]["description"],
+                    )
+                    for key in missing
+                ],
+                ignore_conflicts=True,
+            )
+            created = list(Medicine.objects.filter(
+                created_by=user, canonical_key__in=missing
+            ).only("id", "name", "generic_name", "strength", "form", "canonical_key", "updated_at"))
+            for med in created:
+                if med.canonical_key not in medicine_ids:
+                    medicine_ids[med.canonical_key] = med.id
+                    new_medicines.append(med)
+
+        rows = [
+            Inventory(
+                pharmacy=pharmacy,
+                medicine_id=medicine_ids[key],
+                quantity=data["quantity"],
+                price=data["price"],
+                status=data["status"],
+            )
+            for key, data in cleaned.items()
+        ]
+        options = {
+            "update_conflicts": True,
+            "update_fields": ["quantity", "price", "status", "updated_at"],
+        }
+        if connection.features.supports_update_conflicts_with_target:
+            options["unique_fields"] = ["medicine", "pharmacy"]
+        batch_medicine_ids = [medicine_ids[key] for key in cleaned]
+        stocked = set(
+            Inventory.objects.filter(pharmacy=pharmacy, medicine_id__in=batch_medicine_ids)
+            .values_list("medicine_id", flat=True)
+        )
+        Inventory.objects.bulk_create(rows, batch_size=len(rows), **options)
+        InventoryChange.objects.capture(
+            lambda row: "update" if row[1] in stocked else "insert",
+            pharmacy=pharmacy, medicine_id__in=batch_medicine_ids,
+        )
+        Availability.objects.refresh(pharmacy=pharmacy, medicine_id__in=batch_medicine_ids)
+        PharmacyStockSummary.objects.refresh(pharmacy.pk)
+        invalidate_medicines(batch_medicine_ids)
+    result.imported += len(rows)
+    result.medicines_created += len(new_medicines)
+
+    # bulk_create sends no post_save, so feed the search indexes directly
+    get_search_backend().index_many(new_medicines)
+    get_autocomplete_index().add_many(new_medicines)
+
+
+def import_inventory(fileobj, filename, pharmacy, user, batch_size=DEFAULT_BATCH_SIZE):
+    result = ImportResult()
+    started = time.perf_counter()
+    batch = []
+    for line, row in iter_rows(fileobj, filename):
+        result.rows += 1
+        batch.append((line, row))
+        if len(batch) >= batch_size:
+            _import_batch(batch, pharmacy, user, result)
+            batch = []
+    if batch:
+        _import_batch(batch, pharmacy, user, result)
+    result.seconds = time.perf_counter() - started
+    return result
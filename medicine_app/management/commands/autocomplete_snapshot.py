@@ -0,0 +1,24 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from medicine_app.autocomplete import get_autocomplete_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the medicine autocomplete index and write the warm-start snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=None, help="Snapshot file (defaults to MEDICINE_AUTOCOMPLETE_SNAPSHOT).")
+
+    def handle(self, *args, **options):
+        path = options["path"] or settings.MEDICINE_AUTOCOMPLETE_SNAPSHOT
+        index = get_autocomplete_index()
+        started = time.perf_counter()
+        index.rebuild()
+        written = index.save_snapshot(path)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} medicines to {path} in {elapsed:.2f}s"
+        ))
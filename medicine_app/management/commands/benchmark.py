@@ -0,0 +1,325 @@
+import json
+import platform
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from medicine_app import urls
+from medicine_app.benchmarking import SYNTHETIC_PASSWORD, summarize
+from medicine_app.models import Inventory, Medicine, Pharmacy, StockReservation, User
+from medicine_app.sessions import session_store
+
+# One scenario per URL name (some names have a GET and a POST variant, as
+# "name:variant"). build(ctx) returns (method, path, data) and runs inside the
+# measured request's transaction but outside the timer, so it can create the
+# row a request is about to delete. Scenarios that write are rolled back
+# after every request, so repeated runs see the same data.
+
+READ, WRITE = False, True
+
+# A read answers 200 and a form post redirects (302) when it works; these
+# answer otherwise. Any other status (a redirect to the login page because
+# the session was not accepted, a 500) is counted and fails the run.
+EXPECTED_STATUS = {
+    "adjust_stock": 200,
+    "reserve_stock": 201,
+    "confirm_reservation": 200,
+    "release_reservation": 200,
+}
+
+
+class Context:
+    def __init__(self, client, user, keyword, password):
+        self.client = client
+        self.user = user
+        self.keyword = keyword
+        self.password = password
+        self.pharmacy = (
+            Pharmacy.objects.filter(user=user, inventory__quantity__gt=1).order_by("id").first()
+        )
+        if self.pharmacy is None:
+            raise CommandError(f"User {user.email} has no pharmacy with stock to benchmark against.")
+        self.inventory = Inventory.objects.filter(pharmacy=self.pharmacy, quantity__gt=1).order_by("id").first()
+        self.medicine_ids = list(
+            Inventory.objects.filter(status="IN").order_by("medicine_id")
+            .values_list("medicine_id", flat=True).distinct()[:3]
+        )
+        self.session_key = self.new_session()
+        self.counter = 0
+
+    def new_session(self):
+        # whatever SESSION_ENGINE is configured; save() also gives a signed
+        # cookie session its key
+        session = session_store()()
+        session["user_id"] = self.user.pk
+        session.save()
+        return session.session_key
+
+    def throwaway_session(self):
+        # for requests that flush or cycle the session they are given
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = self.new_session()
+
+    def unique(self):
+        self.counter += 1
+        return self.counter
+
+    def medicine_not_stocked(self):
+        return Medicine.objects.exclude(inventory__pharmacy=self.pharmacy).order_by("id").first()
+
+    def scratch_pharmacy(self):
+        n = self.unique()
+        return Pharmacy.objects.create(
+            user=self.user, name=f"Bench Scratch {n}", city="Amman", address="1 Bench St",
+            phone="+962790000000", cr_number=f"BENCH-SCRATCH-{n}",
+        )
+
+
+def _pharmacy_form(n):
+    return {
+        "name": f"Bench Pharmacy {n}", "city": "Amman", "address": "1 Bench St",
+        "phone": "+962790000000", "cr_number": f"BENCH-NEW-{n}", "is_active": "on",
+    }
+
+
+def _import_file(ctx):
+    rows = ["name,form,strength,quantity,price"] + [
+        f"Benchimport {ctx.unique()},Tablet,500mg,{10 + i},{1 + i}.50" for i in range(20)
+    ]
+    return {"file": SimpleUploadedFile("bench.csv", "\n".join(rows).encode(), "text/csv")}
+
+
+def _add_inventory(ctx):
+    medicine = ctx.medicine_not_stocked()
+    if medicine is None:
+        raise CommandError("Every medicine is already stocked by the benchmark pharmacy.")
+    return "post", reverse("add_inventory", args=[ctx.pharmacy.pk]), {
+        "form_type": "existing", "medicine": medicine.pk, "quantity": 5, "price": "9.99", "status": "IN",
+    }
+
+
+def _edit_inventory(ctx):
+    inv = ctx.inventory
+    return "post", reverse("edit_inventory", args=[inv.pk]), {
+        "quantity": inv.quantity - 1, "original_quantity": inv.quantity,
+        "price": inv.price, "status": "IN",
+    }
+
+
+def _login(ctx):
+    # login cycles the session key, and a cache-backed store's delete of the
+    # old key is not undone by the rollback
+    ctx.throwaway_session()
+    return "post", reverse("auth_page"), {
+        "form_type": "login", "email": ctx.user.email, "password": ctx.password,
+    }
+
+
+def _logout(ctx):
+    ctx.throwaway_session()
+    return "get", reverse("logout"), {}
+
+
+def _reservation(ctx, action):
+    reservation = Inventory.objects.reserve(ctx.inventory.pk, 1)
+    return "post", reverse(f"{action}_reservation", args=[reservation.pk]), {}
+
+
+SCENARIOS = {
+    "search_medicine": (READ, lambda ctx: ("get", reverse("search_medicine"), {"keyword": ctx.keyword})),
+    "auth_page": (READ, lambda ctx: ("get", reverse("auth_page"), {})),
+    "auth_page:login": (WRITE, _login),
+    "logout": (WRITE, _logout),
+    "dashboard": (READ, lambda ctx: ("get", reverse("dashboard"), {})),
+    "add_pharmacy": (READ, lambda ctx: ("get", reverse("add_pharmacy"), {})),
+    "add_pharmacy:post": (WRITE, lambda ctx: ("post", reverse("add_pharmacy"), _pharmacy_form(ctx.unique()))),
+    "edit_pharmacy": (READ, lambda ctx: ("get", reverse("edit_pharmacy", args=[ctx.pharmacy.pk]), {})),
+    "edit_pharmacy:post": (WRITE, lambda ctx: (
+        "post", reverse("edit_pharmacy", args=[ctx.pharmacy.pk]),
+        {**_pharmacy_form(0), "name": ctx.pharmacy.name, "cr_number": ctx.pharmacy.cr_number},
+    )),
+    "delete_pharmacy": (WRITE, lambda ctx: ("post", reverse("delete_pharmacy", args=[ctx.scratch_pharmacy().pk]), {})),
+    "pharmacy_inventory": (READ, lambda ctx: ("get", reverse("pharmacy_inventory", args=[ctx.pharmacy.pk]), {})),
+    "add_inventory": (WRITE, _add_inventory),
+    "import_inventory": (WRITE, lambda ctx: ("post", reverse("import_inventory", args=[ctx.pharmacy.pk]), _import_file(ctx))),
+    "export_inventory": (READ, lambda ctx: ("get", reverse("export_inventory"), {"pharmacy": ctx.pharmacy.pk})),
+    "edit_inventory": (WRITE, _edit_inventory),
+    "delete_inventory": (WRITE, lambda ctx: ("post", reverse("delete_inventory", args=[ctx.inventory.pk]), {})),
+    "adjust_stock": (WRITE, lambda ctx: ("post", reverse("adjust_stock", args=[ctx.inventory.pk]), {"delta": -1})),
+    "reserve_stock": (WRITE, lambda ctx: ("post", reverse("reserve_stock", args=[ctx.inventory.pk]), {"quantity": 1})),
+    "confirm_reservation": (WRITE, lambda ctx: _reservation(ctx, "confirm")),
+    "release_reservation": (WRITE, lambda ctx: _reservation(ctx, "release")),
+    "medicine_detail": (READ, lambda ctx: ("get", reverse("medicine_detail", args=[ctx.inventory.medicine_id]), {})),
+    "search_medicine_api": (READ, lambda ctx: ("get", reverse("search_medicine_api"), {"keyword": ctx.keyword})),
+    "availability_api": (READ, lambda ctx: ("get", reverse("availability_api"), {"medicine": ctx.medicine_ids})),
+    "lookup_medicine": (READ, lambda ctx: (
+        "get", reverse("lookup_medicine"), {"q": ctx.keyword, "pharmacy": ctx.pharmacy.pk},
+    )),
+    "price_history_api": (READ, lambda ctx: (
+        "get", reverse("price_history_api", args=[ctx.inventory.medicine_id]), {"days": 90},
+    )),
+    "inventory_changes": (READ, lambda ctx: (
+        "get", reverse("inventory_changes"), {"pharmacy": ctx.pharmacy.pk, "after": 0},
+    )),
+    "autocomplete_medicine": (READ, lambda ctx: ("get", reverse("autocomplete_medicine"), {"q": ctx.keyword[:3]})),
+    "profiling_stats": (READ, lambda ctx: ("get", reverse("profiling_stats"), {})),
+}
+
+
+def drain(response):
+    # a streaming body is produced while it is read, so read it inside the timer
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every URL in medicine_app.urls through the test client and print "
+        "throughput and latency percentiles per URL as JSON. With --baseline, "
+        "fail when a URL's p95 regressed by more than --max-regression."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Measured requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per scenario.")
+        parser.add_argument("--keyword", default="para")
+        parser.add_argument("--email", help="User to benchmark as; defaults to the owner of the first inventory row.")
+        parser.add_argument("--password", default=SYNTHETIC_PASSWORD)
+        parser.add_argument("--only", nargs="*", help="Scenario names to run.")
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+        parser.add_argument("--baseline", help="Earlier JSON report to compare against.")
+        parser.add_argument("--max-regression", type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        names = {p.name for p in urls.urlpatterns if p.name}
+        covered = {name.partition(":")[0] for name in SCENARIOS}
+        if names - covered:
+            raise CommandError(f"No benchmark scenario for: {', '.join(sorted(names - covered))}.")
+
+        selected = options["only"] or list(SCENARIOS)
+        unknown = set(selected) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}.")
+
+        client = Client(raise_request_exception=False)
+        ctx = Context(client, self.benchmark_user(options["email"]), options["keyword"], options["password"])
+        headers = {}
+        if getattr(settings, "PROFILING_STATS_TOKEN", None):
+            headers["X-Stats-Token"] = settings.PROFILING_STATS_TOKEN
+
+        expected = dict(EXPECTED_STATUS, profiling_stats=200 if headers else 404)
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name in selected:
+                writes, build = SCENARIOS[name]
+                status_ok = expected.get(name, 302 if writes else 200)
+                for _ in range(options["warmup"]):
+                    self.request(client, ctx, writes, build, headers)
+                samples = []
+                statuses = Counter()
+                started = time.perf_counter()
+                for _ in range(options["requests"]):
+                    elapsed, status = self.request(client, ctx, writes, build, headers)
+                    samples.append(elapsed)
+                    statuses[status] += 1
+                wall = time.perf_counter() - started
+                errors = sum(count for status, count in statuses.items() if status >= 500)
+                results[name] = {
+                    **summarize(samples, wall, errors),
+                    "statuses": {str(s): c for s, c in sorted(statuses.items())},
+                    "unexpected": sum(count for status, count in statuses.items() if status != status_ok),
+                }
+
+        report = {"meta": self.meta(options), "results": results}
+        output = json.dumps(report, indent=2)
+        self.stdout.write(output)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        failed = sorted(name for name, result in results.items() if result["unexpected"])
+        if failed:
+            raise CommandError(f"Unexpected status codes for: {', '.join(failed)}.")
+        if options["baseline"]:
+            self.compare(results, options["baseline"], options["max_regression"])
+
+    def benchmark_user(self, email):
+        if email:
+            user = User.objects.filter(email=email.lower()).first()
+        else:
+            inventory = Inventory.objects.select_related("pharmacy__user").order_by("id").first()
+            user = inventory.pharmacy.user if inventory else None
+        if user is None:
+            raise CommandError("No user to benchmark as; run generate_data first.")
+        return user
+
+    def request(self, client, ctx, writes, build, headers):
+        client.cookies[settings.SESSION_COOKIE_NAME] = ctx.session_key
+        if not writes:
+            method, path, data = build(ctx)
+            started = time.perf_counter()
+            response = getattr(client, method)(path, data, headers=headers)
+            drain(response)
+            return time.perf_counter() - started, response.status_code
+
+        with transaction.atomic():
+            method, path, data = build(ctx)
+            started = time.perf_counter()
+            response = getattr(client, method)(path, data, headers=headers)
+            drain(response)
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return elapsed, response.status_code
+
+    def meta(self, options):
+        return {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "async_views": settings.MEDICINE_ASYNC_VIEWS,
+            "requests_per_scenario": options["requests"],
+            "rows": {
+                "users": User.objects.count(),
+                "pharmacies": Pharmacy.objects.count(),
+                "medicines": Medicine.objects.count(),
+                "inventory": Inventory.objects.count(),
+                "reservations": StockReservation.objects.count(),
+            },
+        }
+
+    def compare(self, results, path, max_regression):
+        with open(path) as f:
+            baseline = json.load(f)["results"]
+        regressions = []
+        for name, current in results.items():
+            before = baseline.get(name)
+            if not before or not before["p95_ms"]:
+                continue
+            change = current["p95_ms"] / before["p95_ms"] - 1
+            if change > max_regression:
+                regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms (+{change:.0%})")
+        if regressions:
+            raise CommandError("Regressions against baseline:\n" + "\n".join(regressions))
+        self.stderr.write(self.style.SUCCESS(f"No p95 regressions over {max_regression:.0%} against {path}."))
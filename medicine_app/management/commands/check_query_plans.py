@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from medicine_app.explain import full_scans, key_queries
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot view queries and fail if any of them does a full table scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not just failures.")
+
+    def handle(self, *args, **options):
+        queries = key_queries()
+        if not queries:
+            raise CommandError("Need at least one pharmacy and one inventory row to explain against.")
+
+        failed = []
+        for name, queryset in queries.items():
+            plan, scanned = full_scans(queryset)
+            if scanned:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}: full scan of {', '.join(scanned)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{name}: ok"))
+            if scanned or options["verbose_plans"]:
+                self.stdout.write(plan)
+        if failed:
+            raise CommandError(f"{len(failed)} queries do full table scans: {', '.join(failed)}")
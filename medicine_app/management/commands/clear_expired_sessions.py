@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from medicine_app.sessions import clear_expired
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions in batches (database-backed session stores)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--pause", type=float, default=0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        deleted = clear_expired(batch_size=options["batch_size"], pause=options["pause"])
+        if deleted is None:
+            self.stdout.write("This session store expires sessions itself; nothing to delete")
+        else:
+            self.stdout.write(f"Deleted {deleted} expired sessions")
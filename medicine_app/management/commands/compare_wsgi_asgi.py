@@ -0,0 +1,122 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from medicine_app.benchmarking import summarize
+from medicine_app.models import Inventory
+from medicine_app.sessions import session_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the read paths through Django's WSGI and ASGI handlers "
+        "(sync views vs medicine_app.async_views) and print JSON results."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per path.")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--keyword", default="para")
+        parser.add_argument("--mode", choices=["wsgi", "asgi"], help="Run one side only, in this process.")
+
+    def handle(self, *args, **options):
+        if options["mode"]:
+            result = self.run_mode(options)
+            self.stdout.write(json.dumps(result))
+            return
+
+        results = {}
+        for mode, flag in (("wsgi", "0"), ("asgi", "1")):
+            # the URLconf picks sync or async read views at import time, so
+            # each side runs in its own interpreter
+            env = dict(os.environ, MEDICINE_ASYNC_VIEWS=flag)
+            cmd = [
+                sys.executable, sys.argv[0], "compare_wsgi_asgi", "--mode", mode,
+                "--requests", str(options["requests"]),
+                "--concurrency", str(options["concurrency"]),
+                "--keyword", options["keyword"],
+            ]
+            proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            if proc.returncode:
+                raise CommandError(proc.stderr)
+            results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def paths(self, keyword):
+        inventory = Inventory.objects.select_related("pharmacy").order_by("id").first()
+        if inventory is None:
+            raise CommandError("No inventory rows to benchmark against.")
+        session = session_store()()
+        session["user_id"] = inventory.pharmacy.user_id
+        session.save()
+        paths = {
+            "search_medicine": f"/?keyword={keyword}",
+            "medicine_detail": f"/medicine/{inventory.medicine_id}/",
+            "dashboard": "/dashboard/",
+        }
+        return paths, session.session_key
+
+    def run_mode(self, options):
+        paths, session_key = self.paths(options["keyword"])
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        results = {}
+        with override_settings(ALLOWED_HOSTS=hosts):
+            for name, path in paths.items():
+                if options["mode"] == "wsgi":
+                    results[name] = self.run_wsgi(path, session_key, options)
+                else:
+                    results[name] = asyncio.run(self.run_asgi(path, session_key, options))
+        return results
+
+    def report(self, path, samples, wall):
+        # every path is a logged-in read: anything but a 200 (a redirect to
+        # the login page because the session was not accepted, a 500) means
+        # the timings are not of the page being compared
+        unexpected = sorted({status for _, status in samples if status != 200})
+        if unexpected:
+            raise CommandError(f"{path} answered {', '.join(map(str, unexpected))} instead of 200.")
+        return summarize([elapsed for elapsed, _ in samples], wall, 0)
+
+    def run_wsgi(self, path, session_key, options):
+        local = threading.local()
+
+        def one(_):
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = Client(raise_request_exception=False)
+                client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+            started = time.perf_counter()
+            response = client.get(path)
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            samples = list(pool.map(one, range(options["requests"])))
+        wall = time.perf_counter() - started
+        return self.report(path, samples, wall)
+
+    async def run_asgi(self, path, session_key, options):
+        gate = asyncio.Semaphore(options["concurrency"])
+
+        async def one():
+            async with gate:
+                client = AsyncClient(raise_request_exception=False)
+                client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+                started = time.perf_counter()
+                response = await client.get(path)
+                return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        samples = await asyncio.gather(*(one() for _ in range(options["requests"])))
+        wall = time.perf_counter() - started
+        return self.report(path, samples, wall)
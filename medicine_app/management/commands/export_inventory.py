@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from medicine_app.exporting import FORMATS, export_queryset, export_stream
+
+
+class Command(BaseCommand):
+    help = "Stream Inventory joined with Medicine and Pharmacy as CSV or JSONL, optionally gzipped."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--output", help="File to write; defaults to stdout.")
+        parser.add_argument("--user", type=int, help="Only this owner's pharmacies.")
+        parser.add_argument("--pharmacy", type=int)
+        parser.add_argument("--city")
+        parser.add_argument("--status", choices=["IN", "OUT"])
+
+    def handle(self, *args, **options):
+        rows = export_queryset(
+            user_id=options["user"], pharmacy_id=options["pharmacy"],
+            city=options["city"], status=options["status"],
+        )
+        chunks = export_stream(rows, options["format"], options["gzip"])
+        if options["output"]:
+            with open(options["output"], "wb") as out:
+                written = sum(out.write(chunk) for chunk in chunks)
+            self.stderr.write(self.style.SUCCESS(f"wrote {written} bytes to {options['output']}"))
+        else:
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
@@ -0,0 +1,174 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from medicine_app.benchmarking import SYNTHETIC_PASSWORD
+from medicine_app.cache import invalidate_pharmacies
+from medicine_app.hashing import get_hashing_service
+from medicine_app.models import (
+    FORM_CHOICES, Availability, Inventory, InventoryChange, Medicine, Pharmacy, PharmacyStockSummary, User,
+    medicine_key,
+)
+from medicine_app.search import get_search_backend
+
+FIRST_NAMES = ["Ahmed", "Sara", "Omar", "Lina", "Yousef", "Maya", "Khaled", "Noor", "Rami", "Dana", "Hadi", "Rana"]
+LAST_NAMES = ["Haddad", "Khalil", "Nasser", "Saleh", "Mansour", "Aziz", "Hamdan", "Odeh", "Barakat", "Jaber"]
+CITIES = ["Amman", "Irbid", "Zarqa", "Aqaba", "Salt", "Madaba", "Jerash", "Ajloun", "Karak", "Mafraq"]
+STREETS = ["King Abdullah St", "Rainbow St", "University St", "Mecca St", "Garden St", "Airport Rd"]
+PREFIXES = ["Amo", "Para", "Ibu", "Ceto", "Lora", "Metro", "Clari", "Dexa", "Flu", "Omep", "Panto", "Ator", "Losa", "Vale", "Cipro", "Azi"]
+MIDDLES = ["xi", "ce", "pro", "ri", "ta", "zo", "mi", "va", "lo", "ne", "ti", "ra"]
+SUFFIXES = ["cillin", "tamol", "fen", "zine", "dine", "nidazole", "mycin", "sone", "conazole", "prazole", "statin", "sartan", "floxacin", "mab"]
+STRENGTHS = {
+    "Tablet": ["5mg", "10mg", "20mg", "50mg", "100mg", "250mg", "500mg", "1g"],
+    "Capsule": ["10mg", "20mg", "40mg", "250mg", "500mg"],
+    "Syrup": ["5ml", "100ml", "120ml", "125mg", "250mg"],
+    "Injection": ["1ml", "2ml", "5ml", "500mcg", "1000IU"],
+}
+FORMS = [value for value, _ in FORM_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic users, pharmacies, medicines and inventory "
+        "for benchmarking. Every generated user logs in with the password in "
+        "medicine_app.benchmarking.SYNTHETIC_PASSWORD."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--pharmacies-per-user", type=int, default=3)
+        parser.add_argument("--medicines", type=int, default=5000)
+        parser.add_argument("--density", type=float, default=0.2, help="Fraction of all medicines each pharmacy stocks.")
+        parser.add_argument("--out-of-stock", type=float, default=0.1, help="Fraction of inventory rows with no stock.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--label", default="bench", help="Tag for generated emails and CR numbers.")
+        parser.add_argument("--flush", action="store_true", help="Delete data generated earlier with this label first.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["pharmacies_per_user"] < 0 or options["medicines"] < 0:
+            raise CommandError("--users must be positive; other counts cannot be negative.")
+        if not 0 <= options["density"] <= 1 or not 0 <= options["out_of_stock"] <= 1:
+            raise CommandError("--density and --out-of-stock are fractions between 0 and 1.")
+
+        label = options["label"].lower()
+        if not label.isalnum():
+            raise CommandError("--label must be alphanumeric.")
+        generated = User.objects.filter(email__endswith=f"@{label}.example.com")
+        if options["flush"]:
+            deleted, _ = generated.delete()
+            self.stdout.write(f"deleted {deleted} rows from an earlier run")
+        elif generated.exists():
+            raise CommandError(f"Data labelled '{label}' already exists; pass --flush or another --label.")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        started = time.perf_counter()
+
+        users = self.create_users(label, options["users"])
+        pharmacies = self.create_pharmacies(label, users, options["pharmacies_per_user"])
+        medicine_ids = self.create_medicines(users, options["medicines"])
+        rows = self.create_inventory(pharmacies, medicine_ids, options["density"], options["out_of_stock"])
+
+        # bulk_create sends no signals, so bring the derived tables along by hand
+        pharmacy_ids = [p.pk for p in pharmacies]
+        for i in range(0, len(pharmacy_ids), 100):
+            Availability.objects.refresh(pharmacy_id__in=pharmacy_ids[i:i + 100])
+            InventoryChange.objects.capture("insert", pharmacy_id__in=pharmacy_ids[i:i + 100])
+        PharmacyStockSummary.objects.reconcile(fix=True)
+        invalidate_pharmacies()
+        get_search_backend().rebuild()
+        get_search_backend().invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"created {len(users)} users, {len(pharmacies)} pharmacies, {len(medicine_ids)} medicines "
+            f"and {rows} inventory rows in {time.perf_counter() - started:.1f}s "
+            f"(password: {SYNTHETIC_PASSWORD})"
+        ))
+
+    def create_users(self, label, count):
+        # one bcrypt hash shared by everyone; hashing per user would dominate the run
+        password = get_hashing_service().hash_password(SYNTHETIC_PASSWORD)
+        User.objects.bulk_create([
+            User(
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                email=f"user{n}@{label}.example.com",
+                password=password,
+            )
+            for n in range(count)
+        ], batch_size=self.batch_size)
+        return list(User.objects.filter(email__endswith=f"@{label}.example.com").order_by("id"))
+
+    def create_pharmacies(self, label, users, per_user):
+        pharmacies = []
+        for user in users:
+            for n in range(per_user):
+                pharmacies.append(Pharmacy(
+                    user=user,
+                    name=f"{user.last_name} Pharmacy {n + 1}",
+                    city=self.rng.choice(CITIES),
+                    address=f"{self.rng.randint(1, 400)} {self.rng.choice(STREETS)}",
+                    phone=f"+9627{self.rng.randint(10000000, 99999999)}",
+                    # mostly active, like the real catalog
+                    is_active=self.rng.random() < 0.95,
+                    cr_number=f"{label.upper()}-{user.pk}-{n + 1}",
+                ))
+        Pharmacy.objects.bulk_create(pharmacies, batch_size=self.batch_size)
+        return list(Pharmacy.objects.filter(user__in=users).order_by("id"))
+
+    def medicine_name(self):
+        name = self.rng.choice(PREFIXES) + self.rng.choice(MIDDLES) + self.rng.choice(SUFFIXES)
+        if self.rng.random() < 0.3:
+            name += " " + self.rng.choice(["Forte", "Plus", "XR", "Junior", "Max"])
+        return name
+
+    def create_medicines(self, users, count):
+        seen = set()
+        medicines = []
+        attempts = 0
+        while len(medicines) < count:
+            attempts += 1
+            form = self.rng.choice(FORMS)
+            key = (self.medicine_name(), self.rng.choice(STRENGTHS[form]), form)
+            if key in seen:
+                # the name space is finite; number the rest rather than spin forever
+                if attempts < count * 20:
+                    continue
+                key = (f"{key[0]} {len(medicines)}", key[1], key[2])
+            seen.add(key)
+            name, strength, form = key
+            medicines.append(Medicine(
+                name=name,
+                generic_name=name.split()[0].lower() if self.rng.random() < 0.7 else None,
+                form=form,
+                strength=strength,
+                description=f"{form} {strength}" if self.rng.random() < 0.2 else None,
+                created_by=self.rng.choice(users),
+                canonical_key=medicine_key(name, strength, form),
+            ))
+        Medicine.objects.bulk_create(medicines, batch_size=self.batch_size)
+        return list(Medicine.objects.filter(created_by__in=users).order_by("id").values_list("id", flat=True))
+
+    def create_inventory(self, pharmacies, medicine_ids, density, out_of_stock):
+        per_pharmacy = round(len(medicine_ids) * density)
+        total = 0
+        batch = []
+        for pharmacy in pharmacies:
+            for medicine_id in self.rng.sample(medicine_ids, per_pharmacy):
+                quantity = 0 if self.rng.random() < out_of_stock else self.rng.randint(1, 500)
+                batch.append(Inventory(
+                    pharmacy=pharmacy,
+                    medicine_id=medicine_id,
+                    quantity=quantity,
+                    price=Decimal(self.rng.lognormvariate(2, 0.8)).quantize(Decimal("0.01")),
+                    status="IN" if quantity else "OUT",
+                ))
+            if len(batch) >= self.batch_size:
+                Inventory.objects.bulk_create(batch, batch_size=self.batch_size)
+                total += len(batch)
+                batch = []
+        Inventory.objects.bulk_create(batch, batch_size=self.batch_size)
+        return total + len(batch)
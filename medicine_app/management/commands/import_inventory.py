@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from medicine_app.importer import DEFAULT_BATCH_SIZE, ImportFormatError, import_inventory
+from medicine_app.models import Pharmacy
+
+
+class Command(BaseCommand):
+    help = "Bulk import inventory (and any new medicines) for a pharmacy from a CSV or XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("pharmacy_id", type=int)
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            pharmacy = Pharmacy.objects.select_related("user").get(pk=options["pharmacy_id"])
+        except Pharmacy.DoesNotExist:
+            raise CommandError("Pharmacy not found.")
+
+        path = options["path"]
+        try:
+            with open(path, "rb") as f:
+                result = import_inventory(
+                    f, path, pharmacy, pharmacy.user, batch_size=options["batch_size"]
+                )
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        for line, message in result.errors:
+            sys.stderr.write(f"line {line}: {message}\n")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.rows} rows read, {result.imported} imported, "
+            f"{result.medicines_created} new medicines, {result.error_count} errors "
+            f"in {result.seconds:.2f}s ({result.rows_per_second:.0f} rows/s)"
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from medicine_app.catalog import merge_duplicates
+
+
+class Command(BaseCommand):
+    help = "Fold catalog entries with the same canonical key into the oldest one, repointing their inventory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=50, help="Duplicate groups merged per transaction.")
+        parser.add_argument("--pause", type=float, default=0, help="Seconds to sleep between chunks.")
+        parser.add_argument("--dry-run", action="store_true", help="Count the duplicates without merging them.")
+
+    def handle(self, *args, **options):
+        result = merge_duplicates(
+            chunk_size=options["chunk_size"], pause=options["pause"], dry_run=options["dry_run"],
+            log=self.stdout.write if options["verbosity"] > 1 else None,
+        )
+        verb = "Would merge" if options["dry_run"] else "Merged"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['groups']} groups, removing {result['medicines_removed']} duplicate medicines "
+            f"({result['inventory_moved']} inventory rows repointed, {result['inventory_folded']} folded)"
+        ))
+        if result["groups_skipped"]:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {result['groups_skipped']} groups changed during the merge; run again to merge them"
+            ))
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from medicine_app.models import InventoryChange
+
+
+class Command(BaseCommand):
+    help = "Delete inventory change log entries older than --days."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        deleted = InventoryChange.objects.prune(timedelta(days=options["days"]), batch_size=options["batch_size"])
+        self.stdout.write(f"Deleted {deleted} inventory changes")
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from medicine_app.models import Availability
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized Availability table from Inventory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        scanned = Availability.objects.rebuild(chunk_size=options["chunk_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} inventory rows, {Availability.objects.count()} available offers "
+            f"in {elapsed:.2f}s"
+        ))
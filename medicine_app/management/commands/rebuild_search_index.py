@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from medicine_app.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the medicine search index used by MedicineManager.search and make running workers rebuild theirs."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        started = time.perf_counter()
+        indexed = backend.rebuild()
+        # running workers hold their own in-process copies; tell them to rebuild
+        backend.invalidate()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{type(backend).__name__}: indexed {indexed} medicines in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from medicine_app.models import PharmacyStockSummary
+
+
+class Command(BaseCommand):
+    help = "Recompute per-pharmacy stock summaries from Inventory and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        drifted = PharmacyStockSummary.objects.reconcile(
+            fix=not options["dry_run"], chunk_size=options["chunk_size"]
+        )
+        for pharmacy_id, stored, expected in drifted:
+            self.stdout.write(
+                f"pharmacy {pharmacy_id}: stored (skus, out, value)={stored} expected={expected}"
+            )
+        action = "found" if options["dry_run"] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{action} {len(drifted)} drifted summaries"))
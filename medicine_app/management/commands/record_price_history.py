@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from medicine_app.history import record_pending, snapshot_all
+
+
+class Command(BaseCommand):
+    help = "Fold new inventory changes into the daily price history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", type=int, default=0, help="Repeat every N seconds instead of running once.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--snapshot", action="store_true", help="First record today's close for every medicine.")
+
+    def handle(self, *args, **options):
+        if options["snapshot"]:
+            snapshot_all()
+            self.stdout.write("Recorded today's prices for every medicine")
+        while True:
+            recorded = record_pending(batch_size=options["batch_size"])
+            self.stdout.write(f"Folded {recorded} inventory changes into price history")
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from medicine_app.models import StockReservation
+
+
+class Command(BaseCommand):
+    help = "Return stock held by expired reservations to inventory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", type=int, default=0, help="Repeat every N seconds instead of running once.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        while True:
+            released = StockReservation.objects.release_expired(batch_size=options["batch_size"])
+            self.stdout.write(f"Released {released} expired reservations")
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from medicine_app.alerts import ConsoleSink, FileSink, get_sink, scan
+
+
+class Command(BaseCommand):
+    help = "Alert pharmacy owners about items that ran low or out of stock since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", type=int, default=0, help="Repeat every N seconds instead of running once.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--console", action="store_true", help="Print alerts instead of using STOCK_ALERT_SINK.")
+        parser.add_argument("--file", help="Append alerts as JSON lines to this file instead.")
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            sink = FileSink(options["file"])
+        elif options["console"]:
+            sink = ConsoleSink(self.stdout)
+        else:
+            sink = get_sink()
+        while True:
+            sent = scan(sink, batch_size=options["batch_size"])
+            self.stdout.write(f"Sent {sent} stock alerts")
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+INDEX_NAME = "medicine_app_medicine_fulltext"
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute(
+            f"CREATE FULLTEXT INDEX {INDEX_NAME} ON medicine_app_medicine (name, generic_name)"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE INDEX {INDEX_NAME} ON medicine_app_medicine USING GIN "
+            "(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(generic_name, '')))"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute(f"DROP INDEX {INDEX_NAME} ON medicine_app_medicine")
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("medicine_app", "0003_alter_inventory_pharmacy"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
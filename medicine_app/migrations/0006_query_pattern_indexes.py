@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medicine_app", "0005_stockreservation"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                fields=["pharmacy", "status"], name="inventory_pharmacy_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                fields=["medicine", "status", "price"],
+                name="inventory_med_status_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                condition=models.Q(("status", "IN")),
+                fields=["medicine", "price"],
+                name="inventory_in_stock_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pharmacy",
+            index=models.Index(
+                fields=["is_active", "city"], name="pharmacy_active_city_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pharmacy",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["city"],
+                name="pharmacy_active_only_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_availability(apps, schema_editor):
+    Inventory = apps.get_model("medicine_app", "Inventory")
+    Availability = apps.get_model("medicine_app", "Availability")
+    rows = Inventory.objects.filter(
+        status="IN", quantity__gt=0, pharmacy__is_active=True, medicine__isnull=False
+    ).values_list(
+        "id", "medicine_id", "pharmacy_id", "pharmacy__city", "price", "quantity"
+    )
+    batch = []
+    for pk, medicine_id, pharmacy_id, city, price, quantity in rows.iterator(
+        chunk_size=5000
+    ):
+        batch.append(
+            Availability(
+                inventory_id=pk,
+                medicine_id=medicine_id,
+                pharmacy_id=pharmacy_id,
+                city=city,
+                price=price,
+                quantity=quantity,
+            )
+        )
+        if len(batch) >= 5000:
+            Availability.objects.bulk_create(batch)
+            batch = []
+    Availability.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medicine_app", "0006_query_pattern_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Availability",
+            fields=[
+                (
+                    "inventory",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="availability",
+                        serialize=False,
+                        to="medicine_app.inventory",
+                    ),
+                ),
+                ("city", models.CharField(max_length=45)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("quantity", models.IntegerField()),
+                (
+                    "medicine",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="medicine_app.medicine",
+                    ),
+                ),
+                (
+                    "pharmacy",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="medicine_app.pharmacy",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["medicine", "price"], name="availability_med_price_idx"
+                    ),
+                    models.Index(
+                        fields=["medicine", "city", "price"],
+                        name="availability_med_city_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(populate_availability, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_summaries(apps, schema_editor):
+    Inventory = apps.get_model("medicine_app", "Inventory")
+    PharmacyStockSummary = apps.get_model("medicine_app", "PharmacyStockSummary")
+    rows = (
+        Inventory.objects.filter(pharmacy__isnull=False)
+        .values("pharmacy_id")
+        .annotate(
+            sku_count=models.Count("id"),
+            out_of_stock_count=models.Count("id", filter=models.Q(quantity=0)),
+            stock_value=models.Sum(
+                models.F("quantity") * models.F("price"),
+                output_field=models.DecimalField(max_digits=16, decimal_places=2),
+            ),
+            last_inventory_update=models.Max("updated_at"),
+        )
+    )
+    PharmacyStockSummary.objects.bulk_create(
+        [PharmacyStockSummary(**row) for row in rows.order_by()], batch_size=1000
+    )
+    Pharmacy = apps.get_model("medicine_app", "Pharmacy")
+    PharmacyStockSummary.objects.bulk_create(
+        [
+            PharmacyStockSummary(pharmacy_id=pk)
+            for pk in Pharmacy.objects.filter(stock_summary__isnull=True).values_list(
+                "pk", flat=True
+            )
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medicine_app", "0007_availability"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PharmacyStockSummary",
+            fields=[
+                (
+                    "pharmacy",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stock_summary",
+                        serialize=False,
+                        to="medicine_app.pharmacy",
+                    ),
+                ),
+                ("sku_count", models.IntegerField(default=0)),
+                ("out_of_stock_count", models.IntegerField(default=0)),
+                (
+                    "stock_value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                ("last_inventory_update", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medicine_app", "0008_pharmacystocksummary"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="medicine",
+            index=models.Index(fields=["updated_at"], name="medicine_updated_idx"),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medicine_app", "0009_medicine_updated_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventoryChange",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("insert", "Insert"),
+                            ("update", "Update"),
+                            ("delete", "Delete"),
+                        ],
+                        max_length=6,
+                    ),
+                ),
+                ("inventory_id", models.IntegerField()),
+                ("medicine_id", models.IntegerField(null=True)),
+                ("pharmacy_id", models.IntegerField(null=True)),
+                ("quantity", models.IntegerField(null=True)),
+                (
+                    "price",
+                    models.DecimalField(decimal_places=2, max_digits=10, null=True),
+                ),
+                ("status", models.CharField(blank=True, max_length=3)),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["medicine_id", "id"], name="inventory_change_med_idx"
+                    ),
+                    models.Index(
+                        fields=["pharmacy_id", "id"], name="inventory_change_pharm_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
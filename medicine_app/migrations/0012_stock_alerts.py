@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medicine_app", "0011_price_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockAlert",
+            fields=[
+                (
+                    "inventory",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stock_alert",
+                        serialize=False,
+                        to="medicine_app.inventory",
+                    ),
+                ),
+                (
+                    "level",
+                    models.CharField(
+                        choices=[("LOW", "Low stock"), ("OUT", "Out of stock")],
+                        max_length=3,
+                    ),
+                ),
+                ("alerted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="inventory",
+            name="reorder_level",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="watermark",
+            name="timestamp",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                fields=["updated_at", "id"], name="inventory_updated_idx"
+            ),
+        ),
+    ]
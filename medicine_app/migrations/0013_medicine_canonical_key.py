@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:50
+
+import re
+import unicodedata
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# A copy of medicine_app.models.medicine_key as of this migration, so later
+# changes to the key do not change what this migration writes.
+
+STRENGTH_UNITS = {"mg": ("mg", 1), "g": ("mg", 1000), "mcg": ("mg", Decimal("0.001")), "ml": ("ml", 1), "iu": ("iu", 1)}
+
+
+def normalize_medicine_name(name):
+    name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode().lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name).split())
+
+
+def normalize_strength(strength):
+    match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*([a-z]+)\s*$", (strength or "").lower())
+    if not match or match.group(2) not in STRENGTH_UNITS:
+        return " ".join((strength or "").lower().split())
+    unit, factor = STRENGTH_UNITS[match.group(2)]
+    amount = (Decimal(match.group(1)) * factor).normalize()
+    return f"{amount:f}{unit}"
+
+
+def medicine_key(name, strength, form):
+    return f"{normalize_medicine_name(name)}|{normalize_strength(strength)}|{(form or '').lower()}"
+
+
+def populate_keys(apps, schema_editor):
+    Medicine = apps.get_model("medicine_app", "Medicine")
+    last = 0
+    while True:
+        batch = list(Medicine.objects.filter(pk__gt=last).order_by("pk").only("name", "strength", "form")[:2000])
+        if not batch:
+            return
+        for medicine in batch:
+            medicine.canonical_key = medicine_key(medicine.name, medicine.strength, medicine.form)
+        Medicine.objects.bulk_update(batch, ["canonical_key"])
+        last = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medicine_app", "0012_stock_alerts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="medicine",
+            name="canonical_key",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=220
+            ),
+        ),
+        migrations.RunPython(populate_keys, migrations.RunPython.noop),
+    ]
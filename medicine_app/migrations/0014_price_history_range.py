@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:28
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_range(apps, schema_editor):
+    # rows recorded so far only know their close
+    PriceHistory = apps.get_model("medicine_app", "PriceHistory")
+    PriceHistory.objects.update(low_price=F("min_price"), high_price=F("max_price"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medicine_app", "0013_medicine_canonical_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pricehistory",
+            name="high_price",
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name="pricehistory",
+            name="low_price",
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(seed_range, migrations.RunPython.noop),
+    ]
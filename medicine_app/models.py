@@ -1,7 +1,13 @@
-from django.db import models
+from django.db import connection, models, transaction
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
 import re
-import bcrypt
+import unicodedata
+from .cache import invalidate_medicine
+from .hashing import get_hashing_service
+from .search import get_search_backend
 
 NAME_RE = re.compile(r"^[A-Za-z][A-Za-z\s\-'`]{1,}$")
 EMAIL_RE = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$')
@@ -19,6 +25,30 @@ FORM_CHOICES = [
     ("Injection", "Injection"),
 ]
 
+# Strengths are compared in one unit per dimension: 0.5g, 500 mg and
+# 500000mcg are the same tablet.
+STRENGTH_UNITS = {"mg": ("mg", 1), "g": ("mg", 1000), "mcg": ("mg", Decimal("0.001")), "ml": ("ml", 1), "iu": ("iu", 1)}
+
+
+def normalize_medicine_name(name):
+    name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode().lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name).split())
+
+
+def normalize_strength(strength):
+    match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*([a-z]+)\s*$", (strength or "").lower())
+    if not match or match.group(2) not in STRENGTH_UNITS:
+        return " ".join((strength or "").lower().split())
+    unit, factor = STRENGTH_UNITS[match.group(2)]
+    amount = (Decimal(match.group(1)) * factor).normalize()
+    return f"{amount:f}{unit}"
+
+
+def medicine_key(name, strength, form):
+    # what makes two catalog entries the same medicine, whoever created them
+    return f"{normalize_medicine_name(name)}|{normalize_strength(strength)}|{(form or '').lower()}"
+
+
 class UserManager(models.Manager):
     def create_user(self, first_name, last_name, email, password):
         if not NAME_RE.match(first_name):
@@ -30,7 +60,7 @@ class UserManager(models.Manager):
         if not PASSWORD_RE.match(password):
             raise ValidationError("Password must be at least 8 chars, include letters & numbers.")
 
-        hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+        hashed_pw = get_hashing_service().hash_password(password)
 
         user = self.model(
             first_name=first_name,
@@ -42,13 +72,18 @@ class UserManager(models.Manager):
         return user
 
     def authenticate(self, email, password):
+        hasher = get_hashing_service()
         try:
             user = self.get(email=email.lower())
-            if bcrypt.checkpw(password.encode(), user.password.encode()):
-                return user
         except self.model.DoesNotExist:
+            hasher.check_password(password, hasher.dummy_hash())
+            return None
+        if not hasher.check_password(password, user.password):
             return None
-        return None
+        if hasher.needs_rehash(user.password):
+            user.password = hasher.hash_password(password)
+            user.save(update_fields=["password", "updated_at"])
+        return user
 
 
 class PharmacyManager(models.Manager):
@@ -57,10 +92,199 @@ class PharmacyManager(models.Manager):
 
 class MedicineManager(models.Manager):
     def search(self, keyword):
-        return self.filter(
-            models.Q(name__icontains=keyword) |
-            models.Q(generic_name__icontains=keyword)
+        return get_search_backend().search(self.get_queryset(), keyword)
+class InsufficientStock(ValidationError):
+    pass
+
+class InventoryManager(models.Manager):
+    def adjust_stock(self, pk, delta, price=None, **fields):
+        # One UPDATE: the quantity guard, the new quantity and the matching
+        # status are all computed by the database from the current row, so
+        # concurrent terminals never overwrite each other. status is listed
+        # first because MySQL evaluates SET assignments left to right.
+        # price and other plain fields (the edit form) change in the same
+        # UPDATE, so the row is logged and summarised once.
+        with transaction.atomic():
+            rows = self.filter(pk=pk)
+            old_price = None
+            if price is not None:
+                # the summary's stock value needs the price being replaced
+                old_price = rows.select_for_update().values_list("price", flat=True).first()
+                fields["price"] = price
+            if delta < 0:
+                rows = rows.filter(quantity__gte=-delta)
+            updated = rows.update(
+                status=models.Case(
+                    models.When(quantity__gt=-delta, then=models.Value("IN")),
+                    default=models.Value("OUT"),
+                ),
+                quantity=models.F("quantity") + delta,
+                updated_at=timezone.now(),
+                **fields,
+            )
+            if not updated:
+                if not self.filter(pk=pk).exists():
+                    raise self.model.DoesNotExist("Inventory item not found.")
+                raise InsufficientStock("Not enough stock.")
+            # the UPDATE holds the row lock until commit, so this reads our own write
+            quantity, medicine_id, pharmacy_id, price, status = self.values_list(
+                "quantity", "medicine_id", "pharmacy_id", "price", "status"
+            ).get(pk=pk)
+            previous = quantity - delta
+            if old_price is None:
+                old_price = price
+            # update() sends no post_save
+            if quantity > 0 and previous > 0:
+                Availability.objects.filter(pk=pk).update(quantity=quantity, price=price)
+            else:
+                Availability.objects.refresh(pk=pk)
+            PharmacyStockSummary.objects.apply(
+                pharmacy_id,
+                out_of_stock=(quantity == 0) - (previous == 0),
+                value=quantity * price - previous * old_price,
+            )
+            InventoryChange.objects.log("update", pk, medicine_id, pharmacy_id, quantity, price, status)
+        invalidate_medicine(medicine_id)
+        return quantity
+
+    def reserve(self, pk, quantity, ttl=None):
+        if quantity <= 0:
+            raise ValidationError("Reservation quantity must be positive.")
+        ttl = ttl or StockReservation.DEFAULT_TTL
+        with transaction.atomic():
+            self.adjust_stock(pk, -quantity)
+            return StockReservation.objects.create(
+                inventory_id=pk,
+                quantity=quantity,
+                expires_at=timezone.now() + timedelta(seconds=ttl),
+            )
+
+class StockReservationManager(models.Manager):
+    def confirm(self, pk):
+        # the stock was already taken when reserving; confirming just drops the hold
+        with transaction.atomic():
+            reservation = self.select_for_update().get(pk=pk)
+            if reservation.expires_at <= timezone.now():
+                raise ValidationError("Reservation has expired.")
+            reservation.delete()
+        return reservation
+
+    def release(self, pk):
+        with transaction.atomic():
+            reservation = self.select_for_update().get(pk=pk)
+            Inventory.objects.adjust_stock(reservation.inventory_id, reservation.quantity)
+            reservation.delete()
+        return reservation
+
+    def release_expired(self, batch_size=500):
+        released = 0
+        while True:
+            with transaction.atomic():
+                # skip_locked lets several workers sweep without blocking each other
+                batch = list(
+                    self.select_for_update(skip_locked=True)
+                    .filter(expires_at__lte=timezone.now())
+                    .order_by("expires_at")[:batch_size]
+                )
+                for reservation in batch:
+                    Inventory.objects.adjust_stock(reservation.inventory_id, reservation.quantity)
+                self.filter(pk__in=[r.pk for r in batch]).delete()
+            released += len(batch)
+            if len(batch) < batch_size:
+                return released
+
+class AvailabilityManager(models.Manager):
+    def refresh(self, **inventory_filter):
+        # Recompute the rows for the inventory matched by inventory_filter:
+        # one delete, one select and one insert, whatever the batch size.
+        lookup = {f"inventory__{k}": v for k, v in inventory_filter.items()}
+        rows = Inventory.objects.filter(
+            status="IN", quantity__gt=0, pharmacy__is_active=True, medicine__isnull=False,
+            **inventory_filter,
+        ).values_list("id", "medicine_id", "pharmacy_id", "pharmacy__city", "price", "quantity")
+        with transaction.atomic():
+            self.filter(**lookup).delete()
+            self.bulk_create([
+                self.model(
+                    inventory_id=pk, medicine_id=medicine_id, pharmacy_id=pharmacy_id,
+                    city=city, price=price, quantity=quantity,
+                )
+                for pk, medicine_id, pharmacy_id, city, price, quantity in rows
+            ], batch_size=1000)
+
+    def rebuild(self, chunk_size=5000):
+        self.all().delete()
+        last = 0
+        total = 0
+        while True:
+            ids = list(
+                Inventory.objects.filter(pk__gt=last).order_by("pk").values_list("pk", flat=True)[:chunk_size]
+            )
+            if not ids:
+                return total
+            self.refresh(pk__in=ids)
+            total += len(ids)
+            last = ids[-1]
+
+class PharmacyStockSummaryManager(models.Manager):
+    def _aggregate(self, inventory):
+        return inventory.values("pharmacy_id").annotate(
+            sku_count=models.Count("id"),
+            out_of_stock_count=models.Count("id", filter=models.Q(quantity=0)),
+            stock_value=models.Sum(models.F("quantity") * models.F("price"), output_field=models.DecimalField(max_digits=16, decimal_places=2)),
+            last_inventory_update=models.Max("updated_at"),
+        )
+
+    def apply(self, pharmacy_id, skus=0, out_of_stock=0, value=0):
+        # counters move by deltas in one UPDATE, so concurrent writers add up
+        updated = self.filter(pharmacy_id=pharmacy_id).update(
+            sku_count=models.F("sku_count") + skus,
+            out_of_stock_count=models.F("out_of_stock_count") + out_of_stock,
+            stock_value=models.F("stock_value") + value,
+            last_inventory_update=timezone.now(),
         )
+        # no row means the pharmacy is being deleted (or predates the table,
+        # which reconcile fills in); never recreate it from here
+        return updated
+
+    def refresh(self, pharmacy_id):
+        row = self._aggregate(Inventory.objects.filter(pharmacy_id=pharmacy_id)).order_by("pharmacy_id").first() or {}
+        self.update_or_create(pharmacy_id=pharmacy_id, defaults={
+            "sku_count": row.get("sku_count", 0),
+            "out_of_stock_count": row.get("out_of_stock_count", 0),
+            "stock_value": row.get("stock_value") or 0,
+            "last_inventory_update": row.get("last_inventory_update"),
+        })
+
+    def reconcile(self, fix=True, chunk_size=1000):
+        # recompute every summary from Inventory, chunk by chunk of pharmacies,
+        # and return the ones that had drifted
+        drifted = []
+        last = 0
+        fields = ("sku_count", "out_of_stock_count", "stock_value")
+        while True:
+            ids = list(Pharmacy.objects.filter(pk__gt=last).order_by("pk").values_list("pk", flat=True)[:chunk_size])
+            if not ids:
+                return drifted
+            actual = {
+                row["pharmacy_id"]: row
+                for row in self._aggregate(Inventory.objects.filter(pharmacy_id__in=ids))
+            }
+            stored = {s.pharmacy_id: s for s in self.filter(pharmacy_id__in=ids)}
+            for pharmacy_id in ids:
+                row = actual.get(pharmacy_id, {})
+                expected = (row.get("sku_count", 0), row.get("out_of_stock_count", 0), row.get("stock_value") or 0)
+                summary = stored.get(pharmacy_id)
+                current = tuple(getattr(summary, f) for f in fields) if summary else None
+                if current != expected:
+                    drifted.append((pharmacy_id, current, expected))
+                    if fix:
+                        self.update_or_create(pharmacy_id=pharmacy_id, defaults={
+                            **dict(zip(fields, expected)),
+                            "last_inventory_update": row.get("last_inventory_update"),
+                        })
+            last = ids[-1]
+
 class User(models.Model):
     first_name = models.CharField(max_length=120)
     last_name = models.CharField(max_length=120)
@@ -85,6 +309,12 @@ class Pharmacy(models.Model):
 
     class Meta:
         unique_together = ("user", "name", "city")
+        indexes = [
+            models.Index(fields=["is_active", "city"], name="pharmacy_active_city_idx"),
+            # MySQL cannot build partial indexes (models.W037 on migrate) and
+            # skips this one; the composite index above serves it there
+            models.Index(fields=["city"], condition=models.Q(is_active=True), name="pharmacy_active_only_idx"),
+        ]
     def clean(self):
         if not CITY_RE.match(self.city):
             raise ValidationError("Invalid city name.")
@@ -103,10 +333,23 @@ class Medicine(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="medicines")
+    # medicine_key(); entries sharing one are duplicates for merge_duplicate_medicines
+    canonical_key = models.CharField(max_length=220, db_index=True, editable=False, default="")
     objects = MedicineManager()
     
     class Meta:
         unique_together = ("created_by", "name", "strength", "form")
+        indexes = [
+            # newest change for the catalog's conditional GET validators
+            models.Index(fields=["updated_at"], name="medicine_updated_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.canonical_key = medicine_key(self.name, self.strength, self.form)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "canonical_key"}
+        super().save(*args, **kwargs)
     
     def clean(self):
         if not MEDICINE_NAME_RE.match(self.name):
@@ -126,14 +369,27 @@ class Inventory(models.Model):
     quantity = models.IntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=3, choices=STATUS_CHOICES, default='IN')
+    # alert the owner when quantity falls to this level (out of stock always alerts)
+    reorder_level = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE,null=True, blank=True)
     pharmacy = models.ForeignKey(Pharmacy, on_delete=models.CASCADE, null=True, blank=True)
+    objects = InventoryManager()
     class Meta:
         unique_together = ("medicine", "pharmacy")
+        indexes = [
+            models.Index(fields=["pharmacy", "status"], name="inventory_pharmacy_status_idx"),
+            models.Index(fields=["medicine", "status", "price"], name="inventory_med_status_price_idx"),
+            # partial, so skipped on MySQL like pharmacy_active_only_idx
+            models.Index(fields=["medicine", "price"], condition=models.Q(status="IN"), name="inventory_in_stock_idx"),
+            models.Index(fields=["updated_at", "id"], name="inventory_updated_idx"),
+        ]
 
     def clean(self):
+        if self.quantity is None or self.price is None:
+            # a form field that failed validation; its own error says why
+            return
         if self.quantity < 0:
             raise ValidationError("Quantity cannot be negative.")
         if self.price < 0:
@@ -142,8 +398,233 @@ class Inventory(models.Model):
             raise ValidationError("If quantity = 0, status must be OUT.")
         if self.quantity > 0 and self.status != "IN":
             raise ValidationError("If quantity > 0, status must be IN.")
-        if self.medicine and self.pharmacy:
+        # ids, not the related objects: loading them would cost two queries
+        if self.medicine_id and self.pharmacy_id:
             if Inventory.objects.exclude(pk=self.pk).filter(
-                medicine=self.medicine, pharmacy=self.pharmacy
+                medicine_id=self.medicine_id, pharmacy_id=self.pharmacy_id
             ).exists():
                 raise ValidationError("This medicine already exists in this pharmacy.")
+
+
+class StockReservation(models.Model):
+    DEFAULT_TTL = 15 * 60
+
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, related_name="reservations")
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    objects = StockReservationManager()
+
+
+class Availability(models.Model):
+    # Denormalized copy of the in-stock inventory of active pharmacies, kept
+    # in sync on every inventory/pharmacy write, so "where can I buy it"
+    # queries need no status/is_active filters or joins to rank offers.
+    inventory = models.OneToOneField(Inventory, on_delete=models.CASCADE, primary_key=True, related_name="availability")
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE, related_name="+")
+    pharmacy = models.ForeignKey(Pharmacy, on_delete=models.CASCADE, related_name="+")
+    city = models.CharField(max_length=45)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.IntegerField()
+    objects = AvailabilityManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["medicine", "price"], name="availability_med_price_idx"),
+            models.Index(fields=["medicine", "city", "price"], name="availability_med_city_idx"),
+        ]
+
+
+class PharmacyStockSummary(models.Model):
+    # Dashboard counters per pharmacy, moved by deltas on every inventory
+    # write; reconcile_stock_summaries recomputes them from Inventory.
+    pharmacy = models.OneToOneField(Pharmacy, on_delete=models.CASCADE, primary_key=True, related_name="stock_summary")
+    sku_count = models.IntegerField(default=0)
+    out_of_stock_count = models.IntegerField(default=0)
+    stock_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    last_inventory_update = models.DateTimeField(blank=True, null=True)
+    objects = PharmacyStockSummaryManager()
+
+
+class InventoryChangeManager(models.Manager):
+    def _change(self, action, inventory_id, medicine_id, pharmacy_id, quantity, price, status):
+        return self.model(
+            action=action, inventory_id=inventory_id, medicine_id=medicine_id,
+            pharmacy_id=pharmacy_id, quantity=quantity, price=price, status=status,
+        )
+
+    def log(self, action, *row):
+        self._change(action, *row).save()
+
+    def record(self, action, inventory):
+        self.log(
+            action, inventory.pk, inventory.medicine_id, inventory.pharmacy_id,
+            inventory.quantity, inventory.price, inventory.status,
+        )
+
+    def capture(self, action, chunk_size=1000, **inventory_filter):
+        # update() and bulk_create() send no signals: log the rows' current
+        # state instead. action may be a callable taking the values row.
+        rows = Inventory.objects.filter(**inventory_filter).values_list(
+            "pk", "medicine_id", "pharmacy_id", "quantity", "price", "status"
+        )
+        batch = []
+        for row in rows.iterator(chunk_size=chunk_size):
+            batch.append(self._change(action(row) if callable(action) else action, *row))
+            if len(batch) >= chunk_size:
+                self.bulk_create(batch)
+                batch = []
+        if batch:
+            self.bulk_create(batch)
+
+    def prune(self, older_than, batch_size=5000):
+        # the feed only needs recent history; clients further behind reload
+        cutoff = timezone.now() - older_than
+        deleted = 0
+        while True:
+            ids = list(self.filter(created_at__lt=cutoff).order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += self.filter(id__in=ids).delete()[0]
+
+
+class InventoryChange(models.Model):
+    # Append-only log of inventory writes; the auto-increment id is the feed
+    # sequence. Ids are plain integers so entries outlive what they describe.
+    ACTION_CHOICES = [
+        ("insert", "Insert"),
+        ("update", "Update"),
+        ("delete", "Delete"),
+    ]
+    id = models.BigAutoField(primary_key=True)
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    inventory_id = models.IntegerField()
+    medicine_id = models.IntegerField(null=True)
+    pharmacy_id = models.IntegerField(null=True)
+    quantity = models.IntegerField(null=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    status = models.CharField(max_length=3, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    objects = InventoryChangeManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["medicine_id", "id"], name="inventory_change_med_idx"),
+            models.Index(fields=["pharmacy_id", "id"], name="inventory_change_pharm_idx"),
+        ]
+
+
+class Watermark(models.Model):
+    # How far a background job has got through an append-only source.
+    name = models.CharField(max_length=50, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    timestamp = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class PriceHistoryManager(models.Manager):
+    def _offer_stats(self, medicine_ids):
+        return {
+            row["medicine_id"]: row
+            for row in Availability.objects.filter(medicine_id__in=medicine_ids).values("medicine_id").annotate(
+                min_price=models.Min("price"),
+                max_price=models.Max("price"),
+                avg_price=models.Avg("price"),
+                offers=models.Count("pk"),
+            )
+        }
+
+    def snapshot(self, days, extremes=None, chunk_size=2000):
+        # days: {medicine_id: day}. Stores each medicine's current offers as
+        # its close for that day and widens the day's low/high to take them
+        # in, along with extremes ({medicine_id: [price, ...]}, offers seen
+        # earlier that day).
+        extremes = extremes or {}
+        medicine_ids = list(days)
+        for i in range(0, len(medicine_ids), chunk_size):
+            chunk = medicine_ids[i:i + chunk_size]
+            stats = self._offer_stats(chunk)
+            seen = {
+                (medicine_id, day): (low, high)
+                for medicine_id, day, low, high in self.filter(
+                    medicine_id__in=chunk, day__in={days[pk] for pk in chunk}
+                ).values_list("medicine_id", "day", "low_price", "high_price")
+            }
+            rows = []
+            for medicine_id in chunk:
+                row = stats.get(medicine_id, {})
+                avg = row.get("avg_price")
+                prices = [
+                    price for price in (
+                        row.get("min_price"), row.get("max_price"),
+                        *seen.get((medicine_id, days[medicine_id]), ()), *extremes.get(medicine_id, ()),
+                    )
+                    if price is not None
+                ]
+                rows.append(self.model(
+                    medicine_id=medicine_id, day=days[medicine_id],
+                    min_price=row.get("min_price"), max_price=row.get("max_price"),
+                    avg_price=None if avg is None else round(avg, 2),
+                    offers=row.get("offers", 0),
+                    low_price=min(prices, default=None), high_price=max(prices, default=None),
+                ))
+            options = {
+                "update_conflicts": True,
+                "update_fields": ["min_price", "max_price", "avg_price", "offers", "low_price", "high_price"],
+            }
+            if connection.features.supports_update_conflicts_with_target:
+                options["unique_fields"] = ["medicine", "day"]
+            self.bulk_create(rows, **options)
+
+    def daily(self, medicine_id, start, end):
+        # Rows exist only for days the offers changed; the days between
+        # repeat the last close, which is then also their low and high.
+        rows = self.filter(medicine_id=medicine_id, day__range=(start, end)).order_by("day")
+        previous = self.filter(medicine_id=medicine_id, day__lt=start).order_by("-day").first()
+        by_day = {row.day: row for row in rows}
+        days = []
+        day = start
+        while day <= end:
+            recorded = by_day.get(day)
+            previous = recorded or previous
+            if previous is not None:
+                days.append({
+                    "day": day,
+                    "min_price": previous.min_price,
+                    "max_price": previous.max_price,
+                    "avg_price": previous.avg_price,
+                    "offers": previous.offers,
+                    "low_price": recorded.low_price if recorded else previous.min_price,
+                    "high_price": recorded.high_price if recorded else previous.max_price,
+                })
+            day += timedelta(days=1)
+        return days
+
+
+class PriceHistory(models.Model):
+    # Daily close of a medicine's in-stock offers (Availability), written by
+    # record_price_history from the InventoryChange log, plus the lowest and
+    # highest offer seen during the day.
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE, related_name="+")
+    day = models.DateField()
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    avg_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    offers = models.IntegerField(default=0)
+    low_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    high_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    objects = PriceHistoryManager()
+
+    class Meta:
+        unique_together = ("medicine", "day")
+
+
+class StockAlert(models.Model):
+    # Last level the owner was alerted about; the row goes once the item is restocked.
+    LEVEL_CHOICES = [
+        ("LOW", "Low stock"),
+        ("OUT", "Out of stock"),
+    ]
+    inventory = models.OneToOneField(Inventory, on_delete=models.CASCADE, primary_key=True, related_name="stock_alert")
+    level = models.CharField(max_length=3, choices=LEVEL_CHOICES)
+    alerted_at = models.DateTimeField(default=timezone.now)
@@ -0,0 +1,81 @@
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, fields):
+    # fields: the model or annotation field behind each ordering column; the
+    # values are typed and range-checked by them before reaching a filter
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor.")
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor("Malformed cursor.")
+    try:
+        values = [field.to_python(value) for field, value in zip(fields, values)]
+        for field, value in zip(fields, values):
+            field.run_validators(value)
+    except ValidationError:
+        raise InvalidCursor("Malformed cursor.")
+    return values
+
+
+def ordering_field(queryset, name):
+    try:
+        return queryset.model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return queryset.query.annotations[name].output_field
+
+
+def queryset_ordering(queryset):
+    ordering = [str(f) for f in queryset.query.order_by] or ["pk"]
+    if not any(f.lstrip("-") in ("pk", "id") for f in ordering):
+        ordering.append("id")
+    return [f.replace("pk", "id") if f.lstrip("-") == "pk" else f for f in ordering]
+
+
+def _after(ordering, values):
+    # (a, b, c) > (x, y, z) expanded into OR-ed prefixes, honouring the direction
+    # of each ordering field, so the database can seek on an index
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        term = Q(**{f"{name}__{lookup}": values[i]})
+        for prev_field, prev_value in zip(ordering[:i], values[:i]):
+            term &= Q(**{prev_field.lstrip("-"): prev_value})
+        condition |= term
+    return condition
+
+
+def keyset_page(queryset, fields, limit, cursor=None):
+    ordering = queryset_ordering(queryset)
+    keys = [f.lstrip("-") for f in ordering]
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        key_fields = [ordering_field(queryset, key) for key in keys]
+        queryset = queryset.filter(_after(ordering, decode_cursor(cursor, key_fields)))
+
+    columns = list(dict.fromkeys(list(fields) + keys))
+    rows = list(queryset.values(*columns)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_cursor([rows[-1][k] for k in keys])
+    results = [{f: row[f] for f in fields} for row in rows]
+    return results, has_more, next_cursor
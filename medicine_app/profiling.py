@@ -0,0 +1,268 @@
+import bisect
+import json
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import Http404, JsonResponse
+from django.template import base as template_base
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.csrf import csrf_exempt
+
+from .dbpool import pool_stats
+from .hashing import get_hashing_service
+
+# Opt-in request profiler (PROFILING_ENABLED). A sampled request gets a
+# RequestProfile in a context variable; the query wrapper installed on every
+# connection and the template hook only record while one is set, so
+# unsampled requests pay a context-variable lookup and nothing else.
+
+_current = ContextVar("medicine_request_profile", default=None)
+
+# upper bounds in ms; one count per bucket keeps memory flat however long we run
+BUCKETS_MS = (1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 200, 300, 500, 750, 1000, 2000, 5000, 10000)
+
+
+class RequestProfile:
+    __slots__ = ("db_seconds", "queries", "seen", "duplicates", "template_seconds", "template_depth")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.seen = set()
+        self.duplicates = 0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.max = max(self.max, ms)
+
+    def percentile(self, pct):
+        if not self.total:
+            return 0.0
+        target = pct / 100 * self.total
+        running = 0
+        for i, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                # a bucket's upper bound, never above what was actually seen
+                return min(BUCKETS_MS[i], self.max) if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+
+class ViewStats:
+    def __init__(self):
+        self.wall = Histogram()
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.queries = 0
+        self.duplicates = 0
+        self.max_queries = 0
+
+    def as_dict(self):
+        n = self.wall.total or 1
+        return {
+            "samples": self.wall.total,
+            "p50_ms": self.wall.percentile(50),
+            "p95_ms": self.wall.percentile(95),
+            "p99_ms": self.wall.percentile(99),
+            "max_ms": round(self.wall.max, 3),
+            "avg_db_ms": round(self.db_ms / n, 3),
+            "avg_template_ms": round(self.template_ms / n, 3),
+            "avg_queries": round(self.queries / n, 2),
+            "max_queries": self.max_queries,
+            "avg_duplicate_queries": round(self.duplicates / n, 2),
+        }
+
+
+class ProfileStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, name, wall_ms, profile):
+        with self._lock:
+            stats = self._views.get(name)
+            if stats is None:
+                stats = self._views[name] = ViewStats()
+            stats.wall.add(wall_ms)
+            stats.db_ms += profile.db_seconds * 1000
+            stats.template_ms += profile.template_seconds * 1000
+            stats.queries += profile.queries
+            stats.duplicates += profile.duplicates
+            stats.max_queries = max(stats.max_queries, profile.queries)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self._views.items())}
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+
+store = ProfileStore()
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.db_seconds += time.perf_counter() - started
+        profile.queries += 1
+        key = (sql, repr(params))
+        if key in profile.seen:
+            profile.duplicates += 1
+        else:
+            profile.seen.add(key)
+
+
+def _install_query_wrapper(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+_original_render = template_base.Template.render
+
+
+def _profiled_render(self, context):
+    profile = _current.get()
+    if profile is None:
+        return _original_render(self, context)
+    # only time the outermost template; includes and parents are inside it
+    profile.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        profile.template_depth -= 1
+        if not profile.template_depth:
+            profile.template_seconds += time.perf_counter() - started
+
+
+_installed = False
+
+
+def install():
+    global _installed
+    if _installed:
+        return
+    connection_created.connect(_install_query_wrapper, dispatch_uid="medicine_profiling")
+    from django.db import connections
+
+    for alias in connections:
+        # connections opened before the middleware loaded
+        _install_query_wrapper(None, connections[alias])
+    template_base.Template.render = _profiled_render
+    _installed = True
+
+
+def _jsonl_logger():
+    path = getattr(settings, "PROFILING_LOG_FILE", None)
+    if not path:
+        return None
+    logger = logging.getLogger("medicine_app.profiling.requests")
+    if not logger.handlers:
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=getattr(settings, "PROFILING_LOG_MAX_BYTES", 10 * 1024 * 1024),
+            backupCount=getattr(settings, "PROFILING_LOG_BACKUPS", 5),
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+        self.log = _jsonl_logger()
+        install()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _start(self):
+        if random.random() >= self.sample_rate:
+            return None, None
+        profile = RequestProfile()
+        return profile, _current.set(profile)
+
+    def _finish(self, request, response, profile, token, started):
+        _current.reset(token)
+        wall_ms = (time.perf_counter() - started) * 1000
+        match = getattr(request, "resolver_match", None)
+        name = (match.url_name or match.view_name) if match else "unresolved"
+        store.record(name, wall_ms, profile)
+        if self.log is not None:
+            self.log.info(json.dumps({
+                "ts": time.time(),
+                "view": name,
+                "method": request.method,
+                "status": response.status_code,
+                "wall_ms": round(wall_ms, 3),
+                "db_ms": round(profile.db_seconds * 1000, 3),
+                "template_ms": round(profile.template_seconds * 1000, 3),
+                "queries": profile.queries,
+                "duplicate_queries": profile.duplicates,
+            }))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile, token = self._start()
+        if profile is None:
+            return self.get_response(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._finish(request, response, profile, token, started)
+        return response
+
+    async def __acall__(self, request):
+        profile, token = self._start()
+        if profile is None:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._finish(request, response, profile, token, started)
+        return response
+
+
+# authenticated by the X-Stats-Token header rather than a session, so no CSRF token
+@csrf_exempt
+def profiling_stats(request):
+    token = getattr(settings, "PROFILING_STATS_TOKEN", None)
+    supplied = request.headers.get("X-Stats-Token", "")
+    if not token or not constant_time_compare(supplied, token):
+        raise Http404
+    if request.method == "POST" and request.POST.get("reset"):
+        store.reset()
+    return JsonResponse({
+        "views": store.snapshot(),
+        "password_hashing": get_hashing_service().stats(),
+        "db_pools": pool_stats(),
+    })
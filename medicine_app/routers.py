@@ -0,0 +1,103 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+# Reads go to a random alias in DATABASE_REPLICAS and writes to "default".
+# Once a request (or command) has written, the rest of it reads from the
+# primary too, and PrimaryPinningMiddleware keeps that client on the primary
+# for READ_YOUR_WRITES_SECONDS so it sees its own changes despite replica lag.
+
+_pinned = ContextVar("medicine_primary_pinned", default=False)
+_wrote = ContextVar("medicine_primary_wrote", default=False)
+
+# Sessions are saved on most requests and read back on the next one, so they
+# always live on the primary and writing them does not pin the client.
+PRIMARY_ONLY_APPS = {"sessions"}
+
+
+def replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+@contextmanager
+def use_primary():
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if (
+            not aliases
+            or _pinned.get()
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+            or connections["default"].in_atomic_block
+        ):
+            return "default"
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in PRIMARY_ONLY_APPS:
+            # pin whatever context this is; the middleware resets it per request
+            _pinned.set(True)
+            _wrote.set(True)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema from the primary
+        return db == "default"
+
+
+class PrimaryPinningMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cookie = getattr(settings, "READ_YOUR_WRITES_COOKIE", "pin_primary")
+        self.window = getattr(settings, "READ_YOUR_WRITES_SECONDS", 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _pinned_by_cookie(self, request):
+        try:
+            return float(request.COOKIES.get(self.cookie, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def _start(self, request):
+        return _pinned.set(self._pinned_by_cookie(request)), _wrote.set(False)
+
+    def _finish(self, response, tokens):
+        wrote = _wrote.get()
+        _pinned.reset(tokens[0])
+        _wrote.reset(tokens[1])
+        if wrote and replicas():
+            response.set_cookie(
+                self.cookie, str(time.time() + self.window),
+                max_age=self.window, httponly=True, samesite="Lax",
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = self._start(request)
+        return self._finish(self.get_response(request), tokens)
+
+    async def __acall__(self, request):
+        tokens = self._start(request)
+        return self._finish(await self.get_response(request), tokens)
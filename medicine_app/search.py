@@ -0,0 +1,331 @@
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, FloatField, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .cache import ChangeLog
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+FULLTEXT_INDEX_NAME = "medicine_app_medicine_fulltext"
+
+# MySQL's InnoDB FULLTEXT parser ignores tokens shorter than innodb_ft_min_token_size
+MYSQL_MIN_TOKEN_SIZE = 3
+
+# Every committed catalog write is published to this change log in the
+# shared cache; an in-process index behind it re-reads the changed rows (or
+# rebuilds, when too far behind) before its next query.
+INDEX_VERSION_KEY = "ver:search-index"
+index_changes = ChangeLog(INDEX_VERSION_KEY)
+
+
+def index_version():
+    return index_changes.version()
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class BaseSearchBackend:
+    def search(self, queryset, keyword):
+        raise NotImplementedError
+
+    def index(self, medicine):
+        pass
+
+    def index_many(self, medicines):
+        for medicine in medicines:
+            self.index(medicine)
+
+    def remove(self, pk):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def invalidate(self):
+        pass
+
+
+class InMemorySearchBackend(BaseSearchBackend):
+    # Inverted index kept inside the worker process: exact tokens and trigrams
+    # both map to sets of medicine ids, so lookups never touch the table.
+    # Writes in this process update it in place once committed; writes
+    # anywhere else reach it through index_changes, which needs a cache
+    # shared by every worker (CACHE_BACKEND=file or redis). With the
+    # per-process locmem cache, only run one worker or use the database
+    # backend.
+    NAME_WEIGHT = 2.0
+    GENERIC_WEIGHT = 1.0
+    EXACT_SCORE = 3.0
+    PREFIX_SCORE = 2.0
+    SUBSTRING_SCORE = 1.0
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._version = None
+        self._docs = {}
+        self._tokens = defaultdict(set)
+        self._trigrams = defaultdict(set)
+
+    def _add(self, pk, name, generic_name):
+        name_tokens = tokenize(name)
+        generic_tokens = tokenize(generic_name)
+        self._docs[pk] = (name_tokens, generic_tokens)
+        for token in set(name_tokens + generic_tokens):
+            self._tokens[token].add(pk)
+            for gram in trigrams(token):
+                self._trigrams[gram].add(pk)
+
+    def _discard(self, pk):
+        doc = self._docs.pop(pk, None)
+        if doc is None:
+            return
+        for token in set(doc[0] + doc[1]):
+            ids = self._tokens.get(token)
+            if ids is not None:
+                ids.discard(pk)
+                if not ids:
+                    del self._tokens[token]
+            for gram in trigrams(token):
+                ids = self._trigrams.get(gram)
+                if ids is not None:
+                    ids.discard(pk)
+                    if not ids:
+                        del self._trigrams[gram]
+
+    def rebuild(self):
+        from .models import Medicine
+
+        with self._lock:
+            # read first: a write landing during the scan bumps past it
+            version = index_version()
+            self._docs = {}
+            self._tokens = defaultdict(set)
+            self._trigrams = defaultdict(set)
+            rows = Medicine.objects.values_list("id", "name", "generic_name")
+            for pk, name, generic_name in rows.iterator(chunk_size=5000):
+                self._add(pk, name, generic_name)
+            self._built = True
+            self._version = version
+        return len(self._docs)
+
+    def _ensure_built(self):
+        if not self._built:
+            self.rebuild()
+            return
+        version = index_version()
+        if version == self._version:
+            return
+        changed = index_changes.since(self._version, version)
+        if changed is None:
+            self.rebuild()
+        else:
+            self._reload(changed)
+            self._version = version
+
+    def _reload(self, pks):
+        from .models import Medicine
+
+        rows = Medicine.objects.filter(pk__in=pks).values_list("id", "name", "generic_name")
+        for pk in pks:
+            self._discard(pk)
+        for pk, name, generic_name in rows:
+            self._add(pk, name, generic_name)
+
+    def _committed(self, docs, removed):
+        # runs on commit: a rolled-back write never reaches the index
+        with self._lock:
+            if self._built:
+                for pk in removed:
+                    self._discard(pk)
+                for pk, name, generic_name in docs:
+                    self._discard(pk)
+                    self._add(pk, name, generic_name)
+        version = index_changes.publish([doc[0] for doc in docs] + removed)
+        with self._lock:
+            # only our own write in between: the index already has it
+            if self._version is not None and version == self._version + 1:
+                self._version = version
+
+    def _published(self):
+        version = index_changes.publish()
+        with self._lock:
+            if self._version is not None and version == self._version + 1:
+                self._version = version
+
+    def invalidate(self):
+        # after a rebuild here: every other worker rebuilds too
+        transaction.on_commit(self._published)
+
+    def index(self, medicine):
+        self.index_many([medicine])
+
+    def index_many(self, medicines):
+        # one publish for the lot, so a bulk import moves the version once
+        docs = [(medicine.pk, medicine.name, medicine.generic_name) for medicine in medicines]
+        if docs:
+            transaction.on_commit(lambda: self._committed(docs, []))
+
+    def remove(self, pk):
+        transaction.on_commit(lambda: self._committed([], [pk]))
+
+    def _candidates(self, term):
+        # only the unpadded grams, so the term can also match inside a token
+        grams = {term[i:i + 3] for i in range(len(term) - 2)}
+        ids = None
+        for gram in sorted(grams, key=lambda g: len(self._trigrams.get(g, ()))):
+            posting = self._trigrams.get(gram)
+            if not posting:
+                return set()
+            ids = set(posting) if ids is None else ids & posting
+            if not ids:
+                return ids
+        return ids or set()
+
+    def _term_score(self, term, tokens):
+        best = 0.0
+        for token in tokens:
+            if token == term:
+                return self.EXACT_SCORE
+            if token.startswith(term):
+                best = max(best, self.PREFIX_SCORE)
+            elif term in token:
+                best = max(best, self.SUBSTRING_SCORE)
+        return best
+
+    def ranked_ids(self, keyword, limit=None):
+        terms = tokenize(keyword)
+        if not terms:
+            return []
+        with self._lock:
+            self._ensure_built()
+            ids = None
+            for term in terms:
+                if len(term) < 3:
+                    # too short for trigrams: scan the vocabulary, not the documents
+                    matches = {
+                        pk for token, posting in self._tokens.items()
+                        if term in token for pk in posting
+                    } if ids is None else ids
+                else:
+                    matches = self._candidates(term)
+                ids = matches if ids is None else ids & matches
+                if not ids:
+                    return []
+            scored = []
+            for pk in ids:
+                name_tokens, generic_tokens = self._docs[pk]
+                score = 0.0
+                for term in terms:
+                    name_score = self._term_score(term, name_tokens) * self.NAME_WEIGHT
+                    generic_score = self._term_score(term, generic_tokens) * self.GENERIC_WEIGHT
+                    term_score = max(name_score, generic_score)
+                    if not term_score:
+                        break
+                    score += term_score
+                else:
+                    scored.append((-score, " ".join(name_tokens), pk))
+        scored.sort()
+        return [pk for _, _, pk in scored[:limit]]
+
+    def search(self, queryset, keyword):
+        # the ranking is sent back as a CASE expression, so cap how many ids we ship
+        ids = self.ranked_ids(keyword, getattr(settings, "MEDICINE_SEARCH_MAX_RESULTS", 500))
+        if not ids:
+            return queryset.none()
+        rank = Case(
+            *[When(pk=pk, then=Value(i)) for i, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+        return queryset.filter(pk__in=ids).annotate(search_rank=rank).order_by("search_rank")
+
+
+class FullTextSearchBackend(BaseSearchBackend):
+    # Uses the FULLTEXT (MySQL) or GIN tsvector (PostgreSQL) index created in
+    # migration 0004, falling back to the in-memory index for short terms the
+    # native parser would drop.
+    def __init__(self):
+        self.fallback = InMemorySearchBackend()
+
+    def search(self, queryset, keyword):
+        terms = tokenize(keyword)
+        if not terms:
+            return queryset.none()
+        vendor = connection.vendor
+        if vendor == "mysql" and min(len(t) for t in terms) >= MYSQL_MIN_TOKEN_SIZE:
+            query = " ".join(f"+{t}*" for t in terms)
+            score = RawSQL(
+                "MATCH (name, generic_name) AGAINST (%s IN BOOLEAN MODE)",
+                (query,),
+                output_field=FloatField(),
+            )
+            return queryset.annotate(search_score=score).filter(
+                search_score__gt=0
+            ).order_by("-search_score", "name")
+        if vendor == "postgresql":
+            query = " & ".join(f"{t}:*" for t in terms)
+            document = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(generic_name, ''))"
+            score = RawSQL(
+                f"ts_rank({document}, to_tsquery('simple', %s))",
+                (query,),
+                output_field=FloatField(),
+            )
+            return queryset.extra(
+                where=[f"{document} @@ to_tsquery('simple', %s)"], params=[query]
+            ).annotate(search_score=score).order_by("-search_score", "name")
+        return self.fallback.search(queryset, keyword)
+
+    def index(self, medicine):
+        self.fallback.index(medicine)
+
+    def index_many(self, medicines):
+        self.fallback.index_many(medicines)
+
+    def remove(self, pk):
+        self.fallback.remove(pk)
+
+    def invalidate(self):
+        self.fallback.invalidate()
+
+    def rebuild(self):
+        from .models import Medicine
+
+        table = Medicine._meta.db_table
+        with connection.cursor() as cursor:
+            if connection.vendor == "mysql":
+                cursor.execute(f"OPTIMIZE TABLE {table}")
+                cursor.fetchall()
+            elif connection.vendor == "postgresql":
+                cursor.execute(f"REINDEX INDEX {FULLTEXT_INDEX_NAME}")
+        return self.fallback.rebuild()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, "MEDICINE_SEARCH_BACKEND", None)
+                if path:
+                    _backend = import_string(path)()
+                elif connection.vendor in ("mysql", "postgresql"):
+                    _backend = FullTextSearchBackend()
+                else:
+                    _backend = InMemorySearchBackend()
+    return _backend
@@ -0,0 +1,31 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.utils import timezone
+
+# Expired sessions are deleted a batch at a time by primary key, so the
+# sweep never holds a long lock on the session table that logins and every
+# request's session read are waiting on. Stores that expire entries by
+# themselves (cache, signed cookies) have nothing to sweep.
+
+
+def session_store():
+    return import_module(settings.SESSION_ENGINE).SessionStore
+
+
+def clear_expired(batch_size=1000, pause=0):
+    store = session_store()
+    if not hasattr(store, "get_model_class"):
+        store.clear_expired()
+        return None
+    sessions = store.get_model_class().objects
+    now = timezone.now()
+    deleted = 0
+    while True:
+        keys = list(sessions.filter(expire_date__lt=now).values_list("pk", flat=True)[:batch_size])
+        if not keys:
+            return deleted
+        deleted += sessions.filter(pk__in=keys, expire_date__lt=now).delete()[0]
+        if pause:
+            time.sleep(pause)
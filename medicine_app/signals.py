@@ -0,0 +1,122 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .autocomplete import get_autocomplete_index
+from .cache import invalidate_medicine, invalidate_pharmacies
+from .models import Availability, Inventory, InventoryChange, Medicine, Pharmacy, PharmacyStockSummary
+from .search import get_search_backend
+
+SUMMARY_FIELDS = {"quantity", "price", "pharmacy_id"}
+
+
+@receiver(post_save, sender=Medicine)
+def index_medicine(sender, instance, **kwargs):
+    get_search_backend().index(instance)
+    get_autocomplete_index().add(instance)
+    invalidate_medicine(instance.pk)
+
+
+@receiver(post_delete, sender=Medicine)
+def unindex_medicine(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+    get_autocomplete_index().discard(instance.pk)
+    invalidate_medicine(instance.pk)
+
+
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+def invalidate_inventory(sender, instance, **kwargs):
+    invalidate_medicine(instance.medicine_id)
+
+
+@receiver(post_save, sender=Inventory)
+def log_inventory_save(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        InventoryChange.objects.record("insert" if created else "update", instance)
+
+
+@receiver(post_delete, sender=Inventory)
+def log_inventory_delete(sender, instance, **kwargs):
+    InventoryChange.objects.record("delete", instance)
+
+
+@receiver(post_save, sender=Inventory)
+def sync_inventory_availability(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Availability.objects.refresh(pk=instance.pk)
+
+
+@receiver(post_save, sender=Pharmacy)
+@receiver(post_delete, sender=Pharmacy)
+def invalidate_pharmacy(sender, instance, **kwargs):
+    invalidate_pharmacies()
+
+
+@receiver(post_save, sender=Pharmacy)
+def sync_pharmacy_availability(sender, instance, created=False, raw=False, **kwargs):
+    if not (created or raw):
+        Availability.objects.refresh(pharmacy_id=instance.pk)
+
+
+@receiver(post_save, sender=Pharmacy)
+def create_stock_summary(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        PharmacyStockSummary.objects.get_or_create(pharmacy=instance)
+
+
+def _stock_value(quantity, price):
+    return (quantity or 0) * (price or 0)
+
+
+@receiver(post_init, sender=Inventory)
+def remember_inventory_state(sender, instance, **kwargs):
+    # snapshot what the summary counted for this row, without touching deferred fields
+    if instance.pk is not None and not SUMMARY_FIELDS & instance.get_deferred_fields():
+        instance._summary_state = (instance.pharmacy_id, instance.quantity, instance.price)
+
+
+@receiver(post_save, sender=Inventory)
+def update_stock_summary(sender, instance, created=False, raw=False, **kwargs):
+    if raw or instance.pharmacy_id is None:
+        return
+    previous = None if created else getattr(instance, "_summary_state", None)
+    if not created and (previous is None or previous[0] != instance.pharmacy_id):
+        # unknown or moved row: recount the affected pharmacies
+        PharmacyStockSummary.objects.refresh(instance.pharmacy_id)
+        if previous and previous[0]:
+            PharmacyStockSummary.objects.refresh(previous[0])
+    else:
+        old_quantity, old_price = (previous[1], previous[2]) if previous else (None, None)
+        PharmacyStockSummary.objects.apply(
+            instance.pharmacy_id,
+            skus=1 if created else 0,
+            out_of_stock=(instance.quantity == 0) - (old_quantity == 0),
+            value=_stock_value(instance.quantity, instance.price) - _stock_value(old_quantity, old_price),
+        )
+    instance._summary_state = (instance.pharmacy_id, instance.quantity, instance.price)
+
+
+@receiver(pre_delete, sender=Inventory)
+def read_committed_inventory_state(sender, instance, using=None, **kwargs):
+    # the row may have moved through adjust_stock since it was loaded: take
+    # back what the summary counted for it, locked until the delete commits
+    instance._summary_state = (
+        Inventory.objects.using(using).select_for_update()
+        .filter(pk=instance.pk).values_list("pharmacy_id", "quantity", "price").first()
+    )
+
+
+@receiver(post_delete, sender=Inventory)
+def remove_from_stock_summary(sender, instance, **kwargs):
+    state = getattr(instance, "_summary_state", None)
+    if state is None or state[0] is None:
+        if instance.pharmacy_id:
+            PharmacyStockSummary.objects.refresh(instance.pharmacy_id)
+        return
+    pharmacy_id, quantity, price = state
+    PharmacyStockSummary.objects.apply(
+        pharmacy_id,
+        skus=-1,
+        out_of_stock=-(quantity == 0),
+        value=-_stock_value(quantity, price),
+    )
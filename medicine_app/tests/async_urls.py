@@ -0,0 +1,12 @@
+from django.urls import path
+
+from medicine_app import async_views
+from medicine_app.urls import urlpatterns as app_urlpatterns
+
+# the app's URLs with the async read views in front, as MEDICINE_ASYNC_VIEWS wires them
+urlpatterns = [
+    path("", async_views.search_medicine, name="search_medicine"),
+    path("dashboard/", async_views.dashboard, name="dashboard"),
+    path("medicine/<int:pk>/", async_views.medicine_detail, name="medicine_detail"),
+    *app_urlpatterns,
+]
@@ -0,0 +1,40 @@
+from decimal import Decimal
+from itertools import count
+
+from medicine_app.models import Inventory, Medicine, Pharmacy, User
+
+_sequence = count(1)
+
+
+def make_user(**fields):
+    n = next(_sequence)
+    # no password hashing here; tests log in through the session
+    return User.objects.create(
+        first_name="Test", last_name="Owner", email=f"owner{n}@example.com", password="-", **fields,
+    )
+
+
+def make_pharmacy(user, **fields):
+    n = next(_sequence)
+    defaults = {
+        "name": f"Pharmacy {n}", "city": "Amman", "address": "Main Street",
+        "phone": "0790000000", "cr_number": f"CR-{n:05d}",
+    }
+    return Pharmacy.objects.create(user=user, **{**defaults, **fields})
+
+
+def make_medicine(user, name="Paracetamol", strength="500mg", form="Tablet", **fields):
+    return Medicine.objects.create(created_by=user, name=name, strength=strength, form=form, **fields)
+
+
+def make_inventory(pharmacy, medicine, quantity=10, price="2.50", **fields):
+    return Inventory.objects.create(
+        pharmacy=pharmacy, medicine=medicine, quantity=quantity, price=Decimal(price),
+        status="IN" if quantity > 0 else "OUT", **fields,
+    )
+
+
+def login(client, user):
+    session = client.session
+    session["user_id"] = user.pk
+    session.save()
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from medicine_app import alerts
+from medicine_app.models import Inventory, StockAlert, Watermark
+from medicine_app.tests.factories import make_inventory, make_medicine, make_pharmacy, make_user
+
+
+class ListSink:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, pharmacy, alerts):
+        self.sent += [(pharmacy["id"], alert["inventory_id"], alert["level"]) for alert in alerts]
+
+
+class StockAlertTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_user()
+        cls.pharmacy = make_pharmacy(owner)
+        cls.item = make_inventory(cls.pharmacy, make_medicine(owner), quantity=5, reorder_level=3)
+
+    def scan(self, **options):
+        sink = ListSink()
+        alerts.scan(sink, **options)
+        return sink.sent
+
+    def test_alerts_once_when_stock_crosses_the_reorder_level(self):
+        self.assertEqual(self.scan(), [])
+        Inventory.objects.adjust_stock(self.item.pk, -3)
+        self.assertEqual(self.scan(), [(self.pharmacy.pk, self.item.pk, "LOW")])
+        # the overlap re-reads the row; StockAlert keeps it from going out again
+        self.assertEqual(self.scan(), [])
+
+    def test_out_of_stock_after_low_alerts_again(self):
+        Inventory.objects.adjust_stock(self.item.pk, -3)
+        self.scan()
+        Inventory.objects.adjust_stock(self.item.pk, -2)
+        self.assertEqual(self.scan(), [(self.pharmacy.pk, self.item.pk, "OUT")])
+        # partly restocked: remembered as low, not sent
+        Inventory.objects.adjust_stock(self.item.pk, 1)
+        self.assertEqual(self.scan(), [])
+        self.assertEqual(StockAlert.objects.get(inventory=self.item).level, "LOW")
+
+    def test_restock_clears_the_alert(self):
+        Inventory.objects.adjust_stock(self.item.pk, -3)
+        self.scan()
+        Inventory.objects.adjust_stock(self.item.pk, 5)
+        self.scan()
+        self.assertFalse(StockAlert.objects.exists())
+        Inventory.objects.adjust_stock(self.item.pk, -5)
+        self.assertEqual(self.scan(), [(self.pharmacy.pk, self.item.pk, "LOW")])
+
+    def test_rows_behind_the_watermark_are_not_read_again(self):
+        Inventory.objects.adjust_stock(self.item.pk, -3)
+        Inventory.objects.filter(pk=self.item.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        later = make_inventory(self.pharmacy, make_medicine(make_user(), name="Ibuprofen"))
+        self.assertEqual(len(self.scan()), 1)
+        self.assertEqual(Watermark.objects.get(name=alerts.WATERMARK).timestamp, later.updated_at)
+        # even with its alert forgotten, the row is past the watermark's overlap
+        StockAlert.objects.all().delete()
+        self.assertEqual(self.scan(), [])
+
+    def test_watermark_advances_across_batches(self):
+        owner = make_user()
+        items = [make_inventory(self.pharmacy, make_medicine(owner, name=f"Medicine {n}"), quantity=0) for n in range(3)]
+        self.assertEqual({pk for _, pk, _ in self.scan(batch_size=1)}, {item.pk for item in items})
+        self.assertEqual(
+            Watermark.objects.get(name=alerts.WATERMARK).timestamp,
+            Inventory.objects.order_by("updated_at").last().updated_at,
+        )
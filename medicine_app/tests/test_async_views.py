@@ -0,0 +1,57 @@
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from medicine_app.benchmarking import percentile, summarize
+from medicine_app.cache import get_cache
+from medicine_app.tests.factories import login, make_inventory, make_medicine, make_pharmacy, make_user
+
+
+@override_settings(ROOT_URLCONF="medicine_app.tests.async_urls")
+class AsyncReadViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner, name="Downtown Pharmacy")
+        cls.medicine = make_medicine(cls.owner, name="Paracetamol")
+        make_inventory(cls.pharmacy, cls.medicine)
+
+    def setUp(self):
+        get_cache().clear()
+
+    async def test_search_page(self):
+        response = await self.async_client.get(reverse("search_medicine"), {"keyword": "para"})
+        self.assertContains(response, "Paracetamol")
+
+    async def test_medicine_detail_and_revalidation(self):
+        response = await self.async_client.get(reverse("medicine_detail", args=[self.medicine.pk]))
+        self.assertContains(response, "Downtown Pharmacy")
+        response = await self.async_client.get(
+            reverse("medicine_detail", args=[self.medicine.pk]), headers={"if-none-match": response["ETag"]},
+        )
+        self.assertEqual(response.status_code, 304)
+        response = await self.async_client.get(reverse("medicine_detail", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_dashboard_needs_a_login(self):
+        response = await self.async_client.get(reverse("dashboard"))
+        self.assertRedirects(response, reverse("auth_page"), fetch_redirect_response=False)
+
+    async def test_dashboard_lists_the_owners_pharmacies(self):
+        await sync_to_async(login)(self.client, self.owner)
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(reverse("dashboard"))
+        self.assertContains(response, "Downtown Pharmacy")
+
+
+class BenchmarkSummaryTests(TestCase):
+    def test_percentiles_are_nearest_rank(self):
+        values = [0.001 * n for n in range(1, 101)]
+        self.assertEqual(percentile(values, 50), values[49])
+        self.assertEqual(percentile(values, 99), values[98])
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_summary(self):
+        summary = summarize([0.002, 0.001, 0.004], wall_seconds=0.5, errors=1)
+        self.assertEqual((summary["requests"], summary["errors"], summary["throughput_rps"]), (3, 1, 6.0))
+        self.assertEqual((summary["p50_ms"], summary["max_ms"]), (2.0, 4.0))
@@ -0,0 +1,88 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from medicine_app import autocomplete
+from medicine_app.autocomplete import AutocompleteIndex
+from medicine_app.cache import get_cache
+from medicine_app.models import Medicine
+from medicine_app.tests.factories import make_medicine, make_user
+
+
+@override_settings(MEDICINE_AUTOCOMPLETE_SNAPSHOT=None)
+class AutocompleteIndexTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.owner = make_user()
+        self.index = AutocompleteIndex()
+        patcher = mock.patch.object(autocomplete, "_index", self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def committed_medicine(self, name, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return make_medicine(self.owner, name=name, **fields)
+
+    def test_prefix_completion(self):
+        self.committed_medicine("Paracetamol", generic_name="Acetaminophen")
+        self.committed_medicine("Panadol", generic_name="Paracetamol")
+        self.committed_medicine("Ibuprofen")
+        self.assertEqual(self.index.complete("pa"), ["Panadol", "Paracetamol"])
+        self.assertEqual(self.index.complete(" ACET"), ["Acetaminophen"])
+        self.assertEqual(self.index.complete("pa", limit=1), ["Panadol"])
+        self.assertEqual(self.index.complete(""), [])
+
+    def test_rename_and_delete_on_commit(self):
+        medicine = self.committed_medicine("Paracetamol")
+        self.assertEqual(self.index.complete("par"), ["Paracetamol"])
+        medicine.name = "Panadol"
+        with self.captureOnCommitCallbacks(execute=True):
+            medicine.save()
+        self.assertEqual(self.index.complete("par"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            medicine.delete()
+        self.assertEqual(self.index.complete("pan"), [])
+
+    def test_uncommitted_write_is_not_suggested(self):
+        self.index.complete("x")
+        with self.captureOnCommitCallbacks(execute=False):
+            make_medicine(self.owner, name="Paracetamol")
+        self.assertEqual(self.index.complete("par"), [])
+
+    def test_other_workers_catch_up(self):
+        other = AutocompleteIndex()
+        medicine = self.committed_medicine("Paracetamol")
+        self.assertEqual(other.complete("par"), ["Paracetamol"])
+        medicine.name = "Panadol"
+        with self.captureOnCommitCallbacks(execute=True):
+            medicine.save()
+        with mock.patch.object(other, "rebuild") as rebuild:
+            self.assertEqual(other.complete("pa"), ["Panadol"])
+        rebuild.assert_not_called()
+        with self.captureOnCommitCallbacks(execute=True):
+            medicine.delete()
+        self.assertEqual(other.complete("pa"), [])
+
+    def test_snapshot_load_catches_up(self):
+        kept = self.committed_medicine("Paracetamol")
+        gone = self.committed_medicine("Aspirin")
+        self.index.complete("x")
+        path = os.path.join(tempfile.mkdtemp(), "autocomplete.json")
+        self.addCleanup(os.remove, path)
+        self.assertEqual(self.index.save_snapshot(path), 2)
+
+        # written after the snapshot was taken
+        Medicine.objects.filter(pk=kept.pk).update(name="Panadol", updated_at=kept.updated_at.replace(year=2100))
+        Medicine.objects.filter(pk=gone.pk).delete()
+        make_medicine(self.owner, name="Ibuprofen")
+
+        warm = AutocompleteIndex()
+        self.assertTrue(warm.load_snapshot(path))
+        self.assertEqual(warm.complete("pa"), ["Panadol"])
+        self.assertEqual(warm.complete("as"), [])
+        self.assertEqual(warm.complete("ib"), ["Ibuprofen"])
+
+    def test_unreadable_snapshot_is_ignored(self):
+        self.assertFalse(AutocompleteIndex().load_snapshot(os.path.join(tempfile.mkdtemp(), "missing.json")))
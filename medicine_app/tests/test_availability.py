@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+
+from medicine_app.availability import prescription_offers, single_stop_pharmacies
+from medicine_app.tests.factories import make_inventory, make_medicine, make_pharmacy, make_user
+
+
+class PrescriptionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_user()
+        cls.paracetamol = make_medicine(owner)
+        cls.ibuprofen = make_medicine(owner, name="Ibuprofen", strength="200mg")
+        cls.amman_cheap = make_pharmacy(owner)
+        cls.amman_dear = make_pharmacy(owner)
+        cls.irbid = make_pharmacy(owner, city="Irbid")
+        cls.closed = make_pharmacy(owner, is_active=False)
+        cls.low_stock = make_pharmacy(owner)
+
+        make_inventory(cls.amman_cheap, cls.paracetamol, quantity=10, price="1.00")
+        make_inventory(cls.amman_cheap, cls.ibuprofen, quantity=10, price="5.00")
+        make_inventory(cls.amman_dear, cls.paracetamol, quantity=10, price="2.00")
+        make_inventory(cls.amman_dear, cls.ibuprofen, quantity=10, price="2.00")
+        make_inventory(cls.irbid, cls.paracetamol, quantity=10, price="0.50")
+        make_inventory(cls.closed, cls.paracetamol, quantity=10, price="0.10")
+        make_inventory(cls.low_stock, cls.paracetamol, quantity=1, price="0.20")
+
+    def test_cheapest_offers_per_medicine(self):
+        offers = prescription_offers([self.paracetamol.pk, self.ibuprofen.pk], per_medicine=3)
+        self.assertEqual(
+            [row["pharmacy_id"] for row in offers[self.paracetamol.pk]],
+            [self.low_stock.pk, self.irbid.pk, self.amman_cheap.pk],
+        )
+        self.assertEqual(
+            [row["price"] for row in offers[self.ibuprofen.pk]], [Decimal("2.00"), Decimal("5.00")],
+        )
+
+    def test_offers_honour_quantity_and_city(self):
+        offers = prescription_offers({self.paracetamol.pk: 2}, city="amman")
+        # the customer's city first, shelves with too little left out
+        self.assertEqual(
+            [row["pharmacy_id"] for row in offers[self.paracetamol.pk]],
+            [self.amman_cheap.pk, self.amman_dear.pk, self.irbid.pk],
+        )
+
+    def test_medicine_without_offers_is_listed_empty(self):
+        unstocked = make_medicine(make_user(), name="Aspirin")
+        self.assertEqual(prescription_offers([unstocked.pk]), {unstocked.pk: []})
+
+    def test_single_stop_needs_every_line(self):
+        stops = single_stop_pharmacies({self.paracetamol.pk: 2, self.ibuprofen.pk: 1})
+        # 2 x 2.00 + 2.00 beats 2 x 1.00 + 5.00
+        self.assertEqual([stop["pharmacy_id"] for stop in stops], [self.amman_dear.pk, self.amman_cheap.pk])
+        self.assertEqual(stops[0]["total"], Decimal("6.00"))
+
+    def test_api(self):
+        response = self.client.get(
+            reverse("availability_api"), {"medicine": [f"{self.paracetamol.pk}:2", str(self.ibuprofen.pk)]},
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data["offers"]), {str(self.paracetamol.pk), str(self.ibuprofen.pk)})
+        self.assertEqual(len(data["single_stop"]), 2)
+
+    def test_api_rejects_bad_lines(self):
+        for value in ("x", "1:x", "99999999999999999999999", f"{self.paracetamol.pk}:99999999999999"):
+            with self.subTest(value=value):
+                response = self.client.get(reverse("availability_api"), {"medicine": value})
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse("availability_api")).status_code, 400)
@@ -0,0 +1,35 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from medicine_app.benchmarking import SYNTHETIC_PASSWORD
+from medicine_app.hashing import get_hashing_service
+from medicine_app.tests.factories import make_inventory, make_medicine, make_pharmacy, make_user
+
+
+class BenchmarkCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_user()
+        owner.password = get_hashing_service().hash_password(SYNTHETIC_PASSWORD)
+        owner.save()
+        for name in ("Paracetamol", "Ibuprofen", "Cetirizine"):
+            make_inventory(make_pharmacy(owner), make_medicine(owner, name=name), quantity=20)
+
+    def run_benchmark(self, *only):
+        out = io.StringIO()
+        call_command("benchmark", "--requests=1", "--warmup=0", *(["--only", *only] if only else []), stdout=out)
+        return json.loads(out.getvalue())["results"]
+
+    def test_every_scenario_answers_as_expected(self):
+        results = self.run_benchmark()
+        self.assertEqual({name for name, result in results.items() if result["unexpected"]}, set())
+        self.assertEqual(results["dashboard"]["requests"], 1)
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_runs_with_a_cookie_session_store(self):
+        results = self.run_benchmark("dashboard", "logout", "auth_page:login")
+        self.assertEqual(results["dashboard"]["statuses"], {"200": 1})
+        self.assertEqual(sum(result["unexpected"] for result in results.values()), 0)
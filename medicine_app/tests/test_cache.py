@@ -0,0 +1,67 @@
+import time
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from medicine_app.cache import get_cache, get_medicine, invalidate_medicine, read_through
+from medicine_app.models import Medicine
+from medicine_app.tests.factories import make_medicine, make_user
+
+
+class ReadThroughTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def stale_entry(self, key, value):
+        get_cache().set(key, {"value": value, "soft": time.time() - 1}, 60)
+
+    def test_hit_does_not_recompute(self):
+        compute = mock.Mock(return_value="fresh")
+        self.assertEqual(read_through("key", compute), "fresh")
+        self.assertEqual(read_through("key", compute), "fresh")
+        compute.assert_called_once()
+
+    def test_lock_holder_recomputes_a_soft_expired_entry(self):
+        self.stale_entry("key", "stale")
+        self.assertEqual(read_through("key", lambda: "fresh"), "fresh")
+        self.assertEqual(read_through("key", mock.Mock()), "fresh")
+        self.assertIsNone(get_cache().get("lock:key"))
+
+    def test_others_serve_stale_while_the_lock_is_held(self):
+        self.stale_entry("key", "stale")
+        get_cache().add("lock:key", 1)
+        compute = mock.Mock(return_value="fresh")
+        self.assertEqual(read_through("key", compute), "stale")
+        compute.assert_not_called()
+
+    @override_settings(CATALOG_CACHE_LOCK_TIMEOUT=0.05)
+    def test_waiter_computes_when_the_holder_never_fills(self):
+        get_cache().add("lock:key", 1)
+        self.assertEqual(read_through("key", lambda: "fresh"), "fresh")
+
+    def test_failed_compute_releases_the_lock(self):
+        with self.assertRaises(ZeroDivisionError):
+            read_through("key", lambda: 1 / 0)
+        self.assertIsNone(get_cache().get("lock:key"))
+
+
+class MedicineCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.medicine = make_medicine(make_user(), name="Paracetamol")
+
+    def rename(self, name):
+        Medicine.objects.filter(pk=self.medicine.pk).update(name=name)
+        invalidate_medicine(self.medicine.pk)
+
+    def test_invalidated_on_commit(self):
+        self.assertEqual(get_medicine(self.medicine.pk).name, "Paracetamol")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rename("Panadol")
+        self.assertEqual(get_medicine(self.medicine.pk).name, "Panadol")
+
+    def test_not_invalidated_before_commit(self):
+        get_medicine(self.medicine.pk)
+        with self.captureOnCommitCallbacks(execute=False):
+            self.rename("Panadol")
+        self.assertEqual(get_medicine(self.medicine.pk).name, "Paracetamol")
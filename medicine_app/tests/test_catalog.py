@@ -0,0 +1,63 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from medicine_app.catalog import canonical, merge_duplicates
+from medicine_app.models import (
+    Availability, Inventory, Medicine, PharmacyStockSummary, PriceHistory, StockReservation,
+)
+from medicine_app.tests.factories import make_inventory, make_medicine, make_pharmacy, make_user
+
+
+class MergeDuplicatesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_user()
+        cls.keep = make_medicine(owner, strength="500mg")
+        cls.duplicate = make_medicine(owner, name="paracetamol", strength="0.5 g")
+        cls.both = make_pharmacy(owner)
+        cls.only_duplicate = make_pharmacy(owner)
+        cls.kept_row = make_inventory(cls.both, cls.keep, quantity=4)
+        cls.folded_row = make_inventory(cls.both, cls.duplicate, quantity=6)
+        cls.moved_row = make_inventory(cls.only_duplicate, cls.duplicate, quantity=3)
+        cls.reservation = Inventory.objects.reserve(cls.folded_row.pk, 2)
+
+    def test_same_key_finds_the_oldest_entry(self):
+        self.assertEqual(self.keep.canonical_key, self.duplicate.canonical_key)
+        self.assertEqual(canonical("PARACETAMOL", "500 mg", "Tablet"), self.keep)
+
+    def test_merge_repoints_and_folds_inventory(self):
+        result = merge_duplicates()
+        self.assertEqual(result["medicines_removed"], 1)
+        self.assertEqual((result["inventory_moved"], result["inventory_folded"]), (1, 1))
+        self.assertFalse(Medicine.objects.filter(pk=self.duplicate.pk).exists())
+
+        self.assertFalse(Inventory.objects.filter(pk=self.folded_row.pk).exists())
+        self.kept_row.refresh_from_db()
+        # 6 on the folded row less the 2 reserved
+        self.assertEqual(self.kept_row.quantity, 8)
+        self.assertEqual(StockReservation.objects.get(pk=self.reservation.pk).inventory_id, self.kept_row.pk)
+        self.assertEqual(Inventory.objects.get(pk=self.moved_row.pk).medicine_id, self.keep.pk)
+        self.assertEqual(
+            set(Availability.objects.filter(medicine=self.keep).values_list("pk", flat=True)),
+            {self.kept_row.pk, self.moved_row.pk},
+        )
+        self.assertEqual(PharmacyStockSummary.objects.reconcile(fix=False), [])
+
+    def test_merge_keeps_one_price_close_per_day(self):
+        today = timezone.localdate()
+        yesterday = today - timedelta(days=1)
+        PriceHistory.objects.create(medicine=self.keep, day=today, min_price=Decimal("2.00"), offers=1)
+        PriceHistory.objects.create(medicine=self.duplicate, day=today, min_price=Decimal("9.00"), offers=1)
+        PriceHistory.objects.create(medicine=self.duplicate, day=yesterday, min_price=Decimal("3.00"), offers=1)
+        merge_duplicates()
+        closes = dict(PriceHistory.objects.filter(medicine=self.keep).values_list("day", "min_price"))
+        self.assertEqual(closes, {today: Decimal("2.00"), yesterday: Decimal("3.00")})
+
+    def test_dry_run_changes_nothing(self):
+        result = merge_duplicates(dry_run=True)
+        self.assertEqual((result["groups"], result["medicines_removed"]), (1, 1))
+        self.assertTrue(Medicine.objects.filter(pk=self.duplicate.pk).exists())
+        self.assertEqual(Inventory.objects.get(pk=self.moved_row.pk).medicine_id, self.duplicate.pk)
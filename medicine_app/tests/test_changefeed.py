@@ -0,0 +1,115 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from medicine_app import changefeed
+from medicine_app.changefeed import SequenceTracker
+from medicine_app.models import InventoryChange
+from medicine_app.tests.factories import login, make_inventory, make_medicine, make_pharmacy, make_user
+
+
+def events(body):
+    # (id, data) for every message in an SSE body; data is None for cursors
+    parsed = []
+    for message in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.split("\n") if not line.startswith(":"))
+        if "id" in fields:
+            parsed.append((int(fields["id"]), json.loads(fields["data"]) if "data" in fields else None))
+    return parsed
+
+
+@override_settings(INVENTORY_FEED_POLL_SECONDS=0, INVENTORY_FEED_SETTLE_SECONDS=5)
+class SequenceTrackerTests(TestCase):
+    def change(self, sequence, age=0):
+        return InventoryChange.objects.create(
+            id=sequence, action="update", inventory_id=1, medicine_id=1, pharmacy_id=1,
+            created_at=timezone.now() - timedelta(seconds=age),
+        )
+
+    def test_holds_back_behind_a_recent_gap(self):
+        self.change(1, age=60)
+        self.change(2)
+        self.change(4)
+        tracker = SequenceTracker()
+        self.assertEqual(tracker.safe_sequence(), 2)
+        # the transaction holding 3 commits
+        self.change(3)
+        self.assertEqual(tracker.safe_sequence(), 4)
+
+    def test_moves_past_a_gap_once_it_has_settled(self):
+        self.change(1, age=60)
+        self.change(3)
+        tracker = SequenceTracker()
+        self.assertEqual(tracker.safe_sequence(), 1)
+        # 2 was rolled back: after the settle window the hole is skipped
+        InventoryChange.objects.filter(pk=3).update(created_at=timezone.now() - timedelta(seconds=10))
+        self.assertEqual(tracker.safe_sequence(), 3)
+
+    @override_settings(INVENTORY_FEED_POLL_SECONDS=60)
+    def test_scans_once_per_poll_interval(self):
+        self.change(1)
+        tracker = SequenceTracker()
+        tracker.safe_sequence()
+        with self.assertNumQueries(0):
+            tracker.safe_sequence()
+
+
+@override_settings(INVENTORY_FEED_POLL_SECONDS=0, INVENTORY_FEED_SETTLE_SECONDS=0)
+class InventoryFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner)
+        cls.medicine = make_medicine(cls.owner)
+        cls.other = make_medicine(cls.owner, name="Ibuprofen")
+        cls.item = make_inventory(cls.pharmacy, cls.medicine)
+        make_inventory(cls.pharmacy, cls.other)
+
+    def setUp(self):
+        patcher = mock.patch.object(changefeed, "tracker", SequenceTracker())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def feed(self, after=None, **params):
+        headers = {} if after is None else {"HTTP_LAST_EVENT_ID": str(after)}
+        response = self.client.get(reverse("inventory_changes"), params, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return events(response.content.decode())
+
+    def test_new_client_gets_only_a_cursor(self):
+        last = InventoryChange.objects.latest("id").pk
+        self.assertEqual(self.feed(medicine=self.medicine.pk), [(last, None)])
+
+    def test_resumes_after_last_event_id(self):
+        start = InventoryChange.objects.latest("id").pk
+        self.item.quantity = 4
+        self.item.save()
+        last = InventoryChange.objects.latest("id").pk
+        received = self.feed(start, medicine=self.medicine.pk)
+        self.assertEqual([sequence for sequence, _ in received], [last, last])
+        self.assertEqual(received[0][1]["quantity"], 4)
+        self.assertIsNone(received[-1][1])
+        self.assertEqual(self.feed(last, medicine=self.medicine.pk), [])
+
+    def test_skips_other_medicines_and_inactive_pharmacies(self):
+        received = self.feed(0, medicine=self.other.pk)
+        self.assertEqual([data["medicine_id"] for _, data in received if data], [self.other.pk])
+        self.pharmacy.is_active = False
+        self.pharmacy.save()
+        received = self.feed(0, medicine=self.other.pk)
+        self.assertEqual([data for _, data in received if data], [])
+
+    def test_pharmacy_feed_is_for_its_owner(self):
+        response = self.client.get(reverse("inventory_changes"), {"pharmacy": self.pharmacy.pk})
+        self.assertEqual(response.status_code, 401)
+        login(self.client, make_user())
+        response = self.client.get(reverse("inventory_changes"), {"pharmacy": self.pharmacy.pk})
+        self.assertEqual(response.status_code, 404)
+        login(self.client, self.owner)
+        received = self.feed(0, pharmacy=self.pharmacy.pk)
+        self.assertEqual(len([data for _, data in received if data]), 2)
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+
+from medicine_app.cache import get_cache
+from medicine_app.models import Medicine
+from medicine_app.tests.factories import make_inventory, make_medicine, make_pharmacy, make_user
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.medicine = make_medicine(cls.owner, name="Paracetamol")
+        make_inventory(make_pharmacy(cls.owner), cls.medicine)
+
+    def setUp(self):
+        get_cache().clear()
+
+    def get(self, name, *args, **headers):
+        return self.client.get(reverse(name, args=args), headers=headers)
+
+    def touch(self):
+        # a write a second later, so Last-Modified moves too
+        medicine = Medicine.objects.get(pk=self.medicine.pk)
+        Medicine.objects.filter(pk=medicine.pk).update(
+            name="Panadol", updated_at=medicine.updated_at + timedelta(seconds=1),
+        )
+
+    def test_search_api_revalidates(self):
+        first = self.get("search_medicine_api")
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("no-cache", first["Cache-Control"])
+        self.assertEqual(self.get("search_medicine_api", if_none_match=first["ETag"]).status_code, 304)
+        self.assertEqual(self.get("search_medicine_api", if_modified_since=first["Last-Modified"]).status_code, 304)
+
+        self.touch()
+        self.assertEqual(self.get("search_medicine_api", if_none_match=first["ETag"]).status_code, 200)
+        self.assertEqual(self.get("search_medicine_api", if_modified_since=first["Last-Modified"]).status_code, 200)
+
+    def test_medicine_detail_revalidates_on_new_offers(self):
+        first = self.get("medicine_detail", self.medicine.pk)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.get("medicine_detail", self.medicine.pk, if_none_match=first["ETag"]).status_code, 304)
+
+        make_inventory(make_pharmacy(self.owner), self.medicine)
+        response = self.get("medicine_detail", self.medicine.pk, if_none_match=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+
+    def test_unknown_medicine_is_not_a_304(self):
+        self.assertEqual(self.get("medicine_detail", 0, if_none_match="*").status_code, 404)
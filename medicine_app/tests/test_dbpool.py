@@ -0,0 +1,86 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from medicine_app.dbpool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def pool(self, **options):
+        return ConnectionPool("default", **{"max_size": 2, "timeout": 0.05, **options})
+
+    def acquire(self, pool, ping=lambda connection: True):
+        return pool.acquire(FakeConnection, ping)
+
+    def test_idle_connection_is_reused(self):
+        pool = self.pool()
+        first = self.acquire(pool)
+        pool.release(first)
+        self.assertIs(self.acquire(pool), first)
+        self.assertEqual((pool.stats()["created"], pool.stats()["checkouts"]), (1, 2))
+
+    def test_exhausted_pool_times_out(self):
+        pool = self.pool()
+        self.acquire(pool)
+        self.acquire(pool)
+        with self.assertRaises(PoolTimeout):
+            self.acquire(pool)
+        self.assertEqual(pool.stats()["timeouts"], 1)
+        self.assertEqual(pool.stats()["in_use"], 2)
+
+    def test_waiter_gets_a_released_connection(self):
+        pool = self.pool(max_size=1, timeout=5)
+        held = self.acquire(pool)
+        threading.Timer(0.05, pool.release, [held]).start()
+        self.assertIs(self.acquire(pool), held)
+        self.assertEqual(pool.stats()["waits"], 1)
+
+    def test_stale_connection_is_replaced(self):
+        pool = self.pool()
+        stale = self.acquire(pool)
+        pool.release(stale)
+        pool.max_lifetime = 0
+        time.sleep(0.001)
+        fresh = self.acquire(pool)
+        self.assertIsNot(fresh, stale)
+        self.assertTrue(stale.closed)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+    def test_failed_ping_is_replaced(self):
+        pool = self.pool(max_size=1)
+        dead = self.acquire(pool)
+        pool.release(dead)
+        fresh = self.acquire(pool, ping=lambda connection: False)
+        self.assertIsNot(fresh, dead)
+        self.assertTrue(dead.closed)
+        # the replacement took the dead connection's slot, not a new one
+        self.assertEqual(pool.stats()["in_use"], 1)
+
+    def test_failed_connect_frees_the_slot(self):
+        pool = self.pool(max_size=1)
+
+        def refuse():
+            raise OSError("refused")
+
+        with self.assertRaises(OSError):
+            pool.acquire(refuse, lambda connection: True)
+        self.assertIsInstance(self.acquire(pool), FakeConnection)
+
+    def test_release_after_close_closes_the_connection(self):
+        pool = self.pool()
+        idle, held = self.acquire(pool), self.acquire(pool)
+        pool.release(idle)
+        pool.close()
+        self.assertTrue(idle.closed)
+        pool.release(held)
+        self.assertTrue(held.closed)
+        self.assertEqual((pool.stats()["idle"], pool.stats()["in_use"]), (0, 0))
@@ -0,0 +1,56 @@
+import csv
+import gzip
+import io
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from medicine_app import exporting
+from medicine_app.exporting import export_queryset, iter_rows
+from medicine_app.tests.factories import login, make_inventory, make_medicine, make_pharmacy, make_user
+
+
+class ExportInventoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner, name="Downtown")
+        cls.stocked = make_inventory(cls.pharmacy, make_medicine(cls.owner, name="Paracetamol"), quantity=3)
+        cls.empty = make_inventory(cls.pharmacy, make_medicine(cls.owner, name="Ibuprofen"), quantity=0)
+        other = make_user()
+        make_inventory(make_pharmacy(other), make_medicine(other, name="Aspirin"))
+
+    def setUp(self):
+        login(self.client, self.owner)
+
+    def export(self, **params):
+        response = self.client.get(reverse("export_inventory"), params)
+        return response, b"".join(response.streaming_content) if response.streaming else None
+
+    def test_csv_has_only_the_owners_rows(self):
+        response, body = self.export()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual([row["name"] for row in rows], ["Paracetamol", "Ibuprofen"])
+        self.assertEqual((rows[0]["pharmacy"], rows[0]["quantity"]), ("Downtown", "3"))
+
+    def test_gzipped_jsonl_with_a_status_filter(self):
+        response, body = self.export(format="jsonl", gzip="1", status="OUT")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertTrue(response["Content-Disposition"].endswith('.jsonl.gz"'))
+        rows = [json.loads(line) for line in gzip.decompress(body).decode().splitlines()]
+        self.assertEqual([(row["medicine_id"], row["status"]) for row in rows], [(self.empty.medicine_id, "OUT")])
+
+    def test_bad_parameters_are_a_400(self):
+        for params in ({"format": "xml"}, {"status": "LOW"}, {"pharmacy": "x"}, {"pharmacy": "99999999999999999999"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.export(**params)[0].status_code, 400)
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_mysql_walks_the_primary_key_in_windows(self):
+        with mock.patch.object(exporting, "connection", mock.Mock(vendor="mysql")):
+            rows = list(iter_rows(export_queryset()))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][0], self.pharmacy.pk)
@@ -0,0 +1,41 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from medicine_app.hashing import HashingBusy, HashingService
+
+
+class HashingServiceTests(SimpleTestCase):
+    def test_hash_and_check(self):
+        service = HashingService(workers=1, rounds=4)
+        hashed = service.hash_password("secret123")
+        self.assertTrue(service.check_password("secret123", hashed))
+        self.assertFalse(service.check_password("secret124", hashed))
+        self.assertFalse(service.needs_rehash(hashed))
+
+    def test_dummy_hash_comes_from_the_pool(self):
+        service = HashingService(workers=1, rounds=4)
+        hashed = service.dummy_hash()
+        self.assertTrue(hashed.startswith("$2b$04$"))
+        self.assertFalse(service.check_password("anything1", hashed))
+        self.assertIs(service.dummy_hash(), hashed)
+
+    def test_refuses_work_beyond_max_pending(self):
+        service = HashingService(workers=1, max_pending=1, rounds=4)
+        release = threading.Event()
+        future = service._submit(release.wait)
+        with self.assertRaises(HashingBusy):
+            service.hash_password("secret123")
+        release.set()
+        future.result()
+        self.assertEqual(service.stats()["rejected"], 1)
+
+    def test_times_out_as_busy(self):
+        service = HashingService(workers=1, timeout=0.05, rounds=4)
+        service.dummy_hash()
+        release = threading.Event()
+        service._submit(release.wait)
+        with self.assertRaises(HashingBusy):
+            service.hash_password("secret123")
+        release.set()
+        self.assertEqual(service.stats()["timed_out"], 1)
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from medicine_app import changefeed, history
+from medicine_app.changefeed import SequenceTracker
+from medicine_app.models import InventoryChange, PriceHistory, Watermark
+from medicine_app.tests.factories import make_inventory, make_medicine, make_pharmacy, make_user
+
+
+@override_settings(INVENTORY_FEED_POLL_SECONDS=0, INVENTORY_FEED_SETTLE_SECONDS=0)
+class PriceHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_user()
+        cls.medicine = make_medicine(owner)
+        cls.cheap = make_inventory(make_pharmacy(owner), cls.medicine, price="2.00")
+        cls.dear = make_inventory(make_pharmacy(owner), cls.medicine, price="3.00")
+
+    def setUp(self):
+        patcher = mock.patch.object(changefeed, "tracker", SequenceTracker())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_records_todays_close(self):
+        self.assertEqual(history.record_pending(), 2)
+        row = PriceHistory.objects.get(medicine=self.medicine)
+        self.assertEqual(row.day, timezone.localdate())
+        self.assertEqual((row.min_price, row.max_price, row.offers), (Decimal("2.00"), Decimal("3.00"), 2))
+        self.assertEqual(Watermark.objects.get(name=history.WATERMARK).position, InventoryChange.objects.latest("id").pk)
+        self.assertEqual(history.record_pending(), 0)
+
+    def test_late_changes_are_not_backdated(self):
+        # changes from three days ago folded today: today's prices must not
+        # be written under that day
+        InventoryChange.objects.update(created_at=timezone.now() - timedelta(days=3))
+        history.record_pending()
+        self.assertEqual(
+            list(PriceHistory.objects.filter(medicine=self.medicine).values_list("day", flat=True)),
+            [timezone.localdate()],
+        )
+
+    def test_days_without_changes_repeat_the_last_close(self):
+        history.record_pending()
+        PriceHistory.objects.update(day=timezone.localdate() - timedelta(days=2))
+        self.cheap.price = Decimal("1.50")
+        self.cheap.save()
+        history.record_pending()
+        today = timezone.localdate()
+        days = PriceHistory.objects.daily(self.medicine.pk, today - timedelta(days=2), today)
+        self.assertEqual([day["min_price"] for day in days], [Decimal("2.00"), Decimal("2.00"), Decimal("1.50")])
+
+    def test_day_keeps_its_low_and_high(self):
+        history.record_pending()
+        # a price that came and went between two runs
+        self.cheap.price = Decimal("1.00")
+        self.cheap.save()
+        self.cheap.price = Decimal("2.00")
+        self.cheap.save()
+        self.dear.price = Decimal("5.00")
+        self.dear.save()
+        self.dear.price = Decimal("3.00")
+        self.dear.save()
+        history.record_pending()
+        row = PriceHistory.objects.get(medicine=self.medicine)
+        self.assertEqual((row.min_price, row.max_price), (Decimal("2.00"), Decimal("3.00")))
+        self.assertEqual((row.low_price, row.high_price), (Decimal("1.00"), Decimal("5.00")))
+
+    def test_days_carried_forward_take_the_close_as_their_range(self):
+        self.cheap.price = Decimal("1.00")
+        self.cheap.save()
+        self.cheap.price = Decimal("2.00")
+        self.cheap.save()
+        history.record_pending()
+        PriceHistory.objects.update(day=timezone.localdate() - timedelta(days=1))
+        today = timezone.localdate()
+        days = PriceHistory.objects.daily(self.medicine.pk, today - timedelta(days=1), today)
+        self.assertEqual([day["low_price"] for day in days], [Decimal("1.00"), Decimal("2.00")])
+
+
+class PriceHistoryApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.medicine = make_medicine(make_user())
+
+    def get(self, **params):
+        return self.client.get(reverse("price_history_api", args=[self.medicine.pk]), params)
+
+    def test_out_of_range_days_are_a_400(self):
+        for days in ("0", "367", "1000000", "-5"):
+            with self.subTest(days=days):
+                self.assertEqual(self.get(days=days).status_code, 400)
+        self.assertEqual(self.get(days="x").status_code, 400)
+        self.assertEqual(self.get(end="0001-01-02", days="30").status_code, 400)
+
+    def test_returns_the_range_for_each_day(self):
+        PriceHistory.objects.create(
+            medicine=self.medicine, day=timezone.localdate(), min_price=Decimal("2.00"), max_price=Decimal("3.00"),
+            avg_price=Decimal("2.50"), offers=2, low_price=Decimal("1.00"), high_price=Decimal("3.00"),
+        )
+        response = self.get(days="1")
+        self.assertEqual(response.status_code, 200)
+        (day,) = response.json()["days"]
+        self.assertEqual((day["min_price"], day["low_price"], day["high_price"]), ("2.00", "1.00", "3.00"))
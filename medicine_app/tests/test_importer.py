@@ -0,0 +1,98 @@
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from medicine_app.importer import import_inventory
+from medicine_app.models import Inventory, Medicine
+from medicine_app.tests.factories import login, make_pharmacy, make_user
+
+HEADER = "name,generic_name,form,strength,quantity,price\n"
+
+
+def csv_file(*lines):
+    return io.BytesIO((HEADER + "".join(line + "\n" for line in lines)).encode())
+
+
+class ImporterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner)
+
+    def run_import(self, *lines):
+        return import_inventory(csv_file(*lines), "stock.csv", self.pharmacy, self.owner)
+
+    def assertRejected(self, line, message):
+        result = self.run_import("Aspirin,,Tablet,100mg,5,1.00", line)
+        self.assertEqual(result.imported, 1)
+        self.assertEqual(result.errors, [(3, message)])
+
+    def test_imports_rows(self):
+        result = self.run_import("Aspirin,,Tablet,100mg,5,1.00", "Amoxicillin,,capsule,250 mg,0,3.5")
+        self.assertEqual((result.rows, result.imported, result.medicines_created), (2, 2, 2))
+        self.assertEqual(
+            set(Inventory.objects.values_list("medicine__name", "quantity", "status")),
+            {("Aspirin", 5, "IN"), ("Amoxicillin", 0, "OUT")},
+        )
+
+    def test_reimport_updates_stock(self):
+        self.run_import("Aspirin,,Tablet,100mg,5,1.00")
+        result = self.run_import("Aspirin,,Tablet,100mg,7,1.25")
+        self.assertEqual(result.medicines_created, 0)
+        self.assertEqual(Inventory.objects.get().quantity, 7)
+
+    def test_rejects_non_finite_numbers(self):
+        self.assertRejected("Ibuprofen,,Tablet,200mg,Infinity,1.00", "Quantity must be a whole number.")
+        self.assertRejected("Ibuprofen,,Tablet,200mg,3,NaN", "Price must be a number.")
+
+    def test_rejects_fractional_quantity(self):
+        self.assertRejected("Ibuprofen,,Tablet,200mg,1.7,1.00", "Quantity must be a whole number.")
+
+    def test_accepts_integral_decimal_quantity(self):
+        result = self.run_import("Ibuprofen,,Tablet,200mg,2.0,1.00")
+        self.assertEqual(result.errors, [])
+        self.assertEqual(Inventory.objects.get().quantity, 2)
+
+    def test_rejects_out_of_range_numbers(self):
+        self.assertRejected("Ibuprofen,,Tablet,200mg,1e400,1.00", "Quantity is too large.")
+        self.assertRejected("Ibuprofen,,Tablet,200mg,2147483648,1.00", "Quantity is too large.")
+        self.assertRejected("Ibuprofen,,Tablet,200mg,3,1e400", "Price is too large.")
+        self.assertRejected("Ibuprofen,,Tablet,200mg,3,99999999.999", "Price is too large.")
+
+    def test_rejects_long_text(self):
+        self.assertRejected("A" * 121 + ",,Tablet,200mg,3,1.00", "Medicine name cannot exceed 120 characters.")
+        self.assertRejected("Ibuprofen," + "B" * 121 + ",Tablet,200mg,3,1.00", "Generic name cannot exceed 120 characters.")
+        self.assertRejected("Ibuprofen,,Tablet," + "1" * 44 + "mg,3,1.00", "Invalid strength format (e.g., '500mg').")
+
+    def test_bad_rows_do_not_abort_the_batch(self):
+        result = self.run_import(
+            "Aspirin,,Tablet,100mg,5,1.00", "Bad,,Tablet,100mg,-1,1.00", "Ibuprofen,,Tablet,200mg,3,2.00",
+        )
+        self.assertEqual((result.imported, result.error_count), (2, 1))
+        self.assertEqual(Medicine.objects.count(), 2)
+
+
+class ImportViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner)
+
+    def setUp(self):
+        login(self.client, self.owner)
+
+    def post(self, content):
+        upload = SimpleUploadedFile("stock.csv", content, content_type="text/csv")
+        return self.client.post(reverse("import_inventory", args=[self.pharmacy.pk]), {"file": upload}, follow=True)
+
+    def test_imports_upload(self):
+        response = self.post((HEADER + "Aspirin,,Tablet,100mg,5,1.00\n").encode())
+        self.assertContains(response, "Imported 1 of 1 rows")
+
+    @override_settings(INVENTORY_IMPORT_MAX_BYTES=64)
+    def test_refuses_oversized_upload(self):
+        response = self.post((HEADER + "Aspirin,,Tablet,100mg,5,1.00\n" * 5).encode())
+        self.assertContains(response, "The file is too large")
+        self.assertFalse(Inventory.objects.exists())
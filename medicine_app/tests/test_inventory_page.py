@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.test import TestCase
+from django.urls import reverse
+
+from medicine_app.models import Inventory
+from medicine_app.tests.factories import login, make_inventory, make_medicine, make_pharmacy, make_user
+
+
+class InventoryRowCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner)
+        cls.medicine = make_medicine(cls.owner, name="Paracetamol")
+        cls.item = make_inventory(cls.pharmacy, cls.medicine, quantity=7)
+
+    def setUp(self):
+        cache.clear()
+        login(self.client, self.owner)
+
+    def page(self):
+        return self.client.get(reverse("pharmacy_inventory", args=[self.pharmacy.pk]))
+
+    def row_key(self):
+        item = Inventory.objects.select_related("medicine").get(pk=self.item.pk)
+        return make_template_fragment_key("inventory_row_v3", [item.pk, item.updated_at, item.medicine.updated_at])
+
+    def test_row_is_cached_under_its_timestamps(self):
+        self.page()
+        self.assertIn('data-quantity="7"', cache.get(self.row_key()))
+
+    def test_stock_change_renders_a_new_row(self):
+        self.page()
+        Inventory.objects.adjust_stock(self.item.pk, -2, reorder_level=3)
+        response = self.page()
+        self.assertContains(response, 'data-quantity="5"')
+        self.assertContains(response, 'data-reorder-level="3"')
+        self.assertNotContains(response, 'data-quantity="7"')
+
+    def test_medicine_rename_renders_a_new_row(self):
+        self.page()
+        self.medicine.name = "Panadol"
+        self.medicine.save()
+        response = self.page()
+        self.assertContains(response, 'data-item="Panadol"')
+        self.assertNotContains(response, "Paracetamol")
+
+    def test_rows_are_not_shared_between_pharmacies(self):
+        self.page()
+        other = make_inventory(make_pharmacy(self.owner), self.medicine, quantity=9)
+        response = self.client.get(reverse("pharmacy_inventory", args=[other.pharmacy_id]))
+        self.assertContains(response, reverse("edit_inventory", args=[other.pk]))
+        self.assertNotContains(response, reverse("edit_inventory", args=[self.item.pk]))
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from medicine_app import search
+from medicine_app.cache import get_cache
+from medicine_app.forms import InventoryForm
+from medicine_app.search import InMemorySearchBackend
+from medicine_app.tests.factories import login, make_inventory, make_medicine, make_pharmacy, make_user
+
+
+class MedicineLookupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner)
+        cls.medicines = {
+            name: make_medicine(cls.owner, name=name)
+            for name in ("Aspirin", "Cetirizine", "Ibuprofen", "Paracetamol", "Zinc")
+        }
+        make_inventory(cls.pharmacy, cls.medicines["Ibuprofen"])
+
+    def setUp(self):
+        get_cache().clear()
+        patcher = mock.patch.object(search, "_backend", InMemorySearchBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        login(self.client, self.owner)
+
+    def lookup(self, **params):
+        return self.client.get(reverse("lookup_medicine"), params)
+
+    def labels(self, response):
+        return [row["label"].split(" (")[0] for row in response.json()["results"]]
+
+    def test_pages_leave_out_what_the_pharmacy_stocks(self):
+        first = self.lookup(pharmacy=self.pharmacy.pk, limit=2).json()
+        self.assertEqual([row["id"] for row in first["results"]], [self.medicines["Aspirin"].pk, self.medicines["Cetirizine"].pk])
+        self.assertTrue(first["has_more"])
+        second = self.lookup(pharmacy=self.pharmacy.pk, limit=2, cursor=first["next_cursor"])
+        self.assertEqual(self.labels(second), ["Paracetamol", "Zinc"])
+        self.assertFalse(second.json()["has_more"])
+
+    def test_search(self):
+        self.assertEqual(self.labels(self.lookup(q="parac")), ["Paracetamol"])
+
+    def test_bad_input(self):
+        self.assertEqual(self.lookup(cursor="!!!").status_code, 400)
+        self.assertEqual(self.lookup(pharmacy="99999999999999999999").status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.lookup().status_code, 401)
+
+    def test_widget_loads_only_the_chosen_medicine(self):
+        chosen = self.medicines["Zinc"]
+        form = InventoryForm(initial={"medicine": chosen.pk}, pharmacy=self.pharmacy)
+        with self.assertNumQueries(1):
+            html = str(form["medicine"])
+        self.assertIn("Zinc (500mg, Tablet)", html)
+        self.assertIn(reverse("lookup_medicine") + "?pharmacy", html)
+        self.assertNotIn("Aspirin", html)
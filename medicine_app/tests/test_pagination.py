@@ -0,0 +1,45 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from medicine_app.models import Medicine
+from medicine_app.pagination import InvalidCursor, encode_cursor, keyset_page
+from medicine_app.tests.factories import make_medicine, make_user
+
+
+class KeysetPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_user()
+        for name in ("Aspirin", "Ibuprofen", "Naproxen", "Paracetamol", "Zinc"):
+            make_medicine(owner, name=name)
+
+    def page(self, cursor=None, limit=2):
+        return keyset_page(Medicine.objects.order_by("name", "id"), ("name",), limit, cursor)
+
+    def test_pages_follow_the_cursor(self):
+        names, cursor = [], None
+        while True:
+            results, has_more, cursor = self.page(cursor)
+            names += [row["name"] for row in results]
+            if not has_more:
+                break
+        self.assertEqual(names, ["Aspirin", "Ibuprofen", "Naproxen", "Paracetamol", "Zinc"])
+        self.assertIsNone(cursor)
+
+    def test_rejects_badly_typed_or_out_of_range_values(self):
+        for values in (["x", "x"], ["Aspirin", [1]], ["Aspirin", 10 ** 30]):
+            with self.subTest(values=values), self.assertRaises(InvalidCursor):
+                self.page(encode_cursor(values))
+        for cursor in ("!!!", encode_cursor({"name": "x"}), encode_cursor(["Aspirin"])):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                self.page(cursor)
+
+    def test_bad_cursor_is_a_400_not_a_500(self):
+        cursor = encode_cursor(["x", "x"])
+        response = self.client.get(reverse("search_medicine_api"), {"cursor": cursor})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("search_medicine_api"), {"keyword": "aspirin", "cursor": cursor})
+        self.assertEqual(response.status_code, 400)
+        # the page renders without results rather than failing
+        response = self.client.get(reverse("search_medicine"), {"cursor": cursor})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,53 @@
+from django.test import SimpleTestCase, TestCase, modify_settings, override_settings
+from django.urls import reverse
+
+from medicine_app import profiling
+from medicine_app.cache import get_cache
+from medicine_app.profiling import Histogram
+from medicine_app.tests.factories import make_inventory, make_medicine, make_pharmacy, make_user
+
+
+@modify_settings(MIDDLEWARE={"prepend": "medicine_app.profiling.ProfilingMiddleware"})
+@override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_STATS_TOKEN="secret", PROFILING_LOG_FILE=None)
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_user()
+        cls.medicine = make_medicine(owner)
+        make_inventory(make_pharmacy(owner), cls.medicine)
+
+    def setUp(self):
+        get_cache().clear()
+        profiling.store.reset()
+
+    def stats(self, token="secret"):
+        return self.client.get(reverse("profiling_stats"), headers={"x-stats-token": token})
+
+    def test_records_sampled_requests_per_view(self):
+        for _ in range(2):
+            self.client.get(reverse("medicine_detail", args=[self.medicine.pk]))
+        detail = self.stats().json()["views"]["medicine_detail"]
+        self.assertEqual(detail["samples"], 2)
+        self.assertGreater(detail["avg_queries"], 0)
+        self.assertGreater(detail["avg_template_ms"], 0)
+
+    @override_settings(PROFILING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_recorded(self):
+        self.client.get(reverse("medicine_detail", args=[self.medicine.pk]))
+        self.assertEqual(self.stats().json()["views"], {})
+
+    def test_stats_need_the_token(self):
+        self.assertEqual(self.stats(token="").status_code, 404)
+        self.assertEqual(self.stats(token="wrong").status_code, 404)
+        with override_settings(PROFILING_STATS_TOKEN=None):
+            self.assertEqual(self.stats(token="").status_code, 404)
+
+
+class HistogramTests(SimpleTestCase):
+    def test_percentiles_are_bucket_bounds_capped_at_the_max(self):
+        histogram = Histogram()
+        for ms in (0.5, 3, 3, 4, 180):
+            histogram.add(ms)
+        self.assertEqual(histogram.percentile(50), 5)
+        self.assertEqual(histogram.percentile(99), 180)
+        self.assertEqual(Histogram().percentile(50), 0.0)
@@ -0,0 +1,73 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from medicine_app.decorators import QueryBudgetExceeded, query_budget
+from medicine_app.models import Inventory
+from medicine_app.search import get_search_backend
+from medicine_app.tests.factories import login, make_inventory, make_medicine, make_pharmacy, make_user
+
+
+@override_settings(QUERY_BUDGET_RAISE=True, MEDICINE_ASYNC_VIEWS=False)
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner)
+        # enough rows that an N+1 would blow every budget below
+        cls.medicines = [make_medicine(cls.owner, name=f"Medicine {i}") for i in range(15)]
+        for medicine in cls.medicines[:10]:
+            make_inventory(cls.pharmacy, medicine)
+        for i in range(5):
+            make_inventory(make_pharmacy(cls.owner), cls.medicines[0])
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        # a cold in-process index costs a catalog scan once per worker, not per request
+        get_search_backend().rebuild()
+        login(self.client, self.owner)
+
+    def test_over_budget_raises(self):
+        @query_budget(1)
+        def view(request):
+            list(Inventory.objects.all())
+            list(Inventory.objects.all())
+
+        with self.assertRaises(QueryBudgetExceeded):
+            view(self.client.get("/").wsgi_request)
+
+    def test_medicine_detail(self):
+        response = self.client.get(reverse("medicine_detail", args=[self.medicines[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["inventories"]), 6)
+
+    def test_pharmacy_inventory(self):
+        response = self.client.get(reverse("pharmacy_inventory", args=[self.pharmacy.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Medicine 9")
+
+    def test_add_existing_inventory(self):
+        response = self.client.post(reverse("add_inventory", args=[self.pharmacy.pk]), {
+            "form_type": "existing", "medicine": self.medicines[12].pk,
+            "quantity": 3, "price": "1.50", "status": "IN",
+        })
+        self.assertRedirects(response, reverse("pharmacy_inventory", args=[self.pharmacy.pk]))
+        self.assertTrue(Inventory.objects.filter(pharmacy=self.pharmacy, medicine=self.medicines[12]).exists())
+
+    def test_add_new_medicine(self):
+        response = self.client.post(reverse("add_inventory", args=[self.pharmacy.pk]), {
+            "form_type": "new", "name": "Ibuprofen", "generic_name": "", "form": "Tablet",
+            "strength": "200mg", "description": "", "quantity": 3, "price": "1.50", "status": "IN",
+        })
+        self.assertRedirects(response, reverse("pharmacy_inventory", args=[self.pharmacy.pk]))
+        self.assertTrue(Inventory.objects.filter(pharmacy=self.pharmacy, medicine__name="Ibuprofen").exists())
+
+    def test_add_inventory_error_render(self):
+        # the invalid form re-renders the whole inventory table
+        response = self.client.post(reverse("add_inventory", args=[self.pharmacy.pk]), {
+            "form_type": "existing", "medicine": self.medicines[12].pk,
+            "quantity": -1, "price": "1.50", "status": "IN",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Medicine 9")
@@ -0,0 +1,22 @@
+from django.test import TestCase
+
+from medicine_app.explain import assert_uses_index, key_queries
+from medicine_app.tests.factories import make_inventory, make_medicine, make_pharmacy, make_user
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_user()
+        medicines = [make_medicine(owner, name=f"Medicine {i}") for i in range(5)]
+        for i in range(3):
+            pharmacy = make_pharmacy(owner, city="Amman" if i else "Irbid")
+            for medicine in medicines:
+                make_inventory(pharmacy, medicine, quantity=i)
+
+    def test_key_queries_use_indexes(self):
+        queries = key_queries()
+        self.assertIn("medicine_availability", queries)
+        for name, queryset in queries.items():
+            with self.subTest(name):
+                assert_uses_index(queryset)
@@ -0,0 +1,74 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+
+from medicine_app import routers
+from medicine_app.models import Medicine
+from medicine_app.routers import PrimaryPinningMiddleware, use_primary
+from medicine_app.tests.factories import make_medicine, make_user
+
+# TestCase wraps every test in a transaction, which sends all reads to the
+# primary, so these run outside one.
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class PrimaryReplicaRouterTests(TransactionTestCase):
+    def setUp(self):
+        tokens = routers._pinned.set(False), routers._wrote.set(False)
+        self.addCleanup(routers._wrote.reset, tokens[1])
+        self.addCleanup(routers._pinned.reset, tokens[0])
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(Medicine.objects.all().db, "replica")
+
+    def test_writes_go_to_the_primary_and_pin_later_reads(self):
+        self.assertEqual(routers.PrimaryReplicaRouter().db_for_write(Medicine), "default")
+        self.assertEqual(Medicine.objects.all().db, "default")
+        self.assertTrue(routers._wrote.get())
+
+    def test_atomic_blocks_read_from_the_primary(self):
+        with transaction.atomic():
+            self.assertEqual(Medicine.objects.all().db, "default")
+        self.assertEqual(Medicine.objects.all().db, "replica")
+
+    def test_use_primary(self):
+        with use_primary():
+            self.assertEqual(Medicine.objects.all().db, "default")
+        self.assertEqual(Medicine.objects.all().db, "replica")
+
+    def test_sessions_stay_on_the_primary_without_pinning(self):
+        self.assertEqual(Session.objects.all().db, "default")
+        self.assertEqual(routers.PrimaryReplicaRouter().db_for_write(Session), "default")
+        self.assertEqual(Medicine.objects.all().db, "replica")
+
+    def test_middleware_pins_a_client_that_wrote(self):
+        def view(request):
+            make_medicine(make_user())
+            return HttpResponse()
+
+        response = PrimaryPinningMiddleware(view)(RequestFactory().post("/"))
+        self.assertIn("pin_primary", response.cookies)
+        self.assertEqual(Medicine.objects.all().db, "replica")
+
+        request = RequestFactory().get("/")
+        request.COOKIES["pin_primary"] = response.cookies["pin_primary"].value
+        seen = []
+        PrimaryPinningMiddleware(lambda request: seen.append(Medicine.objects.all().db) or HttpResponse())(request)
+        self.assertEqual(seen, ["default"])
+
+
+@skipUnless("replica" in settings.DATABASES, "set DB_SQLITE_REPLICA_PATH to define a replica alias")
+class ReplicaAliasTests(TransactionTestCase):
+    databases = "__all__"
+
+    def test_replica_serves_rows_written_to_the_primary(self):
+        medicine = make_medicine(make_user())
+        token = routers._pinned.set(False)
+        self.addCleanup(routers._pinned.reset, token)
+        queryset = Medicine.objects.filter(pk=medicine.pk)
+        self.assertEqual(queryset.db, "replica")
+        self.assertTrue(queryset.exists())
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from medicine_app import search
+from medicine_app.cache import get_cache
+from medicine_app.search import InMemorySearchBackend, index_version
+from medicine_app.tests.factories import make_medicine, make_user
+
+
+class InMemoryIndexVersionTests(TestCase):
+    # two backends stand in for two workers sharing one cache
+    def setUp(self):
+        get_cache().clear()
+        self.owner = make_user()
+        self.here, self.there = InMemorySearchBackend(), InMemorySearchBackend()
+        self.here.rebuild()
+        self.there.rebuild()
+        patcher = mock.patch.object(search, "_backend", self.here)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_other_workers_see_a_committed_write(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            medicine = make_medicine(self.owner, name="Cetirizine")
+        # by re-reading the changed row, not the whole catalog
+        with mock.patch.object(self.there, "rebuild") as rebuild:
+            self.assertEqual(self.there.ranked_ids("cetirizine"), [medicine.pk])
+        rebuild.assert_not_called()
+
+    def test_other_workers_drop_a_deleted_medicine(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            medicine = make_medicine(self.owner, name="Cetirizine")
+        self.there.ranked_ids("cetirizine")
+        with self.captureOnCommitCallbacks(execute=True):
+            medicine.delete()
+        self.assertEqual(self.there.ranked_ids("cetirizine"), [])
+
+    def test_worker_rebuilds_when_a_change_was_evicted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            medicine = make_medicine(self.owner, name="Cetirizine")
+        get_cache().delete(f"{search.INDEX_VERSION_KEY}:{index_version()}")
+        with mock.patch.object(self.there, "rebuild", wraps=self.there.rebuild) as rebuild:
+            self.assertEqual(self.there.ranked_ids("cetirizine"), [medicine.pk])
+        rebuild.assert_called_once()
+
+    def test_a_batch_is_published_once(self):
+        version = index_version()
+        medicines = [make_medicine(self.owner, name=name) for name in ("Cetirizine", "Loratadine", "Fexofenadine")]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.here.index_many(medicines)
+        self.assertEqual(index_version(), version + 1)
+
+    def test_writing_worker_keeps_its_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            medicine = make_medicine(self.owner, name="Cetirizine")
+        with mock.patch.object(self.here, "rebuild") as rebuild:
+            self.assertEqual(self.here.ranked_ids("cetirizine"), [medicine.pk])
+        rebuild.assert_not_called()
+
+    def test_nothing_is_published_before_commit(self):
+        version = index_version()
+        with self.captureOnCommitCallbacks(execute=False):
+            make_medicine(self.owner, name="Cetirizine")
+        self.assertEqual(index_version(), version)
+        # not even in the worker that wrote it: the transaction may roll back
+        self.assertEqual(self.here.ranked_ids("cetirizine"), [])
+        self.assertEqual(self.there.ranked_ids("cetirizine"), [])
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from medicine_app.decorators import login_required
+from medicine_app.sessions import clear_expired, session_store
+from medicine_app.tests.factories import login, make_pharmacy, make_user
+
+
+class ClearExpiredTests(TestCase):
+    def make_session(self, expires_in):
+        store = session_store()()
+        store["user_id"] = 1
+        store.set_expiry(expires_in)
+        store.save()
+        return store.session_key
+
+    def test_deletes_expired_sessions_in_batches(self):
+        live = self.make_session(3600)
+        for _ in range(3):
+            key = self.make_session(3600)
+            Session.objects.filter(pk=key).update(expire_date=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(clear_expired(batch_size=2), 3)
+        self.assertEqual(list(Session.objects.values_list("pk", flat=True)), [live])
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_self_expiring_stores_have_nothing_to_sweep(self):
+        self.assertIsNone(clear_expired())
+
+
+class SessionEngineTests(TestCase):
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cache")
+    def test_cache_sessions_log_in_without_the_session_table(self):
+        owner = make_user()
+        make_pharmacy(owner, name="Downtown")
+        login(self.client, owner)
+        self.assertContains(self.client.get(reverse("dashboard")), "Downtown")
+        self.assertFalse(Session.objects.exists())
+
+
+class LoginRequiredTests(TestCase):
+    def request(self, user_id=None):
+        request = RequestFactory().get("/")
+        request.session = session_store()()
+        if user_id is not None:
+            request.session["user_id"] = user_id
+        request._messages = FallbackStorage(request)
+        return request
+
+    def test_anonymous_requests_are_sent_to_login(self):
+        view = login_required(lambda request: HttpResponse())
+        response = view(self.request())
+        self.assertEqual((response.status_code, response.url), (302, reverse("auth_page")))
+        api = login_required(json=True)(lambda request: HttpResponse())
+        self.assertEqual(api(self.request()).status_code, 401)
+
+    def test_user_is_loaded_only_when_read(self):
+        owner = make_user()
+        seen = {}
+
+        def view(request):
+            seen["user_id"] = request.user_id
+            return HttpResponse()
+
+        with self.assertNumQueries(0):
+            login_required(view)(self.request(owner.pk))
+        self.assertEqual(seen["user_id"], owner.pk)
+
+        request = self.request(owner.pk)
+        login_required(lambda request: HttpResponse(request.current_user.email))(request)
+        with self.assertNumQueries(0):
+            self.assertEqual(request.current_user, owner)
@@ -0,0 +1,162 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipIf
+
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from medicine_app.models import (
+    Availability, InsufficientStock, Inventory, InventoryChange, PharmacyStockSummary, StockReservation,
+)
+from medicine_app.tests.factories import login, make_inventory, make_medicine, make_pharmacy, make_user
+
+
+class AdjustStockTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner)
+        cls.item = make_inventory(cls.pharmacy, make_medicine(cls.owner), quantity=5, price="2.00")
+
+    def assertSummaryInStep(self):
+        self.assertEqual(PharmacyStockSummary.objects.reconcile(fix=False), [])
+
+    def test_decrement_to_zero_marks_out_of_stock(self):
+        self.assertEqual(Inventory.objects.adjust_stock(self.item.pk, -5), 0)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.status, "OUT")
+        self.assertFalse(Availability.objects.filter(pk=self.item.pk).exists())
+        self.assertSummaryInStep()
+
+    def test_stale_decrements_do_not_oversell(self):
+        # two terminals both saw 5 on the shelf and each sells 3
+        Inventory.objects.adjust_stock(self.item.pk, -3)
+        with self.assertRaises(InsufficientStock):
+            Inventory.objects.adjust_stock(self.item.pk, -3)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 2)
+
+    def test_price_change_moves_stock_value(self):
+        Inventory.objects.adjust_stock(self.item.pk, 2, price=Decimal("3.00"))
+        self.assertEqual(Availability.objects.get(pk=self.item.pk).price, Decimal("3.00"))
+        self.assertEqual(PharmacyStockSummary.objects.get(pharmacy=self.pharmacy).stock_value, Decimal("21.00"))
+        self.assertSummaryInStep()
+
+    def test_reserve_and_release(self):
+        reservation = Inventory.objects.reserve(self.item.pk, 4)
+        self.assertEqual(Inventory.objects.get(pk=self.item.pk).quantity, 1)
+        with self.assertRaises(InsufficientStock):
+            Inventory.objects.reserve(self.item.pk, 2)
+        StockReservation.objects.release(reservation.pk)
+        self.assertEqual(Inventory.objects.get(pk=self.item.pk).quantity, 5)
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertSummaryInStep()
+
+    def test_confirm_keeps_stock_taken(self):
+        reservation = Inventory.objects.reserve(self.item.pk, 2)
+        StockReservation.objects.confirm(reservation.pk)
+        self.assertEqual(Inventory.objects.get(pk=self.item.pk).quantity, 3)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_expired_reservations_are_returned(self):
+        reservation = Inventory.objects.reserve(self.item.pk, 2)
+        StockReservation.objects.filter(pk=reservation.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(StockReservation.objects.release_expired(), 1)
+        self.assertEqual(Inventory.objects.get(pk=self.item.pk).quantity, 5)
+
+
+class EditInventoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner)
+        cls.item = make_inventory(cls.pharmacy, make_medicine(cls.owner), quantity=10, price="2.00")
+
+    def setUp(self):
+        login(self.client, self.owner)
+
+    def edit(self, follow=False, **data):
+        fields = {"quantity": 8, "price": "2.50", "status": "IN", "reorder_level": 3, "original_quantity": 10}
+        return self.client.post(reverse("edit_inventory", args=[self.item.pk]), {**fields, **data}, follow=follow)
+
+    def test_applies_the_difference_to_current_stock(self):
+        # a sale of 3 lands while the owner has the form open at 10
+        Inventory.objects.adjust_stock(self.item.pk, -3)
+        self.edit(quantity=8)
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.quantity, self.item.price, self.item.reorder_level), (5, Decimal("2.50"), 3))
+        self.assertEqual(PharmacyStockSummary.objects.reconcile(fix=False), [])
+
+    def test_logs_one_change(self):
+        before = InventoryChange.objects.count()
+        with CaptureQueriesContext(connection) as queries:
+            self.edit()
+        self.assertEqual(InventoryChange.objects.count(), before + 1)
+        self.assertLessEqual(len(queries), 11)
+
+    def test_refuses_edit_without_original_quantity(self):
+        response = self.edit(original_quantity="", follow=True)
+        self.assertContains(response, "reload the page")
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.quantity, self.item.price), (10, Decimal("2.00")))
+
+
+class StockSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user()
+        cls.pharmacy = make_pharmacy(cls.owner)
+        cls.medicine = make_medicine(cls.owner)
+
+    def summary(self):
+        row = PharmacyStockSummary.objects.get(pharmacy=self.pharmacy)
+        return row.sku_count, row.out_of_stock_count, row.stock_value
+
+    def test_create_update_and_delete(self):
+        item = make_inventory(self.pharmacy, self.medicine, quantity=4, price="2.50")
+        self.assertEqual(self.summary(), (1, 0, Decimal("10.00")))
+        item.quantity = 0
+        item.save()
+        self.assertEqual(self.summary(), (1, 1, Decimal("0.00")))
+        item.delete()
+        self.assertEqual(self.summary(), (0, 0, Decimal("0.00")))
+
+    def test_delete_after_stock_moved_since_load(self):
+        item = make_inventory(self.pharmacy, self.medicine, quantity=4, price="2.50")
+        stale = Inventory.objects.get(pk=item.pk)
+        # sold out behind the loaded instance's back
+        Inventory.objects.adjust_stock(item.pk, -4)
+        stale.delete()
+        self.assertEqual(self.summary(), (0, 0, Decimal("0.00")))
+        self.assertEqual(PharmacyStockSummary.objects.reconcile(fix=False), [])
+
+
+@skipIf(connection.vendor == "sqlite", "SQLite serialises writers by locking the whole database")
+class ConcurrentStockTests(TransactionTestCase):
+    def test_concurrent_decrements_never_oversell(self):
+        owner = make_user()
+        item = make_inventory(make_pharmacy(owner), make_medicine(owner), quantity=20)
+        sold = []
+
+        def terminal():
+            try:
+                for _ in range(15):
+                    try:
+                        Inventory.objects.adjust_stock(item.pk, -1)
+                        sold.append(1)
+                    except InsufficientStock:
+                        pass
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=terminal) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        item.refresh_from_db()
+        self.assertEqual((len(sold), item.quantity, item.status), (20, 0, "OUT"))
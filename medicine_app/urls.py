@@ -1,21 +1,37 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views, profiling
+
+read_views = async_views if settings.MEDICINE_ASYNC_VIEWS else views
 
 urlpatterns = [
-    path("", views.search_medicine, name="search_medicine"),
+    path("", read_views.search_medicine, name="search_medicine"),
     path("auth/", views.auth_page, name="auth_page"),
     path("logout/", views.logout_view, name="logout"),
 
-    path("dashboard/", views.dashboard, name="dashboard"),
+    path("dashboard/", read_views.dashboard, name="dashboard"),
     path("pharmacy/add/", views.add_pharmacy, name="add_pharmacy"),
     path("pharmacy/<int:pk>/edit/", views.edit_pharmacy, name="edit_pharmacy"),
     path("pharmacy/<int:pk>/delete/", views.delete_pharmacy, name="delete_pharmacy"),
     
     path("pharmacy/<int:pk>/inventory/", views.pharmacy_inventory, name="pharmacy_inventory"),
     path("pharmacy/<int:pk>/inventory/add/", views.add_inventory, name="add_inventory"),
+    path("pharmacy/<int:pk>/inventory/import/", views.import_inventory, name="import_inventory"),
+    path("inventory/export/", views.export_inventory, name="export_inventory"),
     path("inventory/<int:pk>/edit/", views.edit_inventory, name="edit_inventory"),
     path("inventory/<int:pk>/delete/", views.delete_inventory, name="delete_inventory"),
+    path("inventory/<int:pk>/stock/", views.adjust_stock, name="adjust_stock"),
+    path("inventory/<int:pk>/reserve/", views.reserve_stock, name="reserve_stock"),
+    path("reservation/<int:pk>/confirm/", views.finish_reservation, {"action": "confirm"}, name="confirm_reservation"),
+    path("reservation/<int:pk>/release/", views.finish_reservation, {"action": "release"}, name="release_reservation"),
     
-    path("medicine/<int:pk>/", views.medicine_detail, name="medicine_detail"),
+    path("medicine/<int:pk>/", read_views.medicine_detail, name="medicine_detail"),
+    path("api/medicines/search/", views.search_medicine_api, name="search_medicine_api"),
+    path("api/availability/", views.availability_api, name="availability_api"),
+    path("api/medicines/<int:pk>/price-history/", views.price_history_api, name="price_history_api"),
+    path("api/medicines/autocomplete/", views.autocomplete_medicine, name="autocomplete_medicine"),
+    path("api/medicines/lookup/", views.lookup_medicine, name="lookup_medicine"),
+    path("api/inventory/changes/", async_views.inventory_changes, name="inventory_changes"),
+    path("stats/profiling/", profiling.profiling_stats, name="profiling_stats"),
 
 ]
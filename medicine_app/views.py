@@ -1,42 +1,254 @@
 from django.shortcuts import render,redirect,get_object_or_404
 from django.contrib import messages
-from .forms import SignupForm, LoginForm, PharmacyForm, MedicineForm, InventoryForm, InventoryFormNoMedicine,InventoryEditForm
-from .models import User,Medicine,Inventory,Pharmacy
-from django.http import JsonResponse
+from .forms import SignupForm, LoginForm, PharmacyForm, MedicineForm, InventoryForm, InventoryFormNoMedicine,InventoryEditForm,InventoryImportForm
+from .importer import ImportFormatError, import_inventory as run_inventory_import
+from .models import User,Medicine,Inventory,Pharmacy,PriceHistory,StockReservation,InsufficientStock
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .pagination import InvalidCursor, keyset_page
+from .autocomplete import get_autocomplete_index
+from .decorators import conditional_get, login_required, query_budget
+from .hashing import HashingBusy
+from .availability import prescription_offers, single_stop_pharmacies
+from .cache import get_medicine, get_medicine_offers
+from .exporting import FORMATS, aiter_stream, export_queryset, export_stream
+from .catalog import canonical as canonical_medicine, similar as similar_medicines
+from django.http import Http404
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.core.exceptions import ValidationError
-
-def search_medicine(request):
+from django.db.models import Count, Max
+from hashlib import md5
+from datetime import date, timedelta
+
+SEARCH_API_FIELDS = ("id", "name", "generic_name", "form", "strength")
+# the medicine was merged into another catalog entry, or the same item was
+# added from another tab, between the form's checks and the insert
+CONCURRENT_ADD_ERROR = "This item changed while you were adding it; reload the page and try again."
+MAX_DB_INTEGER = 2**31 - 1
+
+def _etag(*parts):
+    return 'W/"%s"' % md5("|".join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
+
+def _page_owner(request):
+    # pages render the user's navbar and any queued messages; the messages
+    # must reach the user, so a page with some pending is never a 304
+    if len(messages.get_messages(request)):
+        return None
+    return request.session.get("user_id", "-")
+
+def _medicines_validators(request, medicines, *parts):
+    found = medicines.order_by().aggregate(last=Max("updated_at"), count=Count("id"))
+    return _etag(request.get_full_path(), found["last"], found["count"], *parts), found["last"]
+
+def search_api_validators(request):
+    keyword = (request.GET.get("keyword") or "").strip()
+    medicines = Medicine.objects.search(keyword) if keyword else Medicine.objects.all()
+    return _medicines_validators(request, medicines, "api")
+
+def search_page_validators(request):
+    if request.headers.get("x-requested-with") == "XMLHttpRequest":
+        return search_api_validators(request)
+    owner = _page_owner(request)
+    if owner is None:
+        return None
     keyword = request.GET.get("keyword")
-    medicines = Medicine.objects.all()
+    medicines = Medicine.objects.search(keyword) if keyword else Medicine.objects.all()
+    return _medicines_validators(request, medicines, owner)
+
+def medicine_detail_validators(request, pk):
+    owner = _page_owner(request)
+    if owner is None:
+        return None
+    # the medicine, its offers and the pharmacies behind them, in one query
+    found = Medicine.objects.filter(pk=pk).aggregate(
+        updated=Max("updated_at"),
+        inventory_updated=Max("inventory__updated_at"),
+        pharmacy_updated=Max("inventory__pharmacy__updated_at"),
+        offers=Count("inventory"),
+    )
+    if found["updated"] is None:
+        return None
+    last = max(t for t in (found["updated"], found["inventory_updated"], found["pharmacy_updated"]) if t)
+    return _etag(request.get_full_path(), owner, *found.values()), last
+
+def search_page(request):
+    # one keyset page of the search, shared by the page and the JSON API
+    keyword = (request.GET.get("keyword") or "").strip()
+    try:
+        limit = int(request.GET.get("limit", settings.MEDICINE_SEARCH_API_PAGE_SIZE))
+    except ValueError:
+        limit = settings.MEDICINE_SEARCH_API_PAGE_SIZE
+    limit = max(1, min(limit, settings.MEDICINE_SEARCH_API_MAX_PAGE_SIZE))
+
     if keyword:
         medicines = Medicine.objects.search(keyword)
+    else:
+        medicines = Medicine.objects.order_by("name", "id")
+    return keyset_page(medicines, SEARCH_API_FIELDS, limit, request.GET.get("cursor"))
 
+@conditional_get(search_page_validators)
+def search_medicine(request):
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
-        results = [
-            {
-                "id": m.id,
-                "name": m.name,
-                "generic_name": m.generic_name,
-                "form": m.form,
-                "strength": m.strength,
-            }
-            for m in medicines
-        ]
-        return JsonResponse({"results": results})
+        # search_page_validators already answered for the API
+        return search_results(request)
+
+    # only the first page; Load more fetches the rest from the API
+    try:
+        medicines, has_more, next_cursor = search_page(request)
+    except InvalidCursor:
+        medicines, has_more, next_cursor = [], False, None
+
     return render(request, "search_medicine.html", {
         "medicines": medicines,
-        "keyword": keyword,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+        "keyword": request.GET.get("keyword"),
     })
 
+def search_results(request):
+    try:
+        results, has_more, next_cursor = search_page(request)
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "results": results,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    })
+
+@conditional_get(search_api_validators, private=False)
+def search_medicine_api(request):
+    return search_results(request)
+
+@login_required(json=True)
+def lookup_medicine(request):
+    # backs MedicineLookupWidget: one page of the catalog at a time
+    query = (request.GET.get("q") or "").strip()
+    try:
+        limit = int(request.GET.get("limit", settings.MEDICINE_SEARCH_API_PAGE_SIZE))
+    except ValueError:
+        limit = settings.MEDICINE_SEARCH_API_PAGE_SIZE
+    limit = max(1, min(limit, settings.MEDICINE_SEARCH_API_MAX_PAGE_SIZE))
+
+    if query:
+        medicines = Medicine.objects.search(query)
+    else:
+        medicines = Medicine.objects.order_by("name", "id")
+    pharmacy_id = request.GET.get("pharmacy")
+    if pharmacy_id and pharmacy_id.isdigit():
+        if int(pharmacy_id) > MAX_DB_INTEGER:
+            return JsonResponse({"error": "pharmacy is out of range."}, status=400)
+        medicines = medicines.exclude(inventory__pharmacy_id=pharmacy_id)
+
+    try:
+        results, has_more, next_cursor = keyset_page(
+            medicines, ("id", "name", "form", "strength"), limit, request.GET.get("cursor")
+        )
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "results": [
+            {"id": m["id"], "label": f"{m['name']} ({m['strength']}, {m['form']})"}
+            for m in results
+        ],
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    })
+
+def autocomplete_medicine(request):
+    try:
+        limit = int(request.GET.get("limit", settings.MEDICINE_AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        limit = settings.MEDICINE_AUTOCOMPLETE_LIMIT
+    limit = max(1, min(limit, settings.MEDICINE_AUTOCOMPLETE_LIMIT))
+    suggestions = get_autocomplete_index().complete(request.GET.get("q", ""), limit)
+    return JsonResponse({"suggestions": suggestions})
+
+@query_budget(4)
+@conditional_get(medicine_detail_validators)
 def medicine_detail(request, pk):
-    medicine = get_object_or_404(Medicine, pk=pk)
-    inventories = Inventory.objects.filter(medicine=medicine).select_related("pharmacy")
+    medicine = get_medicine(pk)
+    if medicine is None:
+        raise Http404("No Medicine matches the given query.")
+    city = request.GET.get("city", "")
+    inventories = get_medicine_offers(pk, city)
 
     return render(request, "medicine_detail.html", {
         "medicine": medicine,
         "inventories": inventories,
+        "city": city,
     })
     
+def availability_api(request):
+    prescription = {}
+    try:
+        for item in request.GET.getlist("medicine"):
+            medicine_id, _, quantity = item.partition(":")
+            medicine_id, quantity = int(medicine_id), int(quantity or 1)
+            # both are compared with integer columns; larger values overflow the query
+            if abs(medicine_id) > MAX_DB_INTEGER or quantity > MAX_DB_INTEGER:
+                raise ValueError
+            prescription[medicine_id] = quantity
+    except ValueError:
+        return JsonResponse({"error": "medicine must be an id or id:quantity."}, status=400)
+    if not prescription:
+        return JsonResponse({"error": "At least one medicine is required."}, status=400)
+    if len(prescription) > settings.AVAILABILITY_MAX_LINES:
+        return JsonResponse({"error": f"At most {settings.AVAILABILITY_MAX_LINES} medicines per request."}, status=400)
+
+    city = request.GET.get("city")
+    offers = prescription_offers(prescription, city=city)
+    single_stop = single_stop_pharmacies(prescription, city=city)
+    return JsonResponse({
+        "offers": {str(k): v for k, v in offers.items()},
+        "single_stop": single_stop,
+    })
+
+def price_history_api(request, pk):
+    # Per day: the close of the medicine's in-stock offers (min/max/avg price
+    # and offer count as last recorded that day) and the lowest and highest
+    # offer seen during it. ?start=&end= (YYYY-MM-DD) or the last ?days=.
+    if not Medicine.objects.filter(pk=pk).exists():
+        raise Http404("No Medicine matches the given query.")
+    range_error = JsonResponse({"error": f"Ranges are 1 to {settings.PRICE_HISTORY_MAX_DAYS} days."}, status=400)
+    try:
+        end = date.fromisoformat(request.GET["end"]) if request.GET.get("end") else timezone.localdate()
+        if request.GET.get("start"):
+            start = date.fromisoformat(request.GET["start"])
+        else:
+            days = int(request.GET.get("days", 30))
+            if not 1 <= days <= settings.PRICE_HISTORY_MAX_DAYS:
+                return range_error
+            start = end - timedelta(days=days - 1)
+    except ValueError:
+        return JsonResponse({"error": "start and end must be dates (YYYY-MM-DD), days a number."}, status=400)
+    except OverflowError:
+        # a range reaching before year 1
+        return range_error
+    if start > end or (end - start).days >= settings.PRICE_HISTORY_MAX_DAYS:
+        return range_error
+
+    days = PriceHistory.objects.daily(pk, start, end)
+    return JsonResponse({
+        "medicine": pk,
+        "days": [
+            {
+                "day": d["day"].isoformat(),
+                "min_price": None if d["min_price"] is None else str(d["min_price"]),
+                "max_price": None if d["max_price"] is None else str(d["max_price"]),
+                "avg_price": None if d["avg_price"] is None else str(d["avg_price"]),
+                "offers": d["offers"],
+                "low_price": None if d["low_price"] is None else str(d["low_price"]),
+                "high_price": None if d["high_price"] is None else str(d["high_price"]),
+            }
+            for d in days
+        ],
+    })
+
 def auth_page(request):
     login_form = LoginForm()
     signup_form = SignupForm()
@@ -47,8 +259,17 @@ def auth_page(request):
             login_form = LoginForm(request.POST)
             if login_form.is_valid():
                 cd = login_form.cleaned_data
-                user = User.objects.authenticate(cd["email"], cd["password"])
+                try:
+                    user = User.objects.authenticate(cd["email"], cd["password"])
+                except HashingBusy:
+                    messages.error(request, "The server is busy, please try again in a moment.")
+                    return render(request, "auth_page.html", {
+                        "login_form": login_form,
+                        "signup_form": signup_form
+                    }, status=503)
                 if user:
+                    # a new key on login, so a key issued before it is worthless
+                    request.session.cycle_key()
                     request.session["user_id"] = user.id
                     messages.success(request, f"Welcome back {user.first_name}!")
                     return redirect("dashboard")
@@ -59,12 +280,19 @@ def auth_page(request):
             signup_form = SignupForm(request.POST)
             if signup_form.is_valid():
                 cd = signup_form.cleaned_data
-                User.objects.create_user(
-                    first_name=cd["first_name"],
-                    last_name=cd["last_name"],
-                    email=cd["email"],
-                    password=cd["password"],
-                )
+                try:
+                    User.objects.create_user(
+                        first_name=cd["first_name"],
+                        last_name=cd["last_name"],
+                        email=cd["email"],
+                        password=cd["password"],
+                    )
+                except HashingBusy:
+                    messages.error(request, "The server is busy, please try again in a moment.")
+                    return render(request, "auth_page.html", {
+                        "login_form": login_form,
+                        "signup_form": signup_form
+                    }, status=503)
                 messages.success(request, "Account created successfully! Please login.")
                 return redirect("auth_page")
             else:
@@ -80,28 +308,22 @@ def logout_view(request):
     messages.success(request, "You have been logged out.")
     return redirect("auth_page")
 
+@login_required
 def dashboard(request):
-    if "user_id" not in request.session:
-        messages.error(request, "You should login first.")
-        return redirect("auth_page")
-
-    pharmacies = Pharmacy.objects.filter(user_id=request.session["user_id"])
+    pharmacies = Pharmacy.objects.filter(user_id=request.user_id).select_related("stock_summary")
 
     return render(request, "dashboard.html", {
         "pharmacies": pharmacies
     })
 
 
+@login_required
 def add_pharmacy(request):
-    if "user_id" not in request.session:
-        messages.error(request, "You should login first.")
-        return redirect("auth_page")
-
     if request.method == "POST":
         form = PharmacyForm(request.POST)
         if form.is_valid():
             pharmacy = form.save(commit=False)
-            pharmacy.user_id = request.session["user_id"]
+            pharmacy.user_id = request.user_id
             pharmacy.save()
             messages.success(request, "Pharmacy added successfully.")
             return redirect("dashboard")
@@ -109,12 +331,9 @@ def add_pharmacy(request):
         form = PharmacyForm()
     return render(request, "pharmacy_form.html", {"form": form})
 
+@login_required
 def edit_pharmacy(request, pk):
-    if "user_id" not in request.session:
-        messages.error(request, "You should login first.")
-        return redirect("auth_page")
-
-    pharmacy = get_object_or_404(Pharmacy, pk=pk, user_id=request.session["user_id"])
+    pharmacy = get_object_or_404(Pharmacy, pk=pk, user_id=request.user_id)
 
     if request.method == "POST":
         form = PharmacyForm(request.POST, instance=pharmacy)
@@ -126,11 +345,9 @@ def edit_pharmacy(request, pk):
         form = PharmacyForm(instance=pharmacy)
     return render(request, "pharmacy_form.html", {"form": form, "edit": True})
 
+@login_required
 def delete_pharmacy(request, pk):
-    if "user_id" not in request.session:
-        messages.error(request, "You should login first.")
-        return redirect("auth_page")
-    pharmacy = get_object_or_404(Pharmacy, pk=pk, user_id=request.session["user_id"])
+    pharmacy = get_object_or_404(Pharmacy, pk=pk, user_id=request.user_id)
     if request.method == "POST":
         pharmacy.delete()
         messages.info(request, "Pharmacy edited successfully.")
@@ -138,15 +355,19 @@ def delete_pharmacy(request, pk):
 
     return redirect("dashboard")
 
-def pharmacy_inventory(request, pk):
-    if "user_id" not in request.session:
-        messages.error(request, "You should login first.")
-        return redirect("auth_page")
+def inventory_rows(pharmacy):
+    return Inventory.objects.filter(pharmacy=pharmacy).select_related("medicine").only(
+        "quantity", "price", "status", "reorder_level", "updated_at",
+        "medicine__name", "medicine__form", "medicine__strength", "medicine__updated_at",
+    )
 
-    pharmacy = get_object_or_404(Pharmacy, pk=pk, user_id=request.session["user_id"])
-    inventory_items = Inventory.objects.filter(pharmacy=pharmacy)
+@query_budget(5)
+@login_required
+def pharmacy_inventory(request, pk):
+    pharmacy = get_object_or_404(Pharmacy, pk=pk, user_id=request.user_id)
+    inventory_items = inventory_rows(pharmacy)
     
-    inventory_form = InventoryForm()
+    inventory_form = InventoryForm(pharmacy=pharmacy)
     medicine_form = MedicineForm()
     inventory_no_medicine_form = InventoryFormNoMedicine()
     
@@ -156,35 +377,41 @@ def pharmacy_inventory(request, pk):
         "inventory_form": inventory_form,
         "medicine_form": medicine_form,
         "inventory_no_medicine_form": inventory_no_medicine_form,
+        "row_cache_ttl": settings.INVENTORY_ROW_CACHE_TTL,
     }
     return render(request, "pharmacy_inventory.html", context)
 
+# also pays for Availability, the change log, the catalog lookups and the
+# savepoint around the insert
+@query_budget(16)
+@login_required
 def add_inventory(request, pk):
-    if "user_id" not in request.session:
-        messages.error(request, "You should login first.")
-        return redirect("auth_page")
-
-    pharmacy = get_object_or_404(Pharmacy, pk=pk, user_id=request.session["user_id"])
+    pharmacy = get_object_or_404(Pharmacy, pk=pk, user_id=request.user_id)
 
     if request.method != "POST":
         return redirect("pharmacy_inventory", pk=pharmacy.id)
 
     form_type = request.POST.get("form_type")
 
-    inventory_items = Inventory.objects.filter(pharmacy=pharmacy)
+    inventory_items = inventory_rows(pharmacy)
 
     if form_type == "existing":
-        inv_form = InventoryForm(request.POST)
+        inv_form = InventoryForm(request.POST, pharmacy=pharmacy)
         if inv_form.is_valid():
             inv = inv_form.save(commit=False)
             inv.pharmacy = pharmacy
             try:
-                inv.full_clean()
-                inv.save()
+                # the form already resolved medicine and pharmacy came from
+                # get_object_or_404; Inventory.clean covers the unique pair
+                inv.full_clean(exclude=["medicine", "pharmacy"], validate_unique=False)
+                with transaction.atomic():
+                    inv.save()
                 messages.success(request, "Inventory item added.")
                 return redirect("pharmacy_inventory", pk=pharmacy.id)
             except ValidationError as e:
                 inv_form.add_error(None, e)
+            except IntegrityError:
+                inv_form.add_error(None, CONCURRENT_ADD_ERROR)
 
         return render(request, "pharmacy_inventory.html", {
             "pharmacy": pharmacy,
@@ -193,66 +420,129 @@ def add_inventory(request, pk):
             "medicine_form": MedicineForm(),
             "inventory_no_medicine_form": InventoryFormNoMedicine(),
             "open_modal": "addInventoryModal",
+            "row_cache_ttl": settings.INVENTORY_ROW_CACHE_TTL,
         })
 
     elif form_type == "new":
         med_form = MedicineForm(request.POST)
         inv_nm_form = InventoryFormNoMedicine(request.POST)
+        suggestions = []
         if med_form.is_valid() and inv_nm_form.is_valid():
-            med = med_form.save(commit=False)
-            med.created_by_id = request.session["user_id"]
-            try:
-                med.full_clean()
-                med.save()
-
-                inv = Inventory(
-                    pharmacy=pharmacy,
-                    medicine=med,
-                    quantity=inv_nm_form.cleaned_data["quantity"],
-                    price=inv_nm_form.cleaned_data["price"],
-                    status=inv_nm_form.cleaned_data["status"],
-                )
-                inv.full_clean()
-                inv.save()
-                messages.success(request, "New medicine and inventory item added.")
-                return redirect("pharmacy_inventory", pk=pharmacy.id)
-            except ValidationError as e:
-                inv_nm_form.add_error(None, e)
+            cd = med_form.cleaned_data
+            # stock the shared catalog entry when there is one: the one picked
+            # from the suggestions, else an exact match; near matches are
+            # offered before a new entry is created
+            choice = request.POST.get("use_medicine", "")
+            med = Medicine.objects.filter(pk=choice).first() if choice.isdigit() else None
+            if med is None:
+                med = canonical_medicine(cd["name"], cd["strength"], cd["form"])
+            if med is None and choice != "new":
+                suggestions = similar_medicines(cd["name"], cd["strength"], cd["form"])
+
+            if not suggestions:
+                created = med is None
+                try:
+                    if created:
+                        med = med_form.save(commit=False)
+                        med.created_by_id = request.user_id
+                        med.full_clean(exclude=["created_by"])
+                        med.save()
+
+                    inv = Inventory(
+                        pharmacy=pharmacy,
+                        medicine=med,
+                        quantity=inv_nm_form.cleaned_data["quantity"],
+                        price=inv_nm_form.cleaned_data["price"],
+                        status=inv_nm_form.cleaned_data["status"],
+                    )
+                    inv.full_clean(exclude=["medicine", "pharmacy"], validate_unique=False)
+                    with transaction.atomic():
+                        inv.save()
+                    if created:
+                        messages.success(request, "New medicine and inventory item added.")
+                    else:
+                        messages.success(request, f"{med.name} {med.strength} is already in the catalog; added it to your inventory.")
+                    return redirect("pharmacy_inventory", pk=pharmacy.id)
+                except ValidationError as e:
+                    inv_nm_form.add_error(None, e)
+                except IntegrityError:
+                    inv_nm_form.add_error(None, CONCURRENT_ADD_ERROR)
 
         return render(request, "pharmacy_inventory.html", {
             "pharmacy": pharmacy,
             "inventory_items": inventory_items,
-            "inventory_form": InventoryForm(),
+            "inventory_form": InventoryForm(pharmacy=pharmacy),
             "medicine_form": med_form,
             "inventory_no_medicine_form": inv_nm_form,
+            "medicine_suggestions": suggestions,
             "open_modal": "addMedicineModal",
+            "row_cache_ttl": settings.INVENTORY_ROW_CACHE_TTL,
         })
 
     return redirect("pharmacy_inventory", pk=pharmacy.id)
-def edit_inventory(request, pk):
-    if "user_id" not in request.session:
-        messages.error(request, "You should login first.")
-        return redirect("auth_page")
 
-    inventory = get_object_or_404(Inventory, pk=pk, pharmacy__user_id=request.session["user_id"])
+@login_required
+def import_inventory(request, pk):
+    pharmacy = get_object_or_404(Pharmacy, pk=pk, user_id=request.user_id)
+
+    if request.method != "POST":
+        return redirect("pharmacy_inventory", pk=pharmacy.id)
+
+    form = InventoryImportForm(request.POST, request.FILES)
+    if not form.is_valid():
+        messages.error(request, form.errors["file"][0])
+        return redirect("pharmacy_inventory", pk=pharmacy.id)
+
+    upload = form.cleaned_data["file"]
+    try:
+        # the owner is only loaded if the file adds medicines to the catalog
+        result = run_inventory_import(upload, upload.name, pharmacy, request.current_user)
+    except ImportFormatError as e:
+        messages.error(request, str(e))
+        return redirect("pharmacy_inventory", pk=pharmacy.id)
+
+    messages.success(
+        request,
+        f"Imported {result.imported} of {result.rows} rows "
+        f"({result.medicines_created} new medicines).",
+    )
+    for line, message in result.errors[:10]:
+        messages.warning(request, f"Line {line}: {message}")
+    if result.error_count > 10:
+        messages.warning(request, f"...and {result.error_count - 10} more rows with errors.")
+    return redirect("pharmacy_inventory", pk=pharmacy.id)
+
+@login_required
+def edit_inventory(request, pk):
+    inventory = get_object_or_404(Inventory, pk=pk, pharmacy__user_id=request.user_id)
     pharmacy_id = inventory.pharmacy_id
     
     if request.method == "POST":
         form = InventoryEditForm(request.POST, instance=inventory)
-        if form.is_valid():
-            form.save()
-            messages.success(request, "Inventory updated.")
-            return redirect("pharmacy_inventory", pk=inventory.pharmacy.id)
+        if not form.is_valid():
+            messages.error(request, next(iter(form.errors.values()))[0])
+            return redirect("pharmacy_inventory", pk=pharmacy_id)
+        # the quantity is applied as the difference from what the form showed,
+        # so sales made while it was open are kept
+        delta = form.cleaned_data["quantity"] - form.cleaned_data["original_quantity"]
+        try:
+            Inventory.objects.adjust_stock(
+                inventory.pk, delta,
+                price=form.cleaned_data["price"],
+                reorder_level=form.cleaned_data["reorder_level"],
+            )
+        except InsufficientStock:
+            messages.error(request, "Stock changed while you were editing; not enough left for that change.")
+            return redirect("pharmacy_inventory", pk=pharmacy_id)
+        messages.success(request, "Inventory updated.")
+        return redirect("pharmacy_inventory", pk=pharmacy_id)
 
     return redirect("pharmacy_inventory", pk=pharmacy_id)
 
 
+@login_required
 def delete_inventory(request, pk):
-    if "user_id" not in request.session:
-        messages.error(request, "You should login first.")
-        return redirect("auth_page")
-
-    inventory = get_object_or_404(Inventory, pk=pk, pharmacy__user_id=request.session["user_id"])
+    inventory = get_object_or_404(Inventory, pk=pk, pharmacy__user_id=request.user_id)
     pharmacy_id = inventory.pharmacy_id
     
     if request.method == "POST":
@@ -261,3 +551,100 @@ def delete_inventory(request, pk):
         return redirect("pharmacy_inventory", pk=pharmacy_id)
 
     return redirect("pharmacy_inventory", pk=pharmacy_id)
+
+
+def _int_param(request, name, default=None):
+    value = request.POST.get(name, default)
+    if value is None:
+        raise ValueError(f"{name} is required.")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer.")
+
+@login_required(json=True)
+def adjust_stock(request, pk):
+    if request.method != "POST":
+        return JsonResponse({"error": "POST required."}, status=405)
+    get_object_or_404(Inventory.objects.only("id"), pk=pk, pharmacy__user_id=request.user_id)
+
+    try:
+        delta = _int_param(request, "delta")
+        quantity = Inventory.objects.adjust_stock(pk, delta)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except InsufficientStock as e:
+        return JsonResponse({"error": e.message}, status=409)
+    return JsonResponse({"id": pk, "quantity": quantity, "status": "IN" if quantity > 0 else "OUT"})
+
+@login_required(json=True)
+def reserve_stock(request, pk):
+    if request.method != "POST":
+        return JsonResponse({"error": "POST required."}, status=405)
+    get_object_or_404(Inventory.objects.only("id"), pk=pk, pharmacy__user_id=request.user_id)
+
+    try:
+        quantity = _int_param(request, "quantity")
+        ttl = min(_int_param(request, "ttl", StockReservation.DEFAULT_TTL), settings.STOCK_RESERVATION_MAX_TTL)
+        reservation = Inventory.objects.reserve(pk, quantity, ttl=max(ttl, 1))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except InsufficientStock as e:
+        return JsonResponse({"error": e.message}, status=409)
+    except ValidationError as e:
+        return JsonResponse({"error": e.messages[0]}, status=400)
+    return JsonResponse({
+        "reservation": reservation.id,
+        "quantity": reservation.quantity,
+        "expires_at": reservation.expires_at.isoformat(),
+    }, status=201)
+
+@login_required(json=True)
+def finish_reservation(request, pk, action):
+    if request.method != "POST":
+        return JsonResponse({"error": "POST required."}, status=405)
+    get_object_or_404(
+        StockReservation.objects.only("id"), pk=pk,
+        inventory__pharmacy__user_id=request.user_id,
+    )
+
+    try:
+        if action == "confirm":
+            StockReservation.objects.confirm(pk)
+        else:
+            StockReservation.objects.release(pk)
+    except StockReservation.DoesNotExist:
+        return JsonResponse({"error": "Reservation already finished."}, status=409)
+    except ValidationError as e:
+        return JsonResponse({"error": e.messages[0]}, status=409)
+    return JsonResponse({"reservation": pk, "result": action})
+
+@login_required
+def export_inventory(request):
+    fmt = request.GET.get("format", "csv")
+    status = request.GET.get("status") or None
+    pharmacy_id = request.GET.get("pharmacy") or None
+    if fmt not in FORMATS:
+        return JsonResponse({"error": "format must be csv or jsonl."}, status=400)
+    if status not in (None, "IN", "OUT"):
+        return JsonResponse({"error": "status must be IN or OUT."}, status=400)
+    if pharmacy_id is not None and not (pharmacy_id.isdigit() and int(pharmacy_id) <= MAX_DB_INTEGER):
+        return JsonResponse({"error": "pharmacy must be an id."}, status=400)
+    compress = request.GET.get("gzip") == "1"
+
+    # owners export their own pharmacies only
+    rows = export_queryset(
+        user_id=request.user_id, pharmacy_id=pharmacy_id,
+        city=request.GET.get("city"), status=status,
+    )
+    chunks = export_stream(rows, fmt, compress)
+    if isinstance(request, ASGIRequest):
+        chunks = aiter_stream(chunks)
+
+    content_type, extension = FORMATS[fmt]
+    filename = f"inventory-{timezone.now():%Y%m%d-%H%M%S}.{extension}"
+    if compress:
+        content_type, filename = "application/gzip", filename + ".gz"
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
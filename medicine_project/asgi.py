@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "medicine_project.settings")
+# serve the read paths from medicine_app.async_views under an ASGI server
+os.environ.setdefault("MEDICINE_ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "medicine_app.routers.PrimaryPinningMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -56,8 +57,14 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # compiled templates are kept in memory for the life of the process
+            "loaders": [
+                ("django.template.loaders.cached.Loader", [
+                    "django.template.loaders.filesystem.Loader",
+                    "django.template.loaders.app_directories.Loader",
+                ]),
+            ],
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
@@ -73,12 +80,58 @@ WSGI_APPLICATION = "medicine_project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection reuse. By default each server thread keeps its connection for
+# DB_CONN_MAX_AGE seconds, checking it is alive before each request reuses it.
+# DB_POOL_SIZE > 0 instead shares a bounded pool per alias across threads
+# (medicine_app.dbpool): connections are pinged on checkout, replaced after
+# DB_POOL_MAX_LIFETIME seconds, and a request waits at most DB_POOL_TIMEOUT
+# for one. Pool metrics are served next to the profiling stats.
+
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 0))
+
 DATABASES = {
     "default": {
-        "ENGINE": 'django.db.backends.mysql',
+        "ENGINE": "medicine_app.backends.mysql",
         "NAME": BASE_DIR / "db.mysql",
+        "CONN_MAX_AGE": 0 if DB_POOL_SIZE else int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
     }
 }
+if DB_POOL_SIZE:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "max_size": DB_POOL_SIZE,
+        "max_lifetime": int(os.environ.get("DB_POOL_MAX_LIFETIME", 1800)),
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        "pre_ping": os.environ.get("DB_POOL_PRE_PING", "1") == "1",
+    }
+
+# DB_SQLITE_PATH runs on a SQLite file instead of MySQL, e.g. for local work.
+if os.environ.get("DB_SQLITE_PATH"):
+    DATABASES["default"] = {"ENGINE": "django.db.backends.sqlite3", "NAME": os.environ["DB_SQLITE_PATH"]}
+
+# Read replicas (medicine_app.routers). DB_REPLICA_HOSTS lists MySQL replicas
+# of the default database; reads are spread over DATABASE_REPLICAS and a
+# client that wrote reads from the primary for READ_YOUR_WRITES_SECONDS.
+# To try it locally, set DB_SQLITE_PATH and point DB_SQLITE_REPLICA_PATH at a
+# copy of that file; it becomes the "replica" alias. Test runs mirror every
+# replica onto the test database.
+
+DATABASE_REPLICAS = []
+for number, host in enumerate(filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(",")), start=1):
+    alias = f"replica{number}"
+    DATABASES[alias] = {**DATABASES["default"], "HOST": host.strip(), "TEST": {"MIRROR": "default"}}
+    DATABASE_REPLICAS.append(alias)
+if os.environ.get("DB_SQLITE_REPLICA_PATH"):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ["DB_SQLITE_REPLICA_PATH"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append("replica")
+
+DATABASE_ROUTERS = ["medicine_app.routers.PrimaryReplicaRouter"]
+READ_YOUR_WRITES_SECONDS = int(os.environ.get("READ_YOUR_WRITES_SECONDS", 5))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -121,3 +174,189 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Medicine search
+# Leave MEDICINE_SEARCH_BACKEND unset to use the database's native full-text
+# index on MySQL/PostgreSQL and the in-process index everywhere else. Each
+# worker keeps its own in-process index and learns about other workers'
+# writes through a version key in the default cache, so running several
+# workers on it needs CACHE_BACKEND=file or redis.
+
+MEDICINE_SEARCH_BACKEND = os.environ.get("MEDICINE_SEARCH_BACKEND")
+MEDICINE_SEARCH_MAX_RESULTS = 500
+MEDICINE_SEARCH_API_PAGE_SIZE = 20
+MEDICINE_SEARCH_API_MAX_PAGE_SIZE = 100
+MEDICINE_AUTOCOMPLETE_LIMIT = 10
+MEDICINE_AUTOCOMPLETE_SNAPSHOT = os.environ.get(
+    "MEDICINE_AUTOCOMPLETE_SNAPSHOT", BASE_DIR / "var" / "autocomplete.json"
+)
+
+
+# Query budgets (medicine_app.decorators.query_budget)
+# Views over budget raise QueryBudgetExceeded when this is on (tests/CI) and
+# only log a warning otherwise.
+
+QUERY_BUDGET_RAISE = os.environ.get("QUERY_BUDGET_RAISE", "0") == "1"
+
+
+# Stock reservations
+
+STOCK_RESERVATION_MAX_TTL = 60 * 60
+
+
+# Password hashing (medicine_app.hashing)
+# Existing hashes are upgraded to BCRYPT_ROUNDS on the next successful login.
+
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 4 * PASSWORD_HASH_WORKERS))
+PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 5))
+
+
+# Async read views (medicine_app.async_views); asgi.py turns this on by default.
+
+MEDICINE_ASYNC_VIEWS = os.environ.get("MEDICINE_ASYNC_VIEWS", "0") == "1"
+
+
+# Cache
+# CACHE_BACKEND selects locmem (per process, the default), file, or redis.
+# The redis backend speaks the Redis protocol, so CACHE_LOCATION can point at
+# any compatible local stand-in (Valkey, KeyDB, ...).
+
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("CACHE_LOCATION", "redis://127.0.0.1:6379/0"),
+            "KEY_PREFIX": "medicine",
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("CACHE_LOCATION", BASE_DIR / "var" / "cache"),
+            "KEY_PREFIX": "medicine",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "medicine",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+# Catalog read-through cache (medicine_app.cache): entries are recomputed after
+# CATALOG_CACHE_TTL seconds, but may be served stale for CATALOG_CACHE_GRACE
+# more seconds while one worker refreshes them.
+
+CATALOG_CACHE_TTL = int(os.environ.get("CATALOG_CACHE_TTL", 300))
+CATALOG_CACHE_GRACE = int(os.environ.get("CATALOG_CACHE_GRACE", 60))
+CATALOG_CACHE_LOCK_TIMEOUT = 10
+
+
+# Availability engine (medicine_app.availability)
+
+AVAILABILITY_OFFER_LIMIT = 20
+AVAILABILITY_MAX_LINES = 50
+
+
+# Request profiling (medicine_app.profiling). Off unless PROFILING_ENABLED=1;
+# PROFILING_SAMPLE_RATE is the fraction of requests measured. Aggregates are
+# served at /stats/profiling/ to requests carrying X-Stats-Token, and each
+# sampled request is also appended to PROFILING_LOG_FILE when it is set.
+
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0.05))
+PROFILING_STATS_TOKEN = os.environ.get("PROFILING_STATS_TOKEN")
+PROFILING_LOG_FILE = os.environ.get("PROFILING_LOG_FILE")
+PROFILING_LOG_MAX_BYTES = 10 * 1024 * 1024
+PROFILING_LOG_BACKUPS = 5
+
+if PROFILING_ENABLED:
+    # first, so the wall time covers every other middleware too
+    MIDDLEWARE.insert(0, "medicine_app.profiling.ProfilingMiddleware")
+
+
+# Inventory export (medicine_app.exporting): rows fetched per database round trip.
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Inventory import. The web form imports inside the request, so it takes
+# files up to this size; larger ones go through the import_inventory command.
+
+INVENTORY_IMPORT_MAX_BYTES = int(os.environ.get("INVENTORY_IMPORT_MAX_BYTES", 5 * 1024 * 1024))
+
+
+# pharmacy_inventory.html caches each table row; keys include the row's and
+# its medicine's updated_at, so edits show up at once and this only bounds
+# how long unused rows stay in the cache.
+
+INVENTORY_ROW_CACHE_TTL = 24 * 60 * 60
+
+
+# Live inventory feed (medicine_app.changefeed). Each process checks the
+# change log once per poll interval for all connected clients. A hole in the
+# sequence younger than the settle window holds the feed back, since the
+# transaction that owns it may still commit. Streams close after MAX_SECONDS
+# and the browser resumes from its last event id.
+
+INVENTORY_FEED_POLL_SECONDS = float(os.environ.get("INVENTORY_FEED_POLL_SECONDS", 1))
+INVENTORY_FEED_SETTLE_SECONDS = 5
+INVENTORY_FEED_HEARTBEAT_SECONDS = 15
+INVENTORY_FEED_MAX_SECONDS = 300
+INVENTORY_FEED_BATCH_SIZE = 500
+
+
+# Price history (medicine_app.history): longest range one API call may ask for.
+
+PRICE_HISTORY_MAX_DAYS = 366
+
+
+# Stock alerts (medicine_app.alerts, send_stock_alerts). The sink is any class
+# with send(pharmacy, alerts); ConsoleSink, FileSink(path) and EmailSink ship
+# with the app. Each pass re-reads OVERLAP_SECONDS before its watermark to
+# catch rows whose transactions committed late.
+
+STOCK_ALERT_SINK = os.environ.get("STOCK_ALERT_SINK", "medicine_app.alerts.ConsoleSink")
+STOCK_ALERT_SINK_OPTIONS = {}
+STOCK_ALERT_OVERLAP_SECONDS = 60
+
+
+# Sessions. SESSION_BACKEND picks the store:
+#   db             a database read per request (Django's default)
+#   cached_db      reads from the "sessions" cache, falls back to the database
+#   cache          cache only; an evicted session is a logout
+#   signed_cookies the session lives in the signed cookie, no server storage
+# Sessions get their own cache alias so they never push catalog entries out.
+# A locmem/file store holds at most SESSION_CACHE_MAX_ENTRIES and culls
+# 1/SESSION_CACHE_CULL_FREQUENCY of them when full; with redis, give the
+# server a volatile-lru maxmemory-policy (every session key carries a TTL).
+# clear_expired_sessions sweeps the db and cached_db stores in batches.
+
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "db")
+SESSION_ENGINE = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}[SESSION_BACKEND]
+SESSION_CACHE_ALIAS = "sessions"
+SESSION_CACHE_MAX_ENTRIES = int(os.environ.get("SESSION_CACHE_MAX_ENTRIES", 50000))
+SESSION_CACHE_CULL_FREQUENCY = 4
+
+CACHES["sessions"] = {**CACHES["default"], "KEY_PREFIX": "session"}
+if CACHE_BACKEND != "redis":
+    if CACHE_BACKEND == "file":
+        CACHES["sessions"]["LOCATION"] = os.environ.get("SESSION_CACHE_LOCATION", BASE_DIR / "var" / "sessions")
+    else:
+        CACHES["sessions"]["LOCATION"] = "sessions"
+    CACHES["sessions"]["OPTIONS"] = {
+        "MAX_ENTRIES": SESSION_CACHE_MAX_ENTRIES,
+        "CULL_FREQUENCY": SESSION_CACHE_CULL_FREQUENCY,
+    }